@@ -0,0 +1,29 @@
+"""add geography expression index to buildings
+
+Revision ID: 4f1c2a9d7e3b
+Revises: 95e8d8e0cbf7
+Create Date: 2026-10-17 10:12:41.504117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1c2a9d7e3b'
+down_revision: Union[str, Sequence[str], None] = '95e8d8e0cbf7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_building_geog ON buildings USING gist (geography(geom))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS idx_building_geog")
@@ -0,0 +1,74 @@
+"""touch building on organization move or delete
+
+Revision ID: a7c9e1b3d5f2
+Revises: f1a3c5e7b9d4
+Create Date: 2026-10-18 10:12:44.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c9e1b3d5f2'
+down_revision: Union[str, Sequence[str], None] = 'f1a3c5e7b9d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Когда организация уходит из здания (смена building_id или физическое удаление), у здания
+# сдвигается updated_at: иначе инкрементальное обновление индекса зданий в памяти его не перечитает.
+# Время — момент изменения (clock_timestamp, а не начало транзакции) в UTC без часового пояса,
+# как datetime.utcnow() в моделях. Триггеры уровня оператора с таблицами переходов:
+# массовые изменения обновляют каждое здание один раз.
+CREATE_TOUCH_FUNCTIONS = """
+CREATE FUNCTION touch_buildings_of_moved_organizations() RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE buildings SET updated_at = clock_timestamp() AT TIME ZONE 'UTC'
+    WHERE id IN (
+        SELECT old_rows.building_id
+        FROM old_rows
+        JOIN new_rows ON new_rows.id = old_rows.id
+        WHERE new_rows.building_id IS DISTINCT FROM old_rows.building_id
+    );
+    RETURN NULL;
+END
+$$;
+
+CREATE FUNCTION touch_buildings_of_deleted_organizations() RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE buildings SET updated_at = clock_timestamp() AT TIME ZONE 'UTC'
+    WHERE id IN (SELECT building_id FROM old_rows);
+    RETURN NULL;
+END
+$$;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(CREATE_TOUCH_FUNCTIONS)
+    op.execute("""
+        CREATE TRIGGER organizations_touch_buildings_on_update
+        AFTER UPDATE ON organizations
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION touch_buildings_of_moved_organizations()
+    """)
+    op.execute("""
+        CREATE TRIGGER organizations_touch_buildings_on_delete
+        AFTER DELETE ON organizations
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION touch_buildings_of_deleted_organizations()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER organizations_touch_buildings_on_delete ON organizations")
+    op.execute("DROP TRIGGER organizations_touch_buildings_on_update ON organizations")
+    op.execute("DROP FUNCTION touch_buildings_of_deleted_organizations()")
+    op.execute("DROP FUNCTION touch_buildings_of_moved_organizations()")
@@ -0,0 +1,31 @@
+"""add trigram index on organization name
+
+Revision ID: b7d3e5f1a2c4
+Revises: 4f1c2a9d7e3b
+Create Date: 2026-10-17 11:03:17.228415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3e5f1a2c4'
+down_revision: Union[str, Sequence[str], None] = '4f1c2a9d7e3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'idx_organization_name_trgm', 'organizations', ['name'], unique=False,
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_organization_name_trgm', table_name='organizations', postgresql_using='gin')
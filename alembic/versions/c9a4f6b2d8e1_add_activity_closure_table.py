@@ -0,0 +1,51 @@
+"""add activity closure table
+
+Revision ID: c9a4f6b2d8e1
+Revises: b7d3e5f1a2c4
+Create Date: 2026-10-17 11:48:52.730614
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9a4f6b2d8e1'
+down_revision: Union[str, Sequence[str], None] = 'b7d3e5f1a2c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('activity_closure',
+    sa.Column('ancestor_id', sa.Integer(), nullable=False),
+    sa.Column('descendant_id', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['activities.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_id'], ['activities.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('idx_activity_closure_descendant', 'activity_closure', ['descendant_id', 'ancestor_id'], unique=False)
+
+    # Заполняем замыкание для уже существующих деятельностей
+    op.execute("""
+        INSERT INTO activity_closure (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE tree AS (
+            SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth
+            FROM activities
+            UNION ALL
+            SELECT tree.ancestor_id, activities.id, tree.depth + 1
+            FROM tree
+            JOIN activities ON activities.parent_id = tree.descendant_id
+        )
+        SELECT ancestor_id, descendant_id, depth FROM tree
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_activity_closure_descendant', table_name='activity_closure')
+    op.drop_table('activity_closure')
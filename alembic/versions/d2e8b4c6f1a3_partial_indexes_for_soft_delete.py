@@ -0,0 +1,92 @@
+"""partial indexes for soft delete
+
+Revision ID: d2e8b4c6f1a3
+Revises: c9a4f6b2d8e1
+Create Date: 2026-10-17 12:21:40.518327
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2e8b4c6f1a3'
+down_revision: Union[str, Sequence[str], None] = 'c9a4f6b2d8e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NOT_DELETED = sa.text('NOT is_deleted')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Отдельные индексы по булевому флагу планировщик почти не использует
+    op.drop_index(op.f('ix_activities_is_deleted'), table_name='activities')
+    op.drop_index(op.f('ix_buildings_is_deleted'), table_name='buildings')
+    op.drop_index(op.f('ix_organizations_is_deleted'), table_name='organizations')
+
+    # Пространственные индексы только по неудалённым зданиям.
+    # idx_buildings_geom — полный дубль idx_building_geom, созданный вместе с таблицей
+    op.execute("DROP INDEX IF EXISTS idx_buildings_geom")
+    op.drop_index('idx_building_geom', table_name='buildings', postgresql_using='gist')
+    op.create_index(
+        'idx_building_geom', 'buildings', ['geom'], unique=False,
+        postgresql_using='gist', postgresql_where=NOT_DELETED
+    )
+    op.execute("DROP INDEX IF EXISTS idx_building_geog")
+    op.execute(
+        "CREATE INDEX idx_building_geog ON buildings USING gist (geography(geom)) WHERE NOT is_deleted"
+    )
+
+    op.drop_index('idx_organization_building_id', table_name='organizations')
+    op.create_index(
+        'idx_organization_building_id', 'organizations', ['building_id'], unique=False,
+        postgresql_where=NOT_DELETED
+    )
+
+    op.drop_index('idx_activity_parent_id', table_name='activities')
+    op.create_index(
+        'idx_activity_parent_id', 'activities', ['parent_id'], unique=False,
+        postgresql_where=NOT_DELETED
+    )
+
+    # Индексы по названию организации
+    op.drop_index(op.f('ix_organizations_name'), table_name='organizations')
+    op.create_index(
+        'idx_organization_name', 'organizations', ['name'], unique=False,
+        postgresql_where=NOT_DELETED
+    )
+    op.drop_index('idx_organization_name_trgm', table_name='organizations', postgresql_using='gin')
+    op.create_index(
+        'idx_organization_name_trgm', 'organizations', ['name'], unique=False,
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}, postgresql_where=NOT_DELETED
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_organization_name_trgm', table_name='organizations', postgresql_using='gin')
+    op.create_index(
+        'idx_organization_name_trgm', 'organizations', ['name'], unique=False,
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+    op.drop_index('idx_organization_name', table_name='organizations')
+    op.create_index(op.f('ix_organizations_name'), 'organizations', ['name'], unique=False)
+
+    op.drop_index('idx_activity_parent_id', table_name='activities')
+    op.create_index('idx_activity_parent_id', 'activities', ['parent_id'], unique=False)
+
+    op.drop_index('idx_organization_building_id', table_name='organizations')
+    op.create_index('idx_organization_building_id', 'organizations', ['building_id'], unique=False)
+
+    op.execute("DROP INDEX IF EXISTS idx_building_geog")
+    op.execute("CREATE INDEX idx_building_geog ON buildings USING gist (geography(geom))")
+    op.drop_index('idx_building_geom', table_name='buildings', postgresql_using='gist')
+    op.create_index('idx_building_geom', 'buildings', ['geom'], unique=False, postgresql_using='gist')
+    op.execute("CREATE INDEX IF NOT EXISTS idx_buildings_geom ON buildings USING gist (geom)")
+
+    op.create_index(op.f('ix_organizations_is_deleted'), 'organizations', ['is_deleted'], unique=False)
+    op.create_index(op.f('ix_buildings_is_deleted'), 'buildings', ['is_deleted'], unique=False)
+    op.create_index(op.f('ix_activities_is_deleted'), 'activities', ['is_deleted'], unique=False)
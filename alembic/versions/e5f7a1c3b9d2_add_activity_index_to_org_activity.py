@@ -0,0 +1,29 @@
+"""add activity index to org_activity
+
+Revision ID: e5f7a1c3b9d2
+Revises: d2e8b4c6f1a3
+Create Date: 2026-10-17 12:47:05.931846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f7a1c3b9d2'
+down_revision: Union[str, Sequence[str], None] = 'd2e8b4c6f1a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'idx_org_activity_activity_id', 'org_activity', ['activity_id', 'organization_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_org_activity_activity_id', table_name='org_activity')
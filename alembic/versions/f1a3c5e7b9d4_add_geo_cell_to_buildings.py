@@ -0,0 +1,69 @@
+"""add geo_cell to buildings
+
+Revision ID: f1a3c5e7b9d4
+Revises: e5f7a1c3b9d2
+Create Date: 2026-10-17 15:21:38.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a3c5e7b9d4'
+down_revision: Union[str, Sequence[str], None] = 'e5f7a1c3b9d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Целочисленный geohash (Z-order) точки: по 30 бит широты и долготы, биты чередуются,
+# старший — долгота. Должна совпадать с src/core/geo_cells.py:cell_id.
+CREATE_GEO_CELL_ID = """
+CREATE FUNCTION geo_cell_id(latitude double precision, longitude double precision)
+RETURNS bigint
+LANGUAGE plpgsql IMMUTABLE STRICT PARALLEL SAFE
+AS $$
+DECLARE
+    scale constant bigint := 1 << 30;
+    lat_bits bigint := least(greatest(floor((latitude + 90.0) / 180.0 * scale), 0), scale - 1);
+    lon_bits bigint := least(greatest(floor((longitude + 180.0) / 360.0 * scale), 0), scale - 1);
+BEGIN
+    lat_bits := (lat_bits | (lat_bits << 16)) & x'0000FFFF0000FFFF'::bigint;
+    lat_bits := (lat_bits | (lat_bits << 8)) & x'00FF00FF00FF00FF'::bigint;
+    lat_bits := (lat_bits | (lat_bits << 4)) & x'0F0F0F0F0F0F0F0F'::bigint;
+    lat_bits := (lat_bits | (lat_bits << 2)) & x'3333333333333333'::bigint;
+    lat_bits := (lat_bits | (lat_bits << 1)) & x'5555555555555555'::bigint;
+
+    lon_bits := (lon_bits | (lon_bits << 16)) & x'0000FFFF0000FFFF'::bigint;
+    lon_bits := (lon_bits | (lon_bits << 8)) & x'00FF00FF00FF00FF'::bigint;
+    lon_bits := (lon_bits | (lon_bits << 4)) & x'0F0F0F0F0F0F0F0F'::bigint;
+    lon_bits := (lon_bits | (lon_bits << 2)) & x'3333333333333333'::bigint;
+    lon_bits := (lon_bits | (lon_bits << 1)) & x'5555555555555555'::bigint;
+
+    RETURN (lon_bits << 1) | lat_bits;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(CREATE_GEO_CELL_ID)
+    # Генерируемый столбец пересчитывается самой БД при любой записи координат
+    # (включая массовый импорт). Добавление переписывает таблицу buildings.
+    op.add_column(
+        'buildings',
+        sa.Column('geo_cell', sa.BigInteger(), sa.Computed('geo_cell_id(latitude, longitude)', persisted=True)),
+    )
+    op.create_index(
+        'idx_building_geo_cell', 'buildings', ['geo_cell'], unique=False,
+        postgresql_where=sa.text('NOT is_deleted'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_building_geo_cell', table_name='buildings', postgresql_where=sa.text('NOT is_deleted'))
+    op.drop_column('buildings', 'geo_cell')
+    op.execute("DROP FUNCTION geo_cell_id(double precision, double precision)")
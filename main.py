@@ -1,17 +1,53 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.openapi.utils import get_openapi
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy.exc import IntegrityError
 
 from src.api.routes import api_router
-from src.core.middleware import api_key_middleware
+from src.core import settings
+from src.core.activity_tree import activity_tree
+from src.core.database import async_session_maker
+from src.core.middleware import api_key_middleware, response_cache_middleware
+from src.core.spatial_index import spatial_index
+from src.exceptions import InvalidCursorError
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Прогреваем дерево деятельностей (и индекс зданий в памяти) до первого запроса
+    async with async_session_maker() as session:
+        await activity_tree.load(session)
+        if settings.spatial_backend == "memory":
+            await spatial_index.load(session)
+    yield
+
 
 app = FastAPI(
     title="API",
     description="API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+# Middleware, добавленный позже, выполняется раньше: проверка ключа идёт до кэша
+app.middleware("http")(response_cache_middleware)
 app.middleware("http")(api_key_middleware)
 
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
+@app.exception_handler(IntegrityError)
+async def integrity_error_handler(request: Request, exc: IntegrityError):
+    # Например, ссылка на несуществующее здание или деятельность
+    return JSONResponse(status_code=409, content={"detail": "Нарушение ограничений целостности данных"})
+
+
 # Подключаем роуты
 app.include_router(api_router, prefix="/api/v1")
 
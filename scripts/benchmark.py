@@ -0,0 +1,700 @@
+"""
+Бенчмарки запросов к БД.
+
+Примеры:
+    python3 -m scripts.benchmark seed --buildings 1000000
+    python3 -m scripts.benchmark radius --radius-km 1 --runs 20
+    python3 -m scripts.benchmark nearest --limit 20 --runs 20
+    python3 -m scripts.benchmark seed --buildings 0 --organizations 2000000
+    python3 -m scripts.benchmark search --query "Торг" --runs 20
+    python3 -m scripts.benchmark buildings --radius-km 2 --runs 5
+    python3 -m scripts.benchmark organizations --radius-km 2 --runs 20
+    python3 -m scripts.benchmark seed --buildings 0 --links 5000000
+    python3 -m scripts.benchmark by-activity --runs 20
+    python3 -m scripts.benchmark serialization --radius-km 2 --runs 20
+    python3 -m scripts.benchmark sql-json --radius-km 2 --activity-id 1 --runs 10
+    python3 -m scripts.benchmark spatial --radius-km 2 --limit 20 --runs 50
+    python3 -m scripts.benchmark geo-cells --radius-km 2 --runs 20
+    python3 -m scripts.benchmark nearby-batch --points 300 --radius-km 0.5
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import statistics
+import sys
+import time
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
+
+from scripts.create_test_data import TestDataGenerator
+from src.core.database import async_session_maker
+from src.api.serializers import serialize_building, serialize_organization
+from src.core import settings
+from src.core.geo_arrays import EARTH_RADIUS_M, haversine_m
+from src.core.geo_cells import cell_id
+from src.core.spatial_index import VISIBLE_BUILDING, SpatialIndex
+from src.models import Activity, Building, Organization, org_activity
+from src.repositories.building_repo import BuildingRepository
+from src.repositories.organization_repo import HAS_ACTIVE_ACTIVITY, OrganizationRepository
+from src.schemas.building import BuildingBase
+from src.schemas.organization import OrganizationBase
+from src.repositories.geo import within_radius, within_bbox, cells_in_bbox, cells_in_radius, distance_to
+
+# Центр Москвы и разброс точек вокруг него
+CENTER_LAT, CENTER_LON = 55.75, 37.62
+SPREAD_DEG = 0.5
+
+
+async def seed_buildings(session: AsyncSession, count: int):
+    """Быстрое наполнение buildings случайными точками средствами БД."""
+    print(f"Создание {count} зданий...")
+    start = time.perf_counter()
+    await session.execute(
+        text("""
+            INSERT INTO buildings (address, latitude, longitude, geom, created_at, updated_at, is_deleted)
+            SELECT 'bench ' || g, p.lat, p.lon,
+                   ST_SetSRID(ST_MakePoint(p.lon, p.lat), 4326),
+                   now(), now(), false
+            FROM generate_series(1, :count) AS g,
+                 LATERAL (
+                     SELECT :lat + (random() - 0.5) * :spread AS lat,
+                            :lon + (random() - 0.5) * :spread AS lon,
+                            g AS _g
+                 ) AS p
+        """),
+        {"count": count, "lat": CENTER_LAT, "lon": CENTER_LON, "spread": SPREAD_DEG},
+    )
+    await session.commit()
+    await session.execute(text("ANALYZE buildings"))
+    print(f"Готово за {time.perf_counter() - start:.1f} с")
+
+
+async def seed_organizations(session: AsyncSession, count: int):
+    """Быстрое наполнение organizations: названия собираются в БД из словарей генератора тестовых данных."""
+    print(f"Создание {count} организаций...")
+    start = time.perf_counter()
+    generator = TestDataGenerator()
+    await session.execute(
+        text("""
+            INSERT INTO organizations (name, phones, building_id, created_at, updated_at, is_deleted)
+            SELECT format(
+                       '%s "%s %s %s"',
+                       t[1 + floor(random() * cardinality(t))::int],
+                       p1[1 + floor(random() * cardinality(p1))::int],
+                       p2[1 + floor(random() * cardinality(p2))::int],
+                       p3[1 + floor(random() * cardinality(p3))::int]
+                   ),
+                   '[]'::jsonb,
+                   b.min_id + floor(random() * (b.max_id - b.min_id + 1))::int,
+                   now(), now(), false
+            FROM generate_series(1, :count) AS g,
+                 (SELECT min(id) AS min_id, max(id) AS max_id FROM buildings) AS b,
+                 (SELECT CAST(:types AS text[]) AS t, CAST(:part1 AS text[]) AS p1,
+                         CAST(:part2 AS text[]) AS p2, CAST(:part3 AS text[]) AS p3) AS words
+        """),
+        {
+            "count": count,
+            "types": generator.organization_types,
+            "part1": generator.organization_names_part1,
+            "part2": generator.organization_names_part2,
+            "part3": generator.organization_names_part3,
+        },
+    )
+    await session.commit()
+    await session.execute(text("ANALYZE organizations"))
+    print(f"Готово за {time.perf_counter() - start:.1f} с")
+
+
+async def seed_links(session: AsyncSession, count: int):
+    """Случайные связи организация-деятельность (дубликаты пар отбрасываются)."""
+    print(f"Создание {count} связей организаций с деятельностями...")
+    start = time.perf_counter()
+    await session.execute(
+        text("""
+            INSERT INTO org_activity (organization_id, activity_id)
+            SELECT o.min_id + floor(random() * (o.max_id - o.min_id + 1))::int,
+                   a.ids[1 + floor(random() * cardinality(a.ids))::int]
+            FROM generate_series(1, :count) AS g,
+                 (SELECT min(id) AS min_id, max(id) AS max_id FROM organizations) AS o,
+                 (SELECT array_agg(id) AS ids FROM activities) AS a
+            ON CONFLICT DO NOTHING
+        """),
+        {"count": count},
+    )
+    await session.commit()
+    await session.execute(text("ANALYZE org_activity"))
+    print(f"Готово за {time.perf_counter() - start:.1f} с")
+
+
+async def explain(session: AsyncSession, query) -> dict:
+    """EXPLAIN ANALYZE запроса, возвращает корневой узел плана."""
+    compiled = query.compile(
+        dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+    result = await session.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {compiled}"))
+    return result.scalar_one()[0]
+
+
+async def run_case(session: AsyncSession, name: str, build_query, runs: int):
+    timings = []
+    plan = None
+    for _ in range(runs):
+        lat = CENTER_LAT + (random.random() - 0.5) * SPREAD_DEG / 2
+        lon = CENTER_LON + (random.random() - 0.5) * SPREAD_DEG / 2
+        plan = await explain(session, build_query(lat, lon))
+        timings.append(plan["Execution Time"])
+
+    print(
+        f"{name:<28} median={statistics.median(timings):9.2f} ms  "
+        f"max={max(timings):9.2f} ms  node={plan['Plan']['Node Type']}"
+    )
+
+
+async def bench_radius(session: AsyncSession, radius_km: float, runs: int):
+    total = await session.scalar(select(func.count()).select_from(Building))
+    print(f"Зданий в таблице: {total}, радиус {radius_km} км, прогонов {runs}")
+
+    def old_query(lat, lon):
+        return select(func.count()).where(
+            func.ST_DistanceSphere(Building.geom, func.ST_MakePoint(lon, lat)) <= radius_km * 1000,
+            Building.is_deleted == False,
+        )
+
+    def new_query(lat, lon):
+        return select(func.count()).where(
+            within_radius(lat, lon, radius_km),
+            Building.is_deleted == False,
+        )
+
+    await run_case(session, "ST_DistanceSphere (старый)", old_query, runs)
+    await run_case(session, "ST_DWithin geography", new_query, runs)
+
+
+async def bench_nearest(session: AsyncSession, limit: int, runs: int):
+    print(f"K ближайших зданий, k={limit}, прогонов {runs}")
+
+    def radius_then_sort(lat, lon):
+        distance = distance_to(lat, lon)
+        return (
+            select(Building.id, distance)
+            .where(within_radius(lat, lon, 1.0), Building.is_deleted == False)
+            .order_by(distance)
+            .limit(limit)
+        )
+
+    def knn(lat, lon):
+        distance = distance_to(lat, lon)
+        return (
+            select(Building.id, distance)
+            .where(Building.is_deleted == False)
+            .order_by(distance)
+            .limit(limit)
+        )
+
+    await run_case(session, "радиус 1 км + сортировка", radius_then_sort, runs)
+    await run_case(session, "KNN <->", knn, runs)
+
+
+async def bench_search(session: AsyncSession, query_text: str, limit: int, runs: int):
+    total = await session.scalar(select(func.count()).select_from(Organization))
+    print(f"Организаций в таблице: {total}, запрос '{query_text}', прогонов {runs}")
+
+    def old_query(lat, lon):
+        return select(Organization.id).where(
+            func.lower(Organization.name).like(f"%{query_text.lower()}%"),
+            Organization.is_deleted == False,
+        )
+
+    def new_query(lat, lon):
+        return (
+            select(Organization.id)
+            .where(
+                Organization.name.ilike(f"%{query_text}%"),
+                Organization.is_deleted == False,
+            )
+            .order_by(func.word_similarity(query_text, Organization.name).desc(), Organization.id)
+            .limit(limit)
+        )
+
+    await run_case(session, "lower(name) LIKE (старый)", old_query, runs)
+    await run_case(session, "pg_trgm ILIKE + ранжирование", new_query, runs)
+
+
+async def count_rows(session: AsyncSession, query) -> int:
+    """Число строк, которые вернёт запрос (передаётся по сети из БД)."""
+    return await session.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+
+
+async def bench_buildings(session: AsyncSession, radius_km: float, runs: int):
+    print(f"Здания с организациями в радиусе {radius_km} км, прогонов {runs}")
+    lat, lon = CENTER_LAT, CENTER_LON
+    spatial_filter = within_radius(lat, lon, radius_km)
+
+    # Старый вариант: одна строка на каждую пару здание × организация × деятельность
+    joined = (
+        select(Building)
+        .join(Building.organizations)
+        .join(Organization.activities)
+        .where(
+            spatial_filter,
+            Building.is_deleted == False,
+            Organization.is_deleted == False,
+            Activity.is_deleted == False,
+        )
+        .options(contains_eager(Building.organizations).contains_eager(Organization.activities))
+        .execution_options(populate_existing=True)
+    )
+
+    async def load_joined() -> int:
+        result = await session.execute(joined)
+        return len(result.unique().scalars().all())
+
+    async def load_paged() -> int:
+        repository = BuildingRepository(Building, session)
+        loaded, cursor = 0, None
+        while True:
+            page = await repository.list_in_radius(lat, lon, radius_km, cursor, settings.max_page_size)
+            loaded += len(page.items)
+            if page.next_cursor is None:
+                return loaded
+            cursor = page.next_cursor
+
+    buildings = select(Building.id).where(spatial_filter, Building.is_deleted == False)
+    organizations = select(Organization.id).where(
+        Organization.building_id.in_(buildings), Organization.is_deleted == False
+    )
+    activities = (
+        select(Organization.id)
+        .join(Organization.activities)
+        .where(Organization.id.in_(organizations), Activity.is_deleted == False)
+    )
+    joined_rows = await count_rows(session, joined)
+    paged_rows = sum([
+        await count_rows(session, buildings),
+        await count_rows(session, organizations),
+        await count_rows(session, activities),
+    ])
+
+    for name, load, rows in (
+        ("join + contains_eager (старый)", load_joined, joined_rows),
+        ("страницы + selectinload", load_paged, paged_rows),
+    ):
+        timings = []
+        loaded = 0
+        for _ in range(runs):
+            session.expunge_all()
+            start = time.perf_counter()
+            loaded = await load()
+            timings.append((time.perf_counter() - start) * 1000)
+        print(
+            f"{name:<32} rows={rows:<9} buildings={loaded:<7} "
+            f"median={statistics.median(timings):9.2f} ms  max={max(timings):9.2f} ms"
+        )
+
+
+async def bench_organizations(session: AsyncSession, radius_km: float, runs: int):
+    print(f"Организации в радиусе {radius_km} км, прогонов {runs}")
+
+    def joined(lat, lon):
+        return (
+            select(Organization.id)
+            .join(Organization.building)
+            .join(Organization.activities)
+            .where(
+                within_radius(lat, lon, radius_km),
+                Organization.is_deleted == False,
+                Building.is_deleted == False,
+                Activity.is_deleted == False,
+            )
+        )
+
+    def exists(lat, lon):
+        return (
+            select(Organization.id)
+            .join(Organization.building)
+            .where(
+                within_radius(lat, lon, radius_km),
+                Organization.is_deleted == False,
+                Building.is_deleted == False,
+                HAS_ACTIVE_ACTIVITY,
+            )
+        )
+
+    # Число строк и дубликатов считаются для центра, время — по случайным точкам
+    for name, build_query in (("join activities (старый)", joined), ("EXISTS", exists)):
+        query = build_query(CENTER_LAT, CENTER_LON)
+        rows = await count_rows(session, query)
+        unique = await count_rows(session, query.distinct())
+        print(f"{name:<28} rows={rows} duplicates={rows - unique}")
+
+    await run_case(session, "join activities (старый)", joined, runs)
+    await run_case(session, "EXISTS", exists, runs)
+
+
+async def bench_by_activity(session: AsyncSession, runs: int):
+    total = await session.scalar(select(func.count()).select_from(org_activity))
+    activity_ids = (await session.scalars(select(Activity.id).where(Activity.is_deleted == False))).all()
+    print(f"Связей в org_activity: {total}, деятельностей {len(activity_ids)}, прогонов {runs}")
+
+    def by_activity(lat, lon):
+        return (
+            select(Organization.id)
+            .join(org_activity)
+            .where(
+                org_activity.c.activity_id == random.choice(activity_ids),
+                Organization.is_deleted == False,
+            )
+        )
+
+    # Индекс удаляется внутри транзакции и возвращается откатом
+    await session.rollback()
+    await session.execute(text("DROP INDEX idx_org_activity_activity_id"))
+    await run_case(session, "без индекса (старый)", by_activity, runs)
+    await session.rollback()
+    await run_case(session, "(activity_id, organization_id)", by_activity, runs)
+
+
+def time_serializer(name: str, serialize, items, runs: int):
+    timings = []
+    size = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        size = len(serialize(items))
+        timings.append((time.perf_counter() - start) * 1000)
+    print(
+        f"{name:<40} median={statistics.median(timings):9.2f} ms  "
+        f"max={max(timings):9.2f} ms  bytes={size}"
+    )
+
+
+async def bench_serialization(session: AsyncSession, radius_km: float, runs: int):
+    """Стоимость сериализации ответа отдельно от запроса: данные читаются из БД один раз."""
+    lat, lon = CENTER_LAT, CENTER_LON
+    organizations = (
+        await OrganizationRepository(Organization, session).list_in_radius(
+            lat, lon, radius_km, limit=settings.max_page_size
+        )
+    ).items
+    buildings = (
+        await BuildingRepository(Building, session).list_in_radius(
+            lat, lon, radius_km, limit=settings.max_page_size
+        )
+    ).items
+    print(f"Организаций: {len(organizations)}, зданий: {len(buildings)}, прогонов {runs}")
+
+    for endpoint, items, schema, serialize in (
+        ("/organizations/nearby", organizations, OrganizationBase, serialize_organization),
+        ("/buildings/nearby", buildings, BuildingBase, serialize_building),
+    ):
+        adapter = TypeAdapter(list[schema])
+
+        # Путь FastAPI по умолчанию: валидация response_model, jsonable_encoder, json.dumps
+        def pydantic_path(objects):
+            validated = adapter.validate_python(objects, from_attributes=True)
+            return json.dumps(
+                jsonable_encoder(validated), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+            ).encode()
+
+        def fast_path(objects):
+            return orjson.dumps([serialize(obj) for obj in objects])
+
+        time_serializer(f"{endpoint} pydantic (старый)", pydantic_path, items, runs)
+        time_serializer(f"{endpoint} dict + orjson", fast_path, items, runs)
+
+
+def normalize_organizations(organizations: list[dict]) -> list[dict]:
+    """Приведение ответа к сравнимому виду: порядок деятельностей в ORM-пути не задан, сортируем по id."""
+    return [
+        {**organization, "activities": sorted(organization["activities"], key=lambda a: a["id"])}
+        for organization in organizations
+    ]
+
+
+async def bench_sql_json(session: AsyncSession, radius_km: float, activity_id: int, runs: int) -> bool:
+    """Сравнение режима SQL JSON с ORM-путём: совпадение ответов и время от запроса до байтов."""
+    repository = OrganizationRepository(Organization, session)
+    lat, lon = CENTER_LAT, CENTER_LON
+    delta = radius_km / 111
+    limit = settings.max_page_size
+    cases = [
+        (
+            "/organizations/nearby",
+            lambda: repository.list_in_radius(lat, lon, radius_km, limit=limit),
+            lambda: repository.list_in_radius_json(lat, lon, radius_km, limit=limit),
+        ),
+        (
+            "/organizations/bbox",
+            lambda: repository.list_in_bbox(lat - delta, lon - delta, lat + delta, lon + delta, limit=limit),
+            lambda: repository.list_in_bbox_json(lat - delta, lon - delta, lat + delta, lon + delta, limit=limit),
+        ),
+        (
+            "/organizations/by_activity_tree",
+            lambda: repository.list_by_activity_tree(activity_id, limit=limit),
+            lambda: repository.list_by_activity_tree_json(activity_id, limit=limit),
+        ),
+    ]
+
+    passed = True
+    for endpoint, orm_page, json_page in cases:
+        async def orm_body() -> bytes:
+            session.expunge_all()
+            return orjson.dumps([serialize_organization(obj) for obj in (await orm_page()).items])
+
+        async def json_body() -> bytes:
+            return ("[" + ",".join((await json_page()).items) + "]").encode()
+
+        orm_result = normalize_organizations(orjson.loads(await orm_body()))
+        json_result = normalize_organizations(orjson.loads(await json_body()))
+        ok = orm_result == json_result
+        passed &= ok
+        print(f"{'OK  ' if ok else 'FAIL'} {endpoint}: организаций {len(orm_result)} / {len(json_result)}")
+
+        for name, build_body in (("ORM + orjson", orm_body), ("SQL JSON", json_body)):
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                await build_body()
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"     {name:<16} median={statistics.median(timings):9.2f} ms  max={max(timings):9.2f} ms")
+    return passed
+
+
+def python_haversine_m(latitude: float, longitude: float, lat: float, lon: float) -> float:
+    """Поэлементный вариант geo_arrays.haversine_m — для сравнения скорости."""
+    lat1, lat2 = math.radians(latitude), math.radians(lat)
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(math.radians(lon - longitude) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+async def bench_spatial(session: AsyncSession, radius_km: float, limit: int, runs: int) -> bool:
+    """Индекс зданий в памяти против PostGIS: совпадение id и время отбора на случайных запросах."""
+    index = SpatialIndex(refresh_seconds=float("inf"), overlap_seconds=0, full_reload_seconds=float("inf"))
+    start = time.perf_counter()
+    await index.load(session)
+    print(f"Загрузка индекса: {time.perf_counter() - start:.2f} с, зданий {index.stats()['buildings']}")
+
+    async def postgis_ids(spatial_filter) -> list[int]:
+        query = select(Building.id).where(spatial_filter, VISIBLE_BUILDING).order_by(Building.id)
+        return (await session.scalars(query)).all()
+
+    async def postgis_nearest(lat, lon) -> list[int]:
+        query = select(Building.id).where(VISIBLE_BUILDING).order_by(distance_to(lat, lon)).limit(limit)
+        return (await session.scalars(query)).all()
+
+    async def memory_nearest(lat, lon):
+        ids, _ = await index.nearest(lat, lon, limit)
+        return ids
+
+    delta = radius_km / 111
+    cases = {
+        "bbox": (
+            lambda lat, lon: postgis_ids(within_bbox(lat - delta, lon - delta, lat + delta, lon + delta)),
+            lambda lat, lon: index.ids_in_bbox(lat - delta, lon - delta, lat + delta, lon + delta),
+        ),
+        "radius": (
+            lambda lat, lon: postgis_ids(within_radius(lat, lon, radius_km)),
+            lambda lat, lon: index.ids_in_radius(lat, lon, radius_km),
+        ),
+        "nearest": (postgis_nearest, memory_nearest),
+    }
+
+    passed = True
+    for name, (postgis_case, memory_case) in cases.items():
+        postgis_timings, memory_timings, mismatches = [], [], 0
+        for _ in range(runs):
+            lat = CENTER_LAT + (random.random() - 0.5) * SPREAD_DEG / 2
+            lon = CENTER_LON + (random.random() - 0.5) * SPREAD_DEG / 2
+
+            start = time.perf_counter()
+            expected = await postgis_case(lat, lon)
+            postgis_timings.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            actual = (await memory_case(lat, lon)).tolist()
+            memory_timings.append((time.perf_counter() - start) * 1000)
+
+            mismatches += actual != list(expected)
+
+        passed &= mismatches == 0
+        print(f"{'OK  ' if not mismatches else 'FAIL'} {name}: расхождений {mismatches} из {runs}")
+        for backend, timings in (("postgis", postgis_timings), ("memory", memory_timings)):
+            print(f"     {backend:<10} median={statistics.median(timings):9.2f} ms  max={max(timings):9.2f} ms")
+
+    # Расстояния от точки до всех зданий индекса: по одному объекту против NumPy
+    points = index._points
+    start = time.perf_counter()
+    for lat, lon in zip(points.lat.tolist(), points.lon.tolist()):
+        python_haversine_m(CENTER_LAT, CENTER_LON, lat, lon)
+    loop_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    haversine_m(CENTER_LAT, CENTER_LON, points.lat, points.lon)
+    numpy_ms = (time.perf_counter() - start) * 1000
+    print(f"haversine по {len(points)} точкам: цикл {loop_ms:.2f} ms, NumPy {numpy_ms:.2f} ms")
+    return passed
+
+
+async def bench_geo_cells(session: AsyncSession, radius_km: float, runs: int) -> bool:
+    """Сверка geo_cell из БД с geo_cells.cell_id и время запросов с предварительным отбором по ячейкам."""
+    rows = (await session.execute(
+        select(Building.id, Building.latitude, Building.longitude, Building.geo_cell)
+        .order_by(func.random())
+        .limit(10_000)
+    )).all()
+    mismatches = [row.id for row in rows if cell_id(row.latitude, row.longitude) != row.geo_cell]
+    print(f"{'OK  ' if not mismatches else 'FAIL'} geo_cell: расхождений {len(mismatches)} из {len(rows)}")
+
+    delta = radius_km / 111
+
+    def radius_query(lat, lon):
+        return select(func.count()).where(within_radius(lat, lon, radius_km), Building.is_deleted == False)
+
+    def radius_cells_query(lat, lon):
+        return radius_query(lat, lon).where(cells_in_radius(lat, lon, radius_km))
+
+    def bbox_query(lat, lon):
+        return select(func.count()).where(
+            within_bbox(lat - delta, lon - delta, lat + delta, lon + delta), Building.is_deleted == False
+        )
+
+    def bbox_cells_query(lat, lon):
+        return bbox_query(lat, lon).where(cells_in_bbox(lat - delta, lon - delta, lat + delta, lon + delta))
+
+    await run_case(session, "радиус", radius_query, runs)
+    await run_case(session, "радиус + geo_cell", radius_cells_query, runs)
+    await run_case(session, "прямоугольник", bbox_query, runs)
+    await run_case(session, "прямоугольник + geo_cell", bbox_cells_query, runs)
+    return not mismatches
+
+
+async def bench_nearby_batch(session: AsyncSession, points: int, radius_km: float) -> bool:
+    """Пакетный поиск вокруг многих точек одним запросом против запроса /nearby на каждую точку."""
+    repository = OrganizationRepository(Organization, session)
+    waypoints = [
+        (CENTER_LAT + (random.random() - 0.5) * SPREAD_DEG / 2, CENTER_LON + (random.random() - 0.5) * SPREAD_DEG / 2)
+        for _ in range(points)
+    ]
+    limit = settings.max_page_size
+
+    start = time.perf_counter()
+    single = [await repository.list_in_radius(lat, lon, radius_km, limit=limit) for lat, lon in waypoints]
+    single_ms = (time.perf_counter() - start) * 1000
+
+    session.expunge_all()
+    start = time.perf_counter()
+    point_groups, _ = await repository.list_nearby_batch(waypoints, [], radius_km, limit)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    # Сравниваются только полные группы: при обрезке по limit порядок отбора разный (id и расстояние)
+    mismatches = sum(
+        {org.id for org in page.items} != {org.id for org, _ in rows}
+        for page, (rows, truncated) in zip(single, point_groups)
+        if page.next_cursor is None and not truncated
+    )
+    print(f"{'OK  ' if not mismatches else 'FAIL'} точек {points}, радиус {radius_km} км: расхождений {mismatches}")
+    print(f"     по запросу на точку {single_ms:9.2f} ms")
+    print(f"     одним запросом      {batch_ms:9.2f} ms")
+    return not mismatches
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки запросов к БД")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="Наполнить таблицы синтетическими данными")
+    seed.add_argument("--buildings", type=int, default=1_000_000)
+    seed.add_argument("--organizations", type=int, default=0)
+    seed.add_argument("--links", type=int, default=0)
+
+    radius = commands.add_parser("radius", help="Поиск зданий в радиусе")
+    radius.add_argument("--radius-km", type=float, default=1.0)
+    radius.add_argument("--runs", type=int, default=20)
+
+    nearest = commands.add_parser("nearest", help="K ближайших зданий")
+    nearest.add_argument("--limit", type=int, default=20)
+    nearest.add_argument("--runs", type=int, default=20)
+
+    search = commands.add_parser("search", help="Поиск организаций по названию")
+    search.add_argument("--query", default="Торг")
+    search.add_argument("--limit", type=int, default=20)
+    search.add_argument("--runs", type=int, default=20)
+
+    buildings = commands.add_parser("buildings", help="Загрузка зданий вместе с организациями")
+    buildings.add_argument("--radius-km", type=float, default=1.0)
+    buildings.add_argument("--runs", type=int, default=5)
+
+    organizations = commands.add_parser("organizations", help="Организации в радиусе: join против EXISTS")
+    organizations.add_argument("--radius-km", type=float, default=1.0)
+    organizations.add_argument("--runs", type=int, default=20)
+
+    by_activity = commands.add_parser("by-activity", help="Организации по деятельности")
+    by_activity.add_argument("--runs", type=int, default=20)
+
+    serialization = commands.add_parser("serialization", help="Сериализация ответов списочных эндпоинтов")
+    serialization.add_argument("--radius-km", type=float, default=1.0)
+    serialization.add_argument("--runs", type=int, default=20)
+
+    sql_json = commands.add_parser("sql-json", help="Режим SQL JSON: сверка с ORM и время")
+    sql_json.add_argument("--radius-km", type=float, default=1.0)
+    sql_json.add_argument("--activity-id", type=int, default=1)
+    sql_json.add_argument("--runs", type=int, default=10)
+
+    spatial = commands.add_parser("spatial", help="Индекс зданий в памяти: сверка с PostGIS и время")
+    spatial.add_argument("--radius-km", type=float, default=1.0)
+    spatial.add_argument("--limit", type=int, default=20)
+    spatial.add_argument("--runs", type=int, default=50)
+
+    geo_cells = commands.add_parser("geo-cells", help="Ячейки geo_cell: сверка с Python и предварительный отбор")
+    geo_cells.add_argument("--radius-km", type=float, default=1.0)
+    geo_cells.add_argument("--runs", type=int, default=20)
+
+    nearby_batch = commands.add_parser("nearby-batch", help="Пакетный поиск организаций вокруг многих точек")
+    nearby_batch.add_argument("--points", type=int, default=300)
+    nearby_batch.add_argument("--radius-km", type=float, default=0.5)
+
+    args = parser.parse_args()
+
+    async with async_session_maker() as session:
+        if args.command == "seed":
+            if args.buildings:
+                await seed_buildings(session, args.buildings)
+            if args.organizations:
+                await seed_organizations(session, args.organizations)
+            if args.links:
+                await seed_links(session, args.links)
+        elif args.command == "radius":
+            await bench_radius(session, args.radius_km, args.runs)
+        elif args.command == "nearest":
+            await bench_nearest(session, args.limit, args.runs)
+        elif args.command == "search":
+            await bench_search(session, args.query, args.limit, args.runs)
+        elif args.command == "buildings":
+            await bench_buildings(session, args.radius_km, args.runs)
+        elif args.command == "organizations":
+            await bench_organizations(session, args.radius_km, args.runs)
+        elif args.command == "by-activity":
+            await bench_by_activity(session, args.runs)
+        elif args.command == "serialization":
+            await bench_serialization(session, args.radius_km, args.runs)
+        elif args.command == "sql-json":
+            if not await bench_sql_json(session, args.radius_km, args.activity_id, args.runs):
+                sys.exit(1)
+        elif args.command == "spatial":
+            if not await bench_spatial(session, args.radius_km, args.limit, args.runs):
+                sys.exit(1)
+        elif args.command == "geo-cells":
+            if not await bench_geo_cells(session, args.radius_km, args.runs):
+                sys.exit(1)
+        elif args.command == "nearby-batch":
+            if not await bench_nearby_batch(session, args.points, args.radius_km):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
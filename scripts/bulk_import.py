@@ -0,0 +1,47 @@
+"""
+Массовый импорт реестра организаций через COPY.
+
+Примеры:
+    python3 -m scripts.bulk_import registry.csv
+    python3 -m scripts.bulk_import registry.ndjson --batch-size 50000
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from src.core.database import async_session_maker
+from src.exceptions import ImportFormatError
+from src.repositories.import_repo import ImportRepository
+from src.services.import_service import ImportService, READERS
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Массовый импорт организаций из CSV или NDJSON")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=sorted(READERS), help="по умолчанию — по расширению файла")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="строк в одном COPY")
+    args = parser.parse_args()
+
+    file_format = args.format or args.path.suffix.lstrip(".").lower()
+
+    async with async_session_maker() as session:
+        service = ImportService(ImportRepository(session))
+        try:
+            stats = await service.import_file(args.path, file_format, args.batch_size)
+        except ImportFormatError as e:
+            print(f"Ошибка импорта: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    print(f"Строк в файле: {stats.rows}")
+    print(f"COPY: {stats.copy_seconds:.1f} с, слияние: {stats.merge_seconds:.1f} с")
+    print(f"Скорость: {stats.rows_per_second:,.0f} строк/с")
+    print(f"Создано зданий: {stats.buildings_created}")
+    print(f"Создано организаций: {stats.organizations_created}, обновлено: {stats.organizations_updated}")
+    print(f"Создано связей с деятельностями: {stats.links_created}")
+    if stats.unknown_activities:
+        print(f"Неизвестные деятельности (пропущены): {', '.join(stats.unknown_activities)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
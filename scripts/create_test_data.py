@@ -7,6 +7,7 @@ from sqlalchemy import select, delete
 from src.core.database import async_session_maker
 from src.models import Building, Organization, Activity
 from src.models.organization import org_activity
+from src.repositories.activity_repo import ActivityRepository
 
 
 class TestDataGenerator:
@@ -149,6 +150,9 @@ class TestDataGenerator:
         session.add_all(activities)
         await session.commit()
 
+        # Деятельности добавлены в обход репозитория — строим таблицу замыкания
+        await ActivityRepository(Activity, session).rebuild_closure()
+
         # Обновляем объекты чтобы получить их ID
         for activity in activities:
             await session.refresh(activity)
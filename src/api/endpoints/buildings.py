@@ -1,8 +1,11 @@
 from typing import List
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
 
+from src.api.pagination import PageParams, get_page_params, paginated
+from src.api.serializers import serialize_building, serialize_building_distance
 from src.core.deps import get_building_service
-from src.schemas.building import BuildingBase
+from src.schemas.building import BuildingBase, BuildingClusters, BuildingDistance
 from src.services.building_service import BuildingService
 
 router = APIRouter(prefix="/buildings", tags=["Здания"])
@@ -14,9 +17,22 @@ async def search_buildings_in_bbox(
         lon1: float = Query(..., description="Минимальная долгота (юго-запад)"),
         lat2: float = Query(..., description="Максимальная широта (северо-восток)"),
         lon2: float = Query(..., description="Максимальная долгота (северо-восток)"),
+        page: PageParams = Depends(get_page_params),
         service: BuildingService = Depends(get_building_service)
 ):
-    return await service.list_in_bbox(lat1, lon1, lat2, lon2)
+    return paginated(await service.list_in_bbox(lat1, lon1, lat2, lon2, page.cursor, page.limit), serialize_building)
+
+
+@router.get("/bbox/clusters", response_model=BuildingClusters, summary="Здания в bounding box, агрегированные по сетке")
+async def list_bbox_clusters(
+        lat1: float = Query(..., description="Минимальная широта (юго-запад)"),
+        lon1: float = Query(..., description="Минимальная долгота (юго-запад)"),
+        lat2: float = Query(..., description="Максимальная широта (северо-восток)"),
+        lon2: float = Query(..., description="Максимальная долгота (северо-восток)"),
+        service: BuildingService = Depends(get_building_service)
+):
+    """Ячейки сетки с числом зданий и организаций и центром масс вместо списка зданий."""
+    return await service.list_bbox_clusters(lat1, lon1, lat2, lon2)
 
 
 @router.get("/nearby", response_model=list[BuildingBase], summary="Поиск зданий в заданном радиусе")
@@ -24,7 +40,24 @@ async def list_in_radius(
         latitude: float = Query(..., description="Широта центра"),
         longitude: float = Query(..., description="Долгота центра"),
         radius_km: float = Query(1.0, description="Радиус поиска в километрах"),
+        page: PageParams = Depends(get_page_params),
         service: BuildingService = Depends(get_building_service)
 ):
     """Список организаций в радиусе от точки."""
-    return await service.list_in_radius(latitude, longitude, radius_km)
+    return paginated(
+        await service.list_in_radius(latitude, longitude, radius_km, page.cursor, page.limit), serialize_building
+    )
+
+
+@router.get("/nearest", response_model=list[BuildingDistance], summary="Ближайшие к точке здания")
+async def list_nearest(
+        latitude: float = Query(..., description="Широта точки"),
+        longitude: float = Query(..., description="Долгота точки"),
+        limit: int = Query(20, ge=1, le=100, description="Количество зданий"),
+        activity_id: int | None = Query(None, description="ID вида деятельности организаций в здании"),
+        name: str | None = Query(None, description="Часть названия организации в здании"),
+        service: BuildingService = Depends(get_building_service)
+):
+    """K ближайших зданий, отсортированных по расстоянию от точки."""
+    rows = await service.list_nearest(latitude, longitude, limit, activity_id, name)
+    return ORJSONResponse([serialize_building_distance(row) for row in rows])
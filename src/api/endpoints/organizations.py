@@ -1,7 +1,23 @@
-from fastapi import APIRouter, Query, Path, Depends, HTTPException
-
-from src.core.deps import get_organization_service
-from src.schemas.organization import OrganizationBase
+from fastapi import APIRouter, Body, Query, Path, Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+
+from src.api.pagination import PageParams, get_page_params, paginated, paginated_json
+from src.api.serializers import serialize_organization, serialize_organization_distance
+from src.api.streaming import NDJSON_RESPONSES, ndjson_response, ndjson_text_response, wants_ndjson
+from src.core import settings
+from src.core.deps import get_organization_service, get_organization_write_service
+from src.schemas.organization import (
+    BulkIds,
+    BulkResult,
+    NearbyBatchRequest,
+    NearbyBatchResult,
+    OrganizationBase,
+    OrganizationBatch,
+    OrganizationClusters,
+    OrganizationCreate,
+    OrganizationDistance,
+    OrganizationUpdate,
+)
 from src.services.organization_service import OrganizationService
 
 router = APIRouter(prefix="/organizations", tags=["Организации"])
@@ -10,10 +26,11 @@ router = APIRouter(prefix="/organizations", tags=["Организации"])
 @router.get("/search", response_model=list[OrganizationBase],  summary="Поиск организаций по вхождению в название")
 async def search_by_name(
         query: str = Query(..., description="Часть названия организации"),
+        page: PageParams = Depends(get_page_params),
         service: OrganizationService = Depends(get_organization_service),
 ):
-    """Поиск организаций по названию."""
-    return await service.search_by_name(query)
+    """Поиск организаций по названию, наиболее похожие — первыми."""
+    return paginated(await service.search_by_name(query, page.cursor, page.limit), serialize_organization)
 
 
 @router.get("/nearby", response_model=list[OrganizationBase],  summary="Поиск организаций в заданном радиусе")
@@ -21,22 +38,122 @@ async def list_in_radius(
     latitude: float = Query(..., description="Широта центра"),
     longitude: float = Query(..., description="Долгота центра"),
     radius_km: float = Query(1.0, description="Радиус поиска в километрах"),
+    page: PageParams = Depends(get_page_params),
     service: OrganizationService = Depends(get_organization_service)
 ):
     """Список организаций в радиусе от точки."""
-    return await service.list_in_radius(latitude, longitude, radius_km)
-
-
-@router.get("/bbox", response_model=list[OrganizationBase],  summary="Поиск организаций в bounding box")
+    if settings.sql_json_responses:
+        return paginated_json(
+            await service.list_in_radius_json(latitude, longitude, radius_km, page.cursor, page.limit)
+        )
+    return paginated(
+        await service.list_in_radius(latitude, longitude, radius_km, page.cursor, page.limit), serialize_organization
+    )
+
+
+@router.get(
+    "/bbox", response_model=list[OrganizationBase], responses=NDJSON_RESPONSES,
+    summary="Поиск организаций в bounding box"
+)
 async def list_in_bbox(
+    request: Request,
     lat1: float = Query(..., description="Минимальная широта (юго-запад)"),
     lon1: float = Query(..., description="Минимальная долгота (юго-запад)"),
     lat2: float = Query(..., description="Максимальная широта (северо-восток)"),
     lon2: float = Query(..., description="Максимальная долгота (северо-восток)"),
+    page: PageParams = Depends(get_page_params),
     service: OrganizationService = Depends(get_organization_service)
 ):
     """Список организаций в прямоугольной области."""
-    return await service.list_in_bbox(lat1, lon1, lat2, lon2)
+    if settings.sql_json_responses:
+        if wants_ndjson(request):
+            return ndjson_text_response(service.stream_in_bbox_json(lat1, lon1, lat2, lon2))
+        return paginated_json(await service.list_in_bbox_json(lat1, lon1, lat2, lon2, page.cursor, page.limit))
+
+    if wants_ndjson(request):
+        return ndjson_response(service.stream_in_bbox(lat1, lon1, lat2, lon2), serialize_organization)
+    return paginated(await service.list_in_bbox(lat1, lon1, lat2, lon2, page.cursor, page.limit), serialize_organization)
+
+
+@router.get(
+    "/bbox/clusters", response_model=OrganizationClusters,
+    summary="Организации в bounding box, агрегированные по сетке"
+)
+async def list_bbox_clusters(
+    lat1: float = Query(..., description="Минимальная широта (юго-запад)"),
+    lon1: float = Query(..., description="Минимальная долгота (юго-запад)"),
+    lat2: float = Query(..., description="Максимальная широта (северо-восток)"),
+    lon2: float = Query(..., description="Максимальная долгота (северо-восток)"),
+    service: OrganizationService = Depends(get_organization_service)
+):
+    """
+    Вместо списка организаций — ячейки сетки с числом организаций, центром масс и
+    самыми частыми деятельностями. Размер ячейки зависит от размера прямоугольника,
+    поэтому объём ответа ограничен при любой плотности.
+    """
+    return await service.list_bbox_clusters(lat1, lon1, lat2, lon2)
+
+
+@router.get("/nearest", response_model=list[OrganizationDistance],  summary="Ближайшие к точке организации")
+async def list_nearest(
+    latitude: float = Query(..., description="Широта точки"),
+    longitude: float = Query(..., description="Долгота точки"),
+    limit: int = Query(20, ge=1, le=100, description="Количество организаций"),
+    activity_id: int | None = Query(None, description="ID вида деятельности"),
+    name: str | None = Query(None, description="Часть названия организации"),
+    service: OrganizationService = Depends(get_organization_service)
+):
+    """K ближайших организаций, отсортированных по расстоянию от точки."""
+    rows = await service.list_nearest(latitude, longitude, limit, activity_id, name)
+    return ORJSONResponse([serialize_organization_distance(row) for row in rows])
+
+
+@router.post(
+    "/nearby/batch", response_model=NearbyBatchResult,
+    summary="Поиск организаций вокруг многих точек и в многих прямоугольниках"
+)
+async def list_nearby_batch(
+        body: NearbyBatchRequest,
+        service: OrganizationService = Depends(get_organization_service),
+):
+    """
+    Организации в радиусе radius_km от каждой точки и в каждом прямоугольнике
+    (всего до BULK_MAX_ITEMS входов) одним SQL-запросом вместо вызова /nearby на каждую точку.
+    Результаты сгруппированы по входам в порядке запроса, не больше limit организаций на вход;
+    truncated — найдено больше, чем вернулось.
+    """
+    batch = await service.list_nearby_batch(
+        [(point.latitude, point.longitude) for point in body.points],
+        [(box.lat1, box.lon1, box.lat2, box.lon2) for box in body.boxes],
+        body.radius_km,
+        body.limit,
+    )
+    return ORJSONResponse({
+        "points": [
+            {"items": [serialize_organization_distance(row) for row in group["items"]], "truncated": group["truncated"]}
+            for group in batch["points"]
+        ],
+        "boxes": [
+            {"items": [serialize_organization(org) for org in group["items"]], "truncated": group["truncated"]}
+            for group in batch["boxes"]
+        ],
+    })
+
+
+@router.post("/batch", response_model=OrganizationBatch, summary="Посмотреть несколько организаций по id")
+async def get_many(
+        body: BulkIds,
+        service: OrganizationService = Depends(get_organization_service),
+):
+    """
+    Организации по списку идентификаторов (до BULK_MAX_ITEMS) в порядке запроса.
+    Ненайденные и удалённые id возвращаются в missing, а не приводят к ошибке.
+    """
+    batch = await service.get_many(body.ids)
+    return ORJSONResponse({
+        "items": [serialize_organization(org) for org in batch["items"]],
+        "missing": batch["missing"],
+    })
 
 
 @router.get("/{org_id}", response_model=OrganizationBase,  summary="Посмотреть организацию по id")
@@ -48,35 +165,81 @@ async def get_organization(
     org = await service.get_by_id(org_id)
     if not org:
         raise HTTPException(status_code=404, detail="Организация не найдена")
-    return org
+    return ORJSONResponse(serialize_organization(org))
 
 
 @router.get("/by_building/{building_id}", response_model=list[OrganizationBase],  summary="Поиск организаций в определенном здание")
 async def list_by_building(
         building_id: int,
+        page: PageParams = Depends(get_page_params),
         service: OrganizationService = Depends(get_organization_service),
 ):
     """Список всех организаций, находящихся в конкретном здании."""
-    return await service.list_by_building(building_id)
+    return paginated(await service.list_by_building(building_id, page.cursor, page.limit), serialize_organization)
 
 
 @router.get("/by_activity/{activity_id}", response_model=list[OrganizationBase],  summary="Поиск организаций по определенной деятельности")
 async def list_by_activity(
         activity_id: int,
+        page: PageParams = Depends(get_page_params),
         service: OrganizationService = Depends(get_organization_service),
 ):
     """Список всех организаций, относящихся к указанному виду деятельности."""
-    return await service.list_by_activity(activity_id)
+    return paginated(await service.list_by_activity(activity_id, page.cursor, page.limit), serialize_organization)
 
 
-@router.get("/by_activity_tree/{activity_id}", response_model=list[OrganizationBase],  summary="Поиск организаций с учетом вложенности деятельностей")
+@router.get(
+    "/by_activity_tree/{activity_id}", response_model=list[OrganizationBase], responses=NDJSON_RESPONSES,
+    summary="Поиск организаций с учетом вложенности деятельностей"
+)
 async def list_by_activity_tree(
         activity_id: int,
+        request: Request,
+        page: PageParams = Depends(get_page_params),
         service: OrganizationService = Depends(get_organization_service),
 ):
     """
     Поиск по виду деятельности (включая все вложенные до 3 уровней).
     Например: Еда → Мясная продукция → Колбасы.
     """
-    return await service.list_by_activity_tree(activity_id)
+    if settings.sql_json_responses:
+        if wants_ndjson(request):
+            return ndjson_text_response(service.stream_by_activity_tree_json(activity_id))
+        return paginated_json(await service.list_by_activity_tree_json(activity_id, page.cursor, page.limit))
+
+    if wants_ndjson(request):
+        return ndjson_response(service.stream_by_activity_tree(activity_id), serialize_organization)
+    return paginated(await service.list_by_activity_tree(activity_id, page.cursor, page.limit), serialize_organization)
+
 
+@router.post("/bulk", response_model=list[OrganizationBase], status_code=201, summary="Пакетное создание организаций")
+async def create_many(
+        organizations: list[OrganizationCreate] = Body(..., min_length=1, max_length=settings.bulk_max_items),
+        service: OrganizationService = Depends(get_organization_write_service),
+):
+    """Создание до BULK_MAX_ITEMS организаций одной транзакцией. Порядок ответа совпадает с порядком запроса."""
+    created = await service.create_many([organization.model_dump() for organization in organizations])
+    return ORJSONResponse([serialize_organization(org) for org in created], status_code=201)
+
+
+@router.patch("/bulk", response_model=BulkResult, summary="Пакетное обновление организаций")
+async def update_many(
+        organizations: list[OrganizationUpdate] = Body(..., min_length=1, max_length=settings.bulk_max_items),
+        service: OrganizationService = Depends(get_organization_write_service),
+):
+    """
+    Обновление до BULK_MAX_ITEMS организаций одной транзакцией; меняются только переданные поля.
+    Ненайденные и удалённые организации пропускаются и возвращаются в missing.
+    """
+    return await service.update_many(
+        [organization.model_dump(exclude_none=True) for organization in organizations]
+    )
+
+
+@router.post("/bulk/delete", response_model=BulkResult, summary="Пакетное удаление организаций")
+async def soft_delete_many(
+        body: BulkIds,
+        service: OrganizationService = Depends(get_organization_write_service),
+):
+    """Пометка организаций удалёнными одним запросом к БД."""
+    return await service.soft_delete_many(body.ids)
@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+
+from src.core.activity_tree import activity_tree
+from src.core.cache import response_cache, tile_cache
+from src.core.database import engine, replica_router
+from src.core.spatial_index import spatial_index
+
+router = APIRouter(prefix="/system", tags=["Служебные"])
+
+
+@router.get("/metrics", summary="Метрики пула соединений и кэшей")
+async def get_metrics():
+    """Состояние пула соединений с БД и счётчики попаданий кэшей процесса."""
+    return {
+        "db_pool": engine.sync_engine.pool.stats(),
+        "read_replicas": replica_router.stats(),
+        "activity_tree": activity_tree.stats(),
+        "response_cache": response_cache.stats(),
+        "tile_cache": tile_cache.stats(),
+        "spatial_index": spatial_index.stats(),
+    }
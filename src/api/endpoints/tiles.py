@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
+
+from src.core.deps import get_building_service
+from src.services.building_service import BuildingService
+
+router = APIRouter(prefix="/tiles", tags=["Тайлы"])
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+MAX_ZOOM = 22
+
+
+@router.get(
+    "/{z}/{x}/{y}.mvt", response_class=Response,
+    responses={200: {"content": {MVT_MEDIA_TYPE: {}}, "description": "Векторный тайл (Mapbox Vector Tile)"}},
+    summary="Векторный тайл слоя зданий",
+)
+async def get_tile(
+        z: int = Path(..., ge=0, le=MAX_ZOOM, description="Уровень масштаба"),
+        x: int = Path(..., ge=0, description="Номер тайла по X"),
+        y: int = Path(..., ge=0, description="Номер тайла по Y"),
+        activity_id: int | None = Query(None, description="ID вида деятельности (включая вложенные)"),
+        service: BuildingService = Depends(get_building_service),
+):
+    """
+    Тайл слоя buildings в формате MVT. На мелких зумах здания объединены в кластеры
+    с атрибутами buildings и organizations, на крупных — отдельные здания
+    с атрибутами id, address и organizations (число организаций).
+    """
+    if x >= 2 ** z or y >= 2 ** z:
+        raise HTTPException(status_code=400, detail="Тайл вне сетки для этого уровня масштаба")
+
+    tile = await service.get_tile(z, x, y, activity_id)
+    return Response(content=tile, media_type=MVT_MEDIA_TYPE)
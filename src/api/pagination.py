@@ -0,0 +1,38 @@
+from dataclasses import dataclass
+from typing import Callable
+
+from fastapi import Query, Response
+from fastapi.responses import ORJSONResponse
+
+from src.core import settings
+from src.repositories.base import Page
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class PageParams:
+    cursor: str | None
+    limit: int
+
+
+def get_page_params(
+        cursor: str | None = Query(None, description="Курсор страницы (заголовок X-Next-Cursor предыдущего ответа)"),
+        limit: int = Query(
+            settings.default_page_size, ge=1, le=settings.max_page_size, description="Размер страницы"
+        ),
+) -> PageParams:
+    return PageParams(cursor=cursor, limit=limit)
+
+
+def paginated(page: Page, serialize: Callable[[object], dict]) -> ORJSONResponse:
+    """Отдаёт элементы страницы, курсор следующей страницы — в заголовке X-Next-Cursor."""
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else None
+    return ORJSONResponse([serialize(item) for item in page.items], headers=headers)
+
+
+def paginated_json(page: Page[str]) -> Response:
+    """Страница из готовых JSON-объектов (режим SQL JSON): склеивается в массив без разбора."""
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else None
+    body = "[" + ",".join(page.items) + "]"
+    return Response(body.encode(), media_type="application/json", headers=headers)
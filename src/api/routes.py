@@ -1,7 +1,9 @@
 from fastapi import APIRouter
-from src.api.endpoints import buildings, organizations
+from src.api.endpoints import buildings, organizations, system, tiles
 
 api_router = APIRouter()
 
 api_router.include_router(buildings.router)
 api_router.include_router(organizations.router)
+api_router.include_router(tiles.router)
+api_router.include_router(system.router)
@@ -0,0 +1,49 @@
+"""
+Быстрая сериализация ORM-объектов в словари той же формы, что и схемы ответа
+(ActivityBase, OrganizationBase, BuildingBase), без валидации Pydantic.
+Данные из БД уже прошли валидацию при записи, поэтому для ответов достаточно
+собрать словарь и закодировать его orjson. Схемы остаются описанием ответа в OpenAPI.
+"""
+from src.models import Activity, Building, Organization
+
+
+def serialize_activity(activity: Activity) -> dict:
+    return {
+        "id": activity.id,
+        "name": activity.name.strip(),
+        "parent_id": activity.parent_id,
+        "created_at": activity.created_at,
+        "updated_at": activity.updated_at,
+    }
+
+
+def serialize_organization(organization: Organization) -> dict:
+    return {
+        "id": organization.id,
+        "name": organization.name,
+        "phones": organization.phones,
+        "building_id": organization.building_id,
+        "activities": [serialize_activity(activity) for activity in organization.activities],
+        "created_at": organization.created_at,
+        "updated_at": organization.updated_at,
+    }
+
+
+def serialize_building(building: Building) -> dict:
+    return {
+        "id": building.id,
+        "address": building.address.strip(),
+        "latitude": building.latitude,
+        "longitude": building.longitude,
+        "organizations": [serialize_organization(organization) for organization in building.organizations],
+        "created_at": building.created_at,
+        "updated_at": building.updated_at,
+    }
+
+
+def serialize_organization_distance(row: dict) -> dict:
+    return {"distance_m": row["distance_m"], "organization": serialize_organization(row["organization"])}
+
+
+def serialize_building_distance(row: dict) -> dict:
+    return {"distance_m": row["distance_m"], "building": serialize_building(row["building"])}
@@ -0,0 +1,37 @@
+from typing import AsyncIterator, Callable
+
+import orjson
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Описание альтернативного формата ответа для OpenAPI
+NDJSON_RESPONSES = {
+    200: {
+        "content": {NDJSON_MEDIA_TYPE: {}},
+        "description": f"Список объектов; при Accept: {NDJSON_MEDIA_TYPE} — поток NDJSON без пагинации",
+    }
+}
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def ndjson_response(objects: AsyncIterator, serialize: Callable[[object], dict]) -> StreamingResponse:
+    """Поток NDJSON: каждый объект сериализуется и отправляется сразу после чтения из БД."""
+    async def body():
+        async for obj in objects:
+            yield orjson.dumps(serialize(obj), option=orjson.OPT_APPEND_NEWLINE)
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def ndjson_text_response(lines: AsyncIterator[str]) -> StreamingResponse:
+    """Поток NDJSON из готовых JSON-объектов (режим SQL JSON)."""
+    async def body():
+        async for line in lines:
+            yield line.encode() + b"\n"
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core import settings
+from src.core.database import async_session_maker
+from src.models import Activity
+
+
+class ActivityTree:
+    """
+    Дерево деятельностей в памяти процесса.
+
+    Дерево маленькое (до 3 уровней, сотни узлов) и меняется редко, поэтому
+    выборка поддерева считается без обращения к БД. Только для чтения: проверки
+    при записи (глубина вложенности) идут по таблице замыкания в сессии записи. Загружаются только
+    неудалённые деятельности. Кэш сбрасывается репозиторием при записи
+    (invalidate) и перечитывается по истечении ttl_seconds — так до других
+    процессов изменения доходят не позже чем через TTL. Перечитывается всегда
+    из основной БД: с отстающей реплики в кэш попало бы дерево до записи.
+    """
+
+    def __init__(self, ttl_seconds: float, session_maker: async_sessionmaker = async_session_maker):
+        self.ttl_seconds = ttl_seconds
+        self.session_maker = session_maker
+        self.hits = 0
+        self.misses = 0
+        self._parents: dict[int, int | None] = {}
+        self._children: dict[int, list[int]] = {}
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_fresh(self) -> bool:
+        if self._loaded_at is None:
+            return False
+        return self.ttl_seconds <= 0 or time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    async def load(self, session: AsyncSession):
+        result = await session.execute(
+            select(Activity.id, Activity.parent_id).where(Activity.is_deleted == False)
+        )
+        parents = dict(result.all())
+
+        children: dict[int, list[int]] = {activity_id: [] for activity_id in parents}
+        for activity_id, parent_id in parents.items():
+            if parent_id in children:
+                children[parent_id].append(activity_id)
+
+        self._parents = parents
+        self._children = children
+        self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    async def _ensure_loaded(self):
+        if self.is_fresh:
+            self.hits += 1
+            return
+
+        async with self._lock:
+            if self.is_fresh:
+                self.hits += 1
+                return
+            self.misses += 1
+            async with self.session_maker() as session:
+                await self.load(session)
+
+    async def descendant_ids(self, activity_id: int) -> list[int]:
+        """id деятельности и всех её потомков; пустой список, если её нет или она удалена."""
+        await self._ensure_loaded()
+        if activity_id not in self._parents:
+            return []
+
+        ids = []
+        stack = [activity_id]
+        while stack:
+            current = stack.pop()
+            ids.append(current)
+            stack.extend(self._children[current])
+        return ids
+
+    def stats(self) -> dict:
+        return {
+            "nodes": len(self._parents),
+            "hits": self.hits,
+            "misses": self.misses,
+            "fresh": self.is_fresh,
+        }
+
+
+activity_tree = ActivityTree(ttl_seconds=settings.activity_tree_ttl_seconds)
@@ -0,0 +1,90 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.core import settings
+from src.core.spatial_index import spatial_index
+
+
+class TTLCache:
+    """
+    LRU-кэш в памяти процесса с ограничением времени жизни записей.
+    При переполнении вытесняется запись, к которой дольше всего не обращались.
+
+    Значения вычисляются на сессии чтения, то есть, возможно, на реплике. Поэтому
+    settle_seconds после сброса (записи в основную БД) кэш ничего не сохраняет:
+    иначе ответ, посчитанный по отстающей реплике, держался бы в нём весь TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, settle_seconds: float = 0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.settle_seconds = settle_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._settled_at = 0.0
+
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any):
+        if time.monotonic() < self._settled_at:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self):
+        self._entries.clear()
+        self._settled_at = time.monotonic() + self.settle_seconds
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    media_type: str | None
+    etag: str
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+# Окно после записи, когда реплики могут ещё не содержать её (без реплик — не нужно)
+REPLICA_SETTLE_SECONDS = settings.read_replica_max_lag_seconds if settings.read_replica_urls else 0
+
+response_cache = TTLCache(
+    max_entries=settings.response_cache_max_entries,
+    ttl_seconds=settings.response_cache_ttl_seconds,
+    settle_seconds=REPLICA_SETTLE_SECONDS,
+)
+
+# Векторные тайлы: ключ — z/x/y и фильтр по деятельности, значение — байты MVT
+tile_cache = TTLCache(
+    max_entries=settings.tile_cache_max_entries,
+    ttl_seconds=settings.tile_cache_ttl_seconds,
+    settle_seconds=REPLICA_SETTLE_SECONDS,
+)
+
+
+def invalidate_caches():
+    """Сброс кэшей ответов после изменения данных; индекс в памяти обновится перед следующим запросом."""
+    response_cache.invalidate()
+    tile_cache.invalidate()
+    spatial_index.invalidate()
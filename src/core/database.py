@@ -1,5 +1,10 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from src.core import settings
 
 
@@ -7,18 +12,180 @@ class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(
-    settings.async_database_url,
-    echo=False,
-    future=True,
-    pool_pre_ping=True,
-)
+@dataclass
+class PoolMetrics:
+    """Счётчики выдачи соединений из пула."""
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    pings: int = 0
+    ping_failures: int = 0
+
+    def record_wait(self, seconds: float):
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Пул соединений, замеряющий время ожидания свободного соединения."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            **vars(self.metrics),
+        }
+
+
+def _ping_idle_connections(engine: AsyncEngine, idle_seconds: float):
+    """
+    Стратегия pre-ping "idle": соединение проверяется при выдаче, только если
+    оно простаивало в пуле дольше idle_seconds. Горячие соединения выдаются без
+    лишнего round trip.
+    """
+    @event.listens_for(engine.sync_engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+
+        metrics = engine.sync_engine.pool.metrics
+        metrics.pings += 1
+        try:
+            dbapi_connection.ping()
+        except Exception:
+            metrics.ping_failures += 1
+            # Пул отбросит соединение и выдаст новое
+            raise exc.DisconnectionError()
+
+
+def create_engine(url: str) -> AsyncEngine:
+    """Асинхронный движок с настройками пула и кэша подготовленных выражений из Settings."""
+    new_engine = create_async_engine(
+        url,
+        echo=False,
+        future=True,
+        poolclass=InstrumentedPool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping == "always",
+        connect_args={
+            # Кэш подготовленных выражений самого asyncpg
+            "statement_cache_size": settings.db_statement_cache_size,
+            # Кэш подготовленных выражений адаптера SQLAlchemy
+            "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+        },
+    )
+    if settings.db_pool_pre_ping == "idle":
+        _ping_idle_connections(new_engine, settings.db_pool_pre_ping_idle_seconds)
+    return new_engine
+
+
+class ReplicaRouter:
+    """
+    Выбор реплики для чтения по кругу (round-robin).
+    Реплика, к которой не удалось подключиться, исключается на retry_seconds.
+    """
+
+    def __init__(self, urls: list[str], retry_seconds: float):
+        self.engines = [create_engine(url) for url in urls]
+        self.retry_seconds = retry_seconds
+        self._session_makers = [
+            async_sessionmaker(replica, class_=AsyncSession, expire_on_commit=False)
+            for replica in self.engines
+        ]
+        self._down_until = [0.0] * len(self.engines)
+        self._next = 0
+
+    def candidates(self) -> list[int]:
+        """Индексы доступных реплик, начиная со следующей по очереди."""
+        count = len(self.engines)
+        if not count:
+            return []
+
+        start = self._next
+        self._next = (self._next + 1) % count
+        now = time.monotonic()
+        return [
+            index for index in ((start + offset) % count for offset in range(count))
+            if self._down_until[index] <= now
+        ]
+
+    def session(self, index: int) -> AsyncSession:
+        return self._session_makers[index]()
+
+    def mark_down(self, index: int):
+        self._down_until[index] = time.monotonic() + self.retry_seconds
+
+    def stats(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {"healthy": self._down_until[index] <= now, "pool": replica.sync_engine.pool.stats()}
+            for index, replica in enumerate(self.engines)
+        ]
+
+
+engine = create_engine(settings.async_database_url)
 
 async_session_maker = async_sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+replica_router = ReplicaRouter(settings.read_replica_urls, settings.read_replica_retry_seconds)
+
 
 async def get_session() -> AsyncSession:
     async with async_session_maker() as session:
         yield session
+
+
+async def _connect_replica() -> AsyncSession | None:
+    """Сессия на первой отвечающей реплике; None, если доступных реплик нет."""
+    for index in replica_router.candidates():
+        session = replica_router.session(index)
+        try:
+            # Соединение берётся сразу, чтобы недоступная реплика обнаружилась до запроса
+            await session.connection()
+        except (OSError, exc.DBAPIError):
+            await session.close()
+            replica_router.mark_down(index)
+            continue
+        return session
+    return None
+
+
+async def get_read_session() -> AsyncSession:
+    """Сессия только для чтения: на реплике, а если реплик нет или они недоступны — на основной БД."""
+    session = await _connect_replica()
+    if session is None:
+        session = async_session_maker()
+    async with session:
+        yield session
@@ -5,5 +5,9 @@ from src.repositories.organization_repo import OrganizationRepository
 from src.services.building_service import BuildingService
 from src.services.organization_service import OrganizationService
 
-get_building_service = get_service_factory(BuildingRepository, Building, BuildingService)
-get_organization_service = get_service_factory(OrganizationRepository, Organization, OrganizationService)
+get_building_service = get_service_factory(BuildingRepository, Building, BuildingService, read_only=True)
+get_organization_service = get_service_factory(
+    OrganizationRepository, Organization, OrganizationService, read_only=True
+)
+# Запись всегда идёт в основную БД
+get_organization_write_service = get_service_factory(OrganizationRepository, Organization, OrganizationService)
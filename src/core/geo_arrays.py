@@ -0,0 +1,118 @@
+"""
+Векторные гео-вычисления над массивами NumPy для точек, которые уже лежат в памяти
+(индекс зданий spatial_index): расстояния, маски прямоугольника и радиуса, K ближайших.
+Расстояния считаются на сфере того же радиуса, что и у PostGIS для geography
+с use_spheroid=false (ST_DWithin, <->), поэтому результаты совпадают с запросами к БД.
+"""
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+# Средний радиус Земли (R1 эллипсоида WGS 84), которым PostGIS считает расстояния на сфере
+EARTH_RADIUS_M = 6371008.7714
+
+# Запас прямоугольника вокруг круга (~0,1 мм) на погрешность округления: точка на самой
+# окружности, которую radius_mask считает внутри, не должна выпасть из прямоугольника
+BBOX_MARGIN_DEG = 1e-9
+
+
+@dataclass(frozen=True)
+class GeoPoints:
+    """Точки в непрерывных массивах: id по возрастанию и координаты в градусах."""
+    ids: np.ndarray
+    lat: np.ndarray
+    lon: np.ndarray
+
+    @classmethod
+    def from_mapping(cls, points: dict[int, tuple[float, float]]) -> "GeoPoints":
+        """{id: (latitude, longitude)} -> массивы, упорядоченные по id."""
+        ids = np.fromiter(sorted(points), dtype=np.int64, count=len(points))
+        coordinates = np.array([points[point_id] for point_id in ids.tolist()], dtype=np.float64).reshape(-1, 2)
+        return cls(
+            ids=ids,
+            lat=np.ascontiguousarray(coordinates[:, 0]),
+            lon=np.ascontiguousarray(coordinates[:, 1]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def haversine_m(latitude: float, longitude: float, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Расстояния в метрах от точки до каждой из точек (lat, lon)."""
+    lat1 = math.radians(latitude)
+    lat2 = np.radians(lat)
+    dlat = lat2 - lat1
+    dlon = np.radians(lon - longitude)
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def bbox_mask(lat: np.ndarray, lon: np.ndarray, lat1: float, lon1: float, lat2: float, lon2: float) -> np.ndarray:
+    """Маска точек внутри прямоугольника (границы включительно, как ST_Intersects)."""
+    lat1, lat2 = sorted((lat1, lat2))
+    lon1, lon2 = sorted((lon1, lon2))
+    return (lat >= lat1) & (lat <= lat2) & (lon >= lon1) & (lon <= lon2)
+
+
+def radius_mask(lat: np.ndarray, lon: np.ndarray, latitude: float, longitude: float, radius_m: float) -> np.ndarray:
+    """Маска точек не дальше radius_m от (latitude, longitude)."""
+    return haversine_m(latitude, longitude, lat, lon) <= radius_m
+
+
+def radius_bbox(latitude: float, longitude: float, radius_m: float) -> tuple[float, float, float, float]:
+    """
+    Прямоугольник (lat1, lon1, lat2, lon2), гарантированно содержащий круг радиуса radius_m.
+    Самые восточная и западная точки круга лежат на asin(sin(d) / cos(lat)) по долготе
+    (d — угловой радиус); круг, накрывающий полюс, занимает все долготы.
+    """
+    angle = radius_m / EARTH_RADIUS_M
+    delta_lat = math.degrees(angle)
+    lat1, lat2 = latitude - delta_lat - BBOX_MARGIN_DEG, latitude + delta_lat + BBOX_MARGIN_DEG
+    if lat1 <= -90.0 or lat2 >= 90.0 or angle >= math.pi / 2:
+        return max(lat1, -90.0), -180.0, min(lat2, 90.0), 180.0
+
+    delta_lon = math.degrees(math.asin(min(1.0, math.sin(angle) / math.cos(math.radians(latitude)))))
+    return lat1, longitude - delta_lon - BBOX_MARGIN_DEG, lat2, longitude + delta_lon + BBOX_MARGIN_DEG
+
+
+def split_antimeridian(
+        lat1: float, lon1: float, lat2: float, lon2: float,
+) -> list[tuple[float, float, float, float]]:
+    """
+    Прямоугольник с долготами за ±180° (например, из radius_bbox у линии перемены дат)
+    в виде одного или двух прямоугольников в пределах [-180, 180].
+    """
+    if lon2 - lon1 >= 360.0:
+        return [(lat1, -180.0, lat2, 180.0)]
+    if lon1 < -180.0:
+        return [(lat1, lon1 + 360.0, lat2, 180.0), (lat1, -180.0, lat2, lon2)]
+    if lon2 > 180.0:
+        return [(lat1, lon1, lat2, 180.0), (lat1, -180.0, lat2, lon2 - 360.0)]
+    return [(lat1, lon1, lat2, lon2)]
+
+
+def radius_bboxes(latitude: float, longitude: float, radius_m: float) -> list[tuple[float, float, float, float]]:
+    """radius_bbox, разрезанный по линии перемены дат: прямоугольники для отбора кандидатов."""
+    return split_antimeridian(*radius_bbox(latitude, longitude, radius_m))
+
+
+def top_k_nearest(
+        latitude: float,
+        longitude: float,
+        lat: np.ndarray,
+        lon: np.ndarray,
+        k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Позиции k ближайших точек и расстояния до них, по возрастанию расстояния.
+    argpartition отбирает k минимумов за O(n), сортируются только они.
+    """
+    distances = haversine_m(latitude, longitude, lat, lon)
+    if k < len(distances):
+        positions = np.argpartition(distances, k - 1)[:k]
+    else:
+        positions = np.arange(len(distances))
+    positions = positions[np.argsort(distances[positions], kind="stable")]
+    return positions, distances[positions]
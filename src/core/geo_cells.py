@@ -0,0 +1,89 @@
+"""
+Целочисленные ячейки сетки (Z-order, он же целочисленный geohash) для грубой
+пространственной группировки зданий.
+
+Широта и долгота квантуются до GEO_CELL_BITS бит каждая, биты чередуются
+(старший — долгота, как в geohash). Ячейка уровня level (бит на ось) — это префикс
+полного номера, поэтому все здания ячейки лежат в одном непрерывном диапазоне
+buildings.geo_cell и отбираются btree-индексом по диапазону.
+Функции повторяют SQL-функцию geo_cell_id (миграция f1a3c5e7b9d4) бит в бит.
+"""
+import math
+
+# Бит на ось для полного номера ячейки: 60 бит (12 символов geohash, ~2 см)
+GEO_CELL_BITS = 30
+
+
+def _quantize(value: float, offset: float, span: float, level: int) -> int:
+    scale = 1 << level
+    return min(max(math.floor((value + offset) / span * scale), 0), scale - 1)
+
+
+def _spread(value: int) -> int:
+    """Раздвигает биты числа через один: abc -> 0a0b0c."""
+    value &= 0x00000000FFFFFFFF
+    value = (value | (value << 16)) & 0x0000FFFF0000FFFF
+    value = (value | (value << 8)) & 0x00FF00FF00FF00FF
+    value = (value | (value << 4)) & 0x0F0F0F0F0F0F0F0F
+    value = (value | (value << 2)) & 0x3333333333333333
+    value = (value | (value << 1)) & 0x5555555555555555
+    return value
+
+
+def _compact(value: int) -> int:
+    """Обратное к _spread: собирает чётные биты."""
+    value &= 0x5555555555555555
+    value = (value | (value >> 1)) & 0x3333333333333333
+    value = (value | (value >> 2)) & 0x0F0F0F0F0F0F0F0F
+    value = (value | (value >> 4)) & 0x00FF00FF00FF00FF
+    value = (value | (value >> 8)) & 0x0000FFFF0000FFFF
+    value = (value | (value >> 16)) & 0x00000000FFFFFFFF
+    return value
+
+
+def _interleave(row: int, col: int) -> int:
+    return (_spread(col) << 1) | _spread(row)
+
+
+def cell_id(latitude: float, longitude: float, level: int = GEO_CELL_BITS) -> int:
+    """Номер ячейки уровня level, содержащей точку."""
+    row = _quantize(latitude, 90.0, 180.0, GEO_CELL_BITS)
+    col = _quantize(longitude, 180.0, 360.0, GEO_CELL_BITS)
+    return _interleave(row, col) >> (2 * (GEO_CELL_BITS - level))
+
+
+def cell_range(cell: int, level: int) -> tuple[int, int]:
+    """Диапазон полных номеров [low, high) зданий ячейки уровня level."""
+    shift = 2 * (GEO_CELL_BITS - level)
+    return cell << shift, (cell + 1) << shift
+
+
+def cell_bounds(latitude: float, longitude: float, level: int) -> tuple[float, float, float, float]:
+    """Границы (lat1, lon1, lat2, lon2) ячейки уровня level, содержащей точку."""
+    lat_span, lon_span = 180.0 / (1 << level), 360.0 / (1 << level)
+    row = _quantize(latitude, 90.0, 180.0, level)
+    col = _quantize(longitude, 180.0, 360.0, level)
+    return row * lat_span - 90.0, col * lon_span - 180.0, (row + 1) * lat_span - 90.0, (col + 1) * lon_span - 180.0
+
+
+def cover_bbox(lat1: float, lon1: float, lat2: float, lon2: float, max_cells: int) -> list[tuple[int, int]]:
+    """
+    Диапазоны [low, high) полных номеров, покрывающие прямоугольник ячейками
+    самого мелкого уровня, при котором ячеек не больше max_cells. Соседние диапазоны сливаются.
+    """
+    lat1, lat2 = sorted((lat1, lat2))
+    lon1, lon2 = sorted((lon1, lon2))
+    for level in range(GEO_CELL_BITS, -1, -1):
+        rows = range(_quantize(lat1, 90.0, 180.0, level), _quantize(lat2, 90.0, 180.0, level) + 1)
+        cols = range(_quantize(lon1, 180.0, 360.0, level), _quantize(lon2, 180.0, 360.0, level) + 1)
+        if len(rows) * len(cols) <= max_cells or level == 0:
+            break
+
+    ranges = sorted(cell_range(_interleave(row, col), level) for row in rows for col in cols)
+    merged = [ranges[0]]
+    for low, high in ranges[1:]:
+        if low == merged[-1][1]:
+            merged[-1] = (merged[-1][0], high)
+        else:
+            merged.append((low, high))
+    return merged
@@ -1,7 +1,14 @@
-from fastapi import Request
+import hashlib
+import math
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
 from fastapi.responses import JSONResponse
 
+from src.api.streaming import NDJSON_MEDIA_TYPE
 from src.core import settings
+from src.core.cache import CachedResponse, response_cache
+from src.core.geo_cells import cell_bounds
 
 
 async def api_key_middleware(request: Request, call_next):
@@ -13,3 +20,109 @@ async def api_key_middleware(request: Request, call_next):
         return JSONResponse(status_code=401, content={"detail": "Invalid API Key"})
 
     return await call_next(request)
+
+
+# Префиксы путей, ответы которых кэшируются
+CACHED_PATH_PREFIXES = ("/api/v1/organizations", "/api/v1/buildings")
+BBOX_PARAMS = ("lat1", "lon1", "lat2", "lon2")
+# Заголовки ответа, которые сохраняются вместе с телом
+CACHED_HEADERS = ("x-next-cursor",)
+
+
+def _bbox(params: list[tuple[str, str]]) -> tuple[float, float, float, float] | None:
+    """Прямоугольник запроса (lat1, lon1, lat2, lon2) с упорядоченными границами или None."""
+    values = dict(params)
+    try:
+        lat1, lon1, lat2, lon2 = (float(values[name]) for name in BBOX_PARAMS)
+    except (KeyError, ValueError):
+        return None
+    if not all(math.isfinite(value) for value in (lat1, lon1, lat2, lon2)):
+        return None
+    return min(lat1, lat2), min(lon1, lon2), max(lat1, lat2), max(lon1, lon2)
+
+
+def _expand_to_grid(bbox: tuple[float, float, float, float], grid: float) -> tuple[float, float, float, float]:
+    lat1, lon1, lat2, lon2 = bbox
+    return (
+        math.floor(lat1 / grid) * grid, math.floor(lon1 / grid) * grid,
+        math.ceil(lat2 / grid) * grid, math.ceil(lon2 / grid) * grid,
+    )
+
+
+def _expand_to_cells(bbox: tuple[float, float, float, float], level: int) -> tuple[float, float, float, float]:
+    lat1, lon1, lat2, lon2 = bbox
+    low_lat, low_lon, _, _ = cell_bounds(lat1, lon1, level)
+    _, _, high_lat, high_lon = cell_bounds(lat2, lon2, level)
+    return low_lat, low_lon, high_lat, high_lon
+
+
+def normalize_query(request: Request) -> str:
+    """
+    Параметры запроса в каноническом виде: отсортированы, прямоугольник lat1/lon1/lat2/lon2
+    расширен наружу до границ ячеек geo_cell (response_cache_cell_level) или сетки в градусах.
+    Расширенный прямоугольник содержит исходный, поэтому ответ по нему не теряет объектов.
+    Центры радиусов не трогаются: сдвиг центра меняет и состав ответа, и расстояния.
+    """
+    params = sorted(request.query_params.multi_items())
+    grid = settings.response_cache_grid_deg
+    level = settings.response_cache_cell_level
+    bbox = _bbox(params)
+    if bbox is None or (level <= 0 and grid <= 0):
+        return urlencode(params)
+
+    expanded = _expand_to_cells(bbox, level) if level > 0 else _expand_to_grid(bbox, grid)
+    # str(float) — кратчайшая точная запись: округление могло бы сдвинуть границу внутрь
+    snapped = {name: str(value) for name, value in zip(BBOX_PARAMS, expanded)}
+    return urlencode([(key, snapped.get(key, value)) for key, value in params])
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+
+
+async def response_cache_middleware(request: Request, call_next):
+    """
+    Кэш ответов справочных GET-эндпоинтов с поддержкой ETag / If-None-Match.
+
+    Прямоугольник расширяется до ячеек geo_cell (или сетки response_cache_grid_deg) прямо
+    в запросе, поэтому закэшированный ответ соответствует тому, что реально вычислялось.
+    Кэш сбрасывается репозиториями при записи (invalidate_caches).
+    """
+    if (
+        not settings.response_cache_enabled
+        or request.method != "GET"
+        or not request.url.path.startswith(CACHED_PATH_PREFIXES)
+        or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+    ):
+        return await call_next(request)
+
+    query_string = normalize_query(request)
+    request.scope["query_string"] = query_string.encode()
+    key = f"{request.url.path}?{query_string}"
+
+    cached = response_cache.get(key)
+    if cached is None:
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        cached = CachedResponse(
+            body=body,
+            media_type=response.media_type or response.headers.get("content-type"),
+            etag=f'"{hashlib.sha1(body).hexdigest()}"',
+            headers={name: response.headers[name] for name in CACHED_HEADERS if name in response.headers},
+        )
+        response_cache.set(key, cached)
+
+    if _etag_matches(request, cached.etag):
+        return Response(status_code=304, headers={"ETag": cached.etag})
+
+    return Response(
+        content=cached.body,
+        media_type=cached.media_type,
+        headers={**cached.headers, "ETag": cached.etag},
+    )
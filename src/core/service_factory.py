@@ -2,15 +2,19 @@ from typing import Type, Callable
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.database import get_session
+from src.core.database import get_session, get_read_session
 
 
 def get_service_factory(
         repo_class: Type,
         model_class: Type,
-        service_class: Type
+        service_class: Type,
+        read_only: bool = False
 ) -> Callable[[AsyncSession], object]:
-    async def _get_service(db: AsyncSession = Depends(get_session)):
+    """read_only=True — сервис работает через реплику для чтения (если она настроена)."""
+    session_dependency = get_read_session if read_only else get_session
+
+    async def _get_service(db: AsyncSession = Depends(session_dependency)):
         repo = repo_class(model_class, db)
         return service_class(repo)
 
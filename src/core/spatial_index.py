@@ -0,0 +1,218 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import shapely
+from shapely import STRtree
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core import settings
+from src.core.database import async_session_maker
+from src.core.geo_arrays import EARTH_RADIUS_M, GeoPoints, radius_bboxes, radius_mask, top_k_nearest
+from src.models import Activity, Building, Organization
+
+# Начальный радиус поиска K ближайших; удваивается, пока в круг не попадёт k зданий
+NEAREST_START_RADIUS_M = 500.0
+
+# Здание видно в гео-выборках, если оно не удалено и в нём есть организация с неудалённой деятельностью
+VISIBLE_BUILDING = and_(
+    Building.is_deleted == False,
+    Building.organizations.any(
+        and_(
+            Organization.is_deleted == False,
+            Organization.activities.any(Activity.is_deleted == False),
+        )
+    ),
+)
+
+
+class SpatialIndex:
+    """
+    Пространственный индекс видимых зданий в памяти процесса (STRtree из shapely).
+
+    Отвечает на "какие здания в прямоугольнике / радиусе" и "K ближайших зданий" без обращения
+    к PostGIS (расстояния считаются векторно, см. geo_arrays); сами объекты страницы
+    затем читаются из БД по первичному ключу. Индекс загружается
+    при старте и обновляется инкрементально: раз в spatial_refresh_seconds (или сразу
+    после записи в этом процессе) перечитываются здания, у которых или у организаций
+    которых изменился updated_at (уход организации из здания сдвигает updated_at здания
+    триггером, миграция a7c9e1b3d5f2). Изменение деятельностей приводит к полной
+    перезагрузке; физически удалённые строки уходят при плановой полной
+    перезагрузке раз в full_reload_seconds. Индекс читается из основной БД, а не с реплики:
+    иначе после записи он мог бы перечитаться с отстающей реплики и держать старые данные
+    до следующего обновления.
+    """
+
+    def __init__(
+            self,
+            refresh_seconds: float,
+            overlap_seconds: float,
+            full_reload_seconds: float,
+            session_maker: async_sessionmaker = async_session_maker,
+    ):
+        self.refresh_seconds = refresh_seconds
+        self.session_maker = session_maker
+        self.overlap_seconds = overlap_seconds
+        self.full_reload_seconds = full_reload_seconds
+        self.full_loads = 0
+        self.refreshes = 0
+        self._visible: dict[int, tuple[float, float]] = {}
+        self._watermark: datetime | None = None
+        self._activities_watermark: datetime | None = None
+        self._loaded_at: float | None = None
+        self._refreshed_at: float | None = None
+        self._dirty = False
+        self._points = GeoPoints.from_mapping({})
+        self._tree: STRtree | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_fresh(self) -> bool:
+        if self._refreshed_at is None or self._dirty:
+            return False
+        return time.monotonic() - self._refreshed_at < self.refresh_seconds
+
+    def invalidate(self):
+        """Отметка о записи в этом процессе: индекс обновится перед следующим запросом."""
+        self._dirty = True
+
+    async def _watermarks(self, session: AsyncSession) -> tuple[datetime | None, datetime | None]:
+        buildings = await session.scalar(select(func.max(Building.updated_at)))
+        organizations = await session.scalar(select(func.max(Organization.updated_at)))
+        activities = await session.scalar(select(func.max(Activity.updated_at)))
+        changes = max((value for value in (buildings, organizations) if value is not None), default=None)
+        return changes, activities
+
+    async def _read(self, session: AsyncSession, since: datetime | None):
+        query = select(Building.id, Building.latitude, Building.longitude, VISIBLE_BUILDING)
+        if since is not None:
+            changed_organization = (
+                select(Organization.id)
+                .where(Organization.building_id == Building.id, Organization.updated_at >= since)
+                .exists()
+            )
+            query = query.where(or_(Building.updated_at >= since, changed_organization))
+        return (await session.execute(query)).all()
+
+    async def load(self, session: AsyncSession):
+        """Полная загрузка индекса."""
+        watermark, activities_watermark = await self._watermarks(session)
+        rows = await self._read(session, None)
+
+        self._visible = {row[0]: (row[1], row[2]) for row in rows if row[3]}
+        self._watermark = watermark
+        self._activities_watermark = activities_watermark
+        self._rebuild()
+        self.full_loads += 1
+        self._loaded_at = self._refreshed_at = time.monotonic()
+        self._dirty = False
+
+    async def refresh(self, session: AsyncSession):
+        """Инкрементальное обновление по updated_at с перекрытием overlap_seconds."""
+        watermark, activities_watermark = await self._watermarks(session)
+        if (
+            self._watermark is None
+            or activities_watermark != self._activities_watermark
+            or time.monotonic() - self._loaded_at >= self.full_reload_seconds
+        ):
+            await self.load(session)
+            return
+
+        since = self._watermark - timedelta(seconds=self.overlap_seconds)
+        changed = False
+        for building_id, latitude, longitude, visible in await self._read(session, since):
+            if visible:
+                changed |= self._visible.get(building_id) != (latitude, longitude)
+                self._visible[building_id] = (latitude, longitude)
+            elif building_id in self._visible:
+                del self._visible[building_id]
+                changed = True
+
+        self._watermark = watermark or self._watermark
+        if changed:
+            self._rebuild()
+        self.refreshes += 1
+        self._refreshed_at = time.monotonic()
+        self._dirty = False
+
+    def _rebuild(self):
+        points = GeoPoints.from_mapping(self._visible)
+        self._points = points
+        self._tree = STRtree(shapely.points(points.lon, points.lat)) if len(points) else None
+
+    async def ensure_fresh(self):
+        if self.is_fresh:
+            return
+        async with self._lock:
+            if self.is_fresh:
+                return
+            async with self.session_maker() as session:
+                if self._refreshed_at is None:
+                    await self.load(session)
+                else:
+                    await self.refresh(session)
+
+    def _candidates(self, lat1: float, lon1: float, lat2: float, lon2: float) -> np.ndarray:
+        if self._tree is None:
+            return np.empty(0, dtype=np.int64)
+        return self._tree.query(shapely.box(lon1, lat1, lon2, lat2), predicate="intersects")
+
+    def _candidates_in_radius(self, latitude: float, longitude: float, radius_m: float) -> np.ndarray:
+        """Кандидаты из прямоугольника вокруг круга; у линии перемены дат — из двух прямоугольников."""
+        boxes = radius_bboxes(latitude, longitude, radius_m)
+        if len(boxes) == 1:
+            return self._candidates(*boxes[0])
+        return np.unique(np.concatenate([self._candidates(*box) for box in boxes]))
+
+    async def ids_in_bbox(self, lat1: float, lon1: float, lat2: float, lon2: float) -> np.ndarray:
+        """id видимых зданий в прямоугольнике (границы включительно, как ST_Intersects), по возрастанию."""
+        await self.ensure_fresh()
+        return np.sort(self._points.ids[self._candidates(lat1, lon1, lat2, lon2)])
+
+    async def ids_in_radius(self, latitude: float, longitude: float, radius_km: float) -> np.ndarray:
+        """id видимых зданий не дальше radius_km от точки (на сфере, как ST_DWithin), по возрастанию."""
+        await self.ensure_fresh()
+        radius_m = radius_km * 1000
+
+        # Кандидаты из прямоугольника, содержащего круг, затем точная проверка расстояния
+        candidates = self._candidates_in_radius(latitude, longitude, radius_m)
+        points = self._points
+        inside = radius_mask(points.lat[candidates], points.lon[candidates], latitude, longitude, radius_m)
+        return np.sort(points.ids[candidates[inside]])
+
+    async def nearest(self, latitude: float, longitude: float, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        id k ближайших видимых зданий и расстояния до них в метрах, по возрастанию расстояния.
+        Радиус поиска растёт, пока в круг не попадёт k зданий: k ближайших гарантированно внутри него.
+        """
+        await self.ensure_fresh()
+        points = self._points
+        radius_m = NEAREST_START_RADIUS_M
+        while radius_m < EARTH_RADIUS_M * np.pi:
+            candidates = self._candidates_in_radius(latitude, longitude, radius_m)
+            inside = candidates[radius_mask(points.lat[candidates], points.lon[candidates], latitude, longitude, radius_m)]
+            if len(inside) >= k:
+                break
+            radius_m *= 2
+        else:
+            inside = np.arange(len(points))
+
+        positions, distances = top_k_nearest(latitude, longitude, points.lat[inside], points.lon[inside], k)
+        return points.ids[inside[positions]], distances
+
+    def stats(self) -> dict:
+        return {
+            "buildings": len(self._points),
+            "full_loads": self.full_loads,
+            "refreshes": self.refreshes,
+            "fresh": self.is_fresh,
+        }
+
+
+spatial_index = SpatialIndex(
+    refresh_seconds=settings.spatial_refresh_seconds,
+    overlap_seconds=settings.spatial_refresh_overlap_seconds,
+    full_reload_seconds=settings.spatial_full_reload_seconds,
+)
@@ -1,5 +1,13 @@
-from src.exceptions.exceptions import DepthLimitExceededError
+from src.exceptions.exceptions import (
+    ActivityCycleError,
+    DepthLimitExceededError,
+    ImportFormatError,
+    InvalidCursorError,
+)
 
 __all__ = [
-    'DepthLimitExceededError'
+    'ActivityCycleError',
+    'DepthLimitExceededError',
+    'ImportFormatError',
+    'InvalidCursorError',
 ]
\ No newline at end of file
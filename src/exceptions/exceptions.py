@@ -1,3 +1,18 @@
 class DepthLimitExceededError(Exception):
     """Превышен лимит глубины дерева Activity."""
-    pass
\ No newline at end of file
+    pass
+
+
+class InvalidCursorError(Exception):
+    """Некорректный курсор пагинации."""
+    pass
+
+
+class ActivityCycleError(Exception):
+    """Перенос деятельности внутрь собственного поддерева."""
+    pass
+
+
+class ImportFormatError(Exception):
+    """Некорректный файл массового импорта."""
+    pass
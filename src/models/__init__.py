@@ -1,10 +1,11 @@
 from src.models.building import Building
-from src.models.activity import Activity
+from src.models.activity import Activity, activity_closure
 from src.models.organization import Organization, org_activity
 
 __all__ = [
     "Building",
     "Activity",
+    "activity_closure",
     "Organization",
     "org_activity"
 ]
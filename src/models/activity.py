@@ -1,7 +1,18 @@
-from sqlalchemy import String, ForeignKey, Index
+from sqlalchemy import String, ForeignKey, Index, Table, Column, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.core import Base
-from src.models.mixins import BaseModelMixin
+from src.models.mixins import BaseModelMixin, NOT_DELETED
+
+# Таблица замыкания дерева деятельностей: все пары (предок, потомок) с расстоянием между ними.
+# Каждая деятельность — сама себе предок с depth = 0.
+activity_closure = Table(
+    "activity_closure",
+    Base.metadata,
+    Column("ancestor_id", ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True),
+    Column("descendant_id", ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True),
+    Column("depth", Integer, nullable=False),
+    Index("idx_activity_closure_descendant", "descendant_id", "ancestor_id"),
+)
 
 
 class Activity(Base, BaseModelMixin):
@@ -20,7 +31,7 @@ class Activity(Base, BaseModelMixin):
     )
 
     __table_args__ = (
-        Index("idx_activity_parent_id", "parent_id"),
+        Index("idx_activity_parent_id", "parent_id", postgresql_where=NOT_DELETED),
     )
 
     def __repr__(self):
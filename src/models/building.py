@@ -1,8 +1,8 @@
-from sqlalchemy import String, Float, Index
+from sqlalchemy import BigInteger, Computed, String, Float, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from geoalchemy2 import Geometry
 from src.core import Base
-from src.models.mixins import BaseModelMixin
+from src.models.mixins import BaseModelMixin, NOT_DELETED
 
 
 class Building(Base, BaseModelMixin):
@@ -15,7 +15,13 @@ class Building(Base, BaseModelMixin):
 
     # Геометрия точки (для поиска в радиусе)
     geom: Mapped[str] = mapped_column(
-        Geometry(geometry_type="POINT", srid=4326), nullable=False
+        # Полный индекс geoalchemy не создаётся: его заменяет частичный idx_building_geom
+        Geometry(geometry_type="POINT", srid=4326, spatial_index=False), nullable=False
+    )
+
+    # Номер ячейки сетки (целочисленный geohash, см. src/core/geo_cells.py), вычисляется БД
+    geo_cell: Mapped[int] = mapped_column(
+        BigInteger, Computed("geo_cell_id(latitude, longitude)", persisted=True)
     )
 
     # Отношение один-ко-многим с организациями
@@ -24,8 +30,15 @@ class Building(Base, BaseModelMixin):
     )
 
     __table_args__ = (
-        Index("idx_building_geom", "geom", postgresql_using="gist"),
+        Index("idx_building_geom", "geom", postgresql_using="gist", postgresql_where=NOT_DELETED),
+        # Индекс по geography для ST_DWithin в метрах (поиск в радиусе)
+        Index(
+            "idx_building_geog", text("geography(geom)"),
+            postgresql_using="gist", postgresql_where=NOT_DELETED
+        ),
         Index("idx_building_coords", "latitude", "longitude"),
+        # Диапазонный отбор по ячейкам сетки (префикс номера — ячейка крупнее)
+        Index("idx_building_geo_cell", "geo_cell", postgresql_where=NOT_DELETED),
     )
 
     def __repr__(self):
@@ -1,7 +1,10 @@
 from datetime import datetime
-from sqlalchemy import Boolean, DateTime
+from sqlalchemy import Boolean, DateTime, text
 from sqlalchemy.orm import Mapped, mapped_column
 
+# Условие частичных индексов: запросы всегда фильтруют неудалённые записи
+NOT_DELETED = text("NOT is_deleted")
+
 
 class BaseModelMixin:
     created_at: Mapped[datetime] = mapped_column(
@@ -11,5 +14,5 @@ class BaseModelMixin:
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
     is_deleted: Mapped[bool] = mapped_column(
-        Boolean, default=False, nullable=False, index=True
+        Boolean, default=False, nullable=False
     )
@@ -1,8 +1,10 @@
-from sqlalchemy import String, ForeignKey, Index, Table, Column
+from datetime import datetime
+
+from sqlalchemy import String, ForeignKey, Index, Table, Column, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import JSONB
 from src.core import Base
-from src.models.mixins import BaseModelMixin
+from src.models.mixins import BaseModelMixin, NOT_DELETED
 
 # Ассоциативная таблица организация-деятельность
 org_activity = Table(
@@ -10,6 +12,8 @@ org_activity = Table(
     Base.metadata,
     Column("organization_id", ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True),
     Column("activity_id", ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True),
+    # Обратный индекс для выборки организаций по деятельности (покрывающий: index-only scan)
+    Index("idx_org_activity_activity_id", "activity_id", "organization_id"),
 )
 
 
@@ -17,7 +21,7 @@ class Organization(Base, BaseModelMixin):
     __tablename__ = "organizations"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    name: Mapped[str] = mapped_column(String(300), nullable=False, index=True)
+    name: Mapped[str] = mapped_column(String(300), nullable=False)
     phones: Mapped[list[str]] = mapped_column(JSONB, nullable=False, default=list)
     building_id: Mapped[int] = mapped_column(ForeignKey("buildings.id", ondelete="CASCADE"), nullable=False)
 
@@ -26,8 +30,21 @@ class Organization(Base, BaseModelMixin):
     activities = relationship("Activity", secondary=org_activity, backref="organizations")
 
     __table_args__ = (
-        Index("idx_organization_building_id", "building_id"),
+        Index("idx_organization_building_id", "building_id", postgresql_where=NOT_DELETED),
+        Index("idx_organization_name", "name", postgresql_where=NOT_DELETED),
+        # Триграммный индекс для поиска по подстроке (ILIKE '%...%')
+        Index(
+            "idx_organization_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}, postgresql_where=NOT_DELETED
+        ),
     )
 
     def __repr__(self):
         return f"<Organization(id={self.id}, name='{self.name}')>"
+
+
+@event.listens_for(Organization.activities, "append")
+@event.listens_for(Organization.activities, "remove")
+def _touch_on_activities_change(organization, activity, initiator):
+    # Связи лежат в org_activity; инкрементальное обновление кэшей видит только updated_at организации
+    organization.updated_at = datetime.utcnow()
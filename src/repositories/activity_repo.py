@@ -1,34 +1,50 @@
-from sqlalchemy import select, update
+from sqlalchemy import select, update, delete, insert, func, literal, text
 
-from src.exceptions import DepthLimitExceededError
-from src.models import Activity
+from src.core.activity_tree import activity_tree
+from src.exceptions import ActivityCycleError, DepthLimitExceededError
+from src.models import Activity, activity_closure
 from src.repositories.base import BaseRepository
 
+MAX_DEPTH = 3
 
-class ActivityRepository(BaseRepository[Activity]):
-    async def _get_depth(self, activity_id: int) -> int:
-        """Рекурсивно находит глубину активности"""
-        depth = 1
-        current_id = activity_id
+# Полное перестроение таблицы замыкания по parent_id
+REBUILD_CLOSURE_SQL = text("""
+    INSERT INTO activity_closure (ancestor_id, descendant_id, depth)
+    WITH RECURSIVE tree AS (
+        SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth
+        FROM activities
+        UNION ALL
+        SELECT tree.ancestor_id, activities.id, tree.depth + 1
+        FROM tree
+        JOIN activities ON activities.parent_id = tree.descendant_id
+    )
+    SELECT ancestor_id, descendant_id, depth FROM tree
+""")
 
-        while current_id:
-            query = (
-                select(Activity.parent_id)
-                .where(
-                    Activity.id == current_id,
-                    Activity.is_deleted == False
-                )
-            )
-            result = await self.db.execute(query)
-            parent_id = result.scalar_one_or_none()
 
-            if not parent_id:
-                break
+class ActivityRepository(BaseRepository[Activity]):
+    def _on_write(self):
+        super()._on_write()
+        activity_tree.invalidate()
 
-            depth += 1
-            current_id = parent_id
+    async def _get_depth(self, activity_id: int) -> int:
+        """
+        Глубина активности (1 — корень) по таблице замыкания в текущей сессии: проверки записи
+        не опираются на дерево в памяти, которое может отставать от записей других процессов
+        """
+        query = (
+            select(func.max(activity_closure.c.depth))
+            .where(activity_closure.c.descendant_id == activity_id)
+        )
+        return (await self.db.scalar(query) or 0) + 1
 
-        return depth
+    async def _get_height(self, activity_id: int) -> int:
+        """Высота поддерева активности (1 — лист)"""
+        query = (
+            select(func.max(activity_closure.c.depth))
+            .where(activity_closure.c.ancestor_id == activity_id)
+        )
+        return (await self.db.scalar(query) or 0) + 1
 
     async def create(self, obj_in: dict) -> Activity:
         """Создание activity с ограничением вложенности до 3 уровней"""
@@ -36,32 +52,178 @@ class ActivityRepository(BaseRepository[Activity]):
 
         if parent_id:
             depth = await self._get_depth(parent_id)
-            if depth >= 3:
+            if depth >= MAX_DEPTH:
                 raise DepthLimitExceededError("Нельзя создать деятельность глубже 3 уровней")
 
         new_activity = Activity(**obj_in)
         self.db.add(new_activity)
+        await self.db.flush()
+
+        # Связи с предками родителя + связь с самой собой
+        if parent_id:
+            ancestors = select(
+                activity_closure.c.ancestor_id,
+                literal(new_activity.id),
+                activity_closure.c.depth + 1,
+            ).where(activity_closure.c.descendant_id == parent_id)
+            await self.db.execute(
+                insert(activity_closure).from_select(["ancestor_id", "descendant_id", "depth"], ancestors)
+            )
+        await self.db.execute(
+            insert(activity_closure).values(ancestor_id=new_activity.id, descendant_id=new_activity.id, depth=0)
+        )
+
         await self.db.commit()
+        self._on_write()
         await self.db.refresh(new_activity)
         return new_activity
 
-    async def soft_delete(self, activity_id: int):
+    async def update(self, db_obj: Activity, obj_in: dict) -> Activity:
+        """Обновление activity; смена parent_id переносит всё поддерево"""
+        if "parent_id" in obj_in and obj_in["parent_id"] != db_obj.parent_id:
+            await self._move(db_obj.id, obj_in["parent_id"])
+        return await super().update(db_obj, obj_in)
+
+    async def _move(self, activity_id: int, new_parent_id: int | None):
+        """Перенос поддерева activity_id под new_parent_id в таблице замыкания (без commit)"""
+        subtree = select(activity_closure.c.descendant_id).where(activity_closure.c.ancestor_id == activity_id)
 
-        activity_cte = (
-            select(Activity.id)
-            .where(Activity.id == activity_id)
-            .cte(name="activity_tree", recursive=True)
+        if new_parent_id is not None:
+            in_subtree = await self.db.scalar(
+                select(func.count())
+                .select_from(activity_closure)
+                .where(
+                    activity_closure.c.ancestor_id == activity_id,
+                    activity_closure.c.descendant_id == new_parent_id,
+                )
+            )
+            if in_subtree:
+                raise ActivityCycleError("Нельзя перенести деятельность внутрь её собственного поддерева")
+
+            depth = await self._get_depth(new_parent_id) + await self._get_height(activity_id)
+            if depth > MAX_DEPTH:
+                raise DepthLimitExceededError("Нельзя создать деятельность глубже 3 уровней")
+
+        # Отвязываем поддерево от старых предков
+        old_ancestors = select(activity_closure.c.ancestor_id).where(
+            activity_closure.c.descendant_id == activity_id,
+            activity_closure.c.ancestor_id != activity_id,
         )
-        activity_cte = activity_cte.union_all(
-            select(Activity.id)
-            .where(Activity.parent_id == activity_cte.c.id)
+        await self.db.execute(
+            delete(activity_closure).where(
+                activity_closure.c.descendant_id.in_(subtree),
+                activity_closure.c.ancestor_id.in_(old_ancestors),
+            )
         )
 
-        # Обновляем все активности в дереве
+        if new_parent_id is None:
+            return
+
+        # Привязываем поддерево ко всем предкам нового родителя
+        supertree = activity_closure.alias("supertree")
+        sub = activity_closure.alias("sub")
+        links = (
+            select(supertree.c.ancestor_id, sub.c.descendant_id, supertree.c.depth + sub.c.depth + 1)
+            .where(
+                supertree.c.descendant_id == new_parent_id,
+                sub.c.ancestor_id == activity_id,
+            )
+        )
+        await self.db.execute(
+            insert(activity_closure).from_select(["ancestor_id", "descendant_id", "depth"], links)
+        )
+
+    async def rebuild_closure(self):
+        """Перестроение таблицы замыкания (после загрузки деятельностей в обход репозитория)"""
+        await self.db.execute(delete(activity_closure))
+        await self.db.execute(REBUILD_CLOSURE_SQL)
+        await self.db.commit()
+        self._on_write()
+
+    async def soft_delete(self, activity_id: int):
+        # Обновляем все активности в поддереве
+        subtree = select(activity_closure.c.descendant_id).where(activity_closure.c.ancestor_id == activity_id)
         query_update = (
             update(Activity)
-            .where(Activity.id.in_(select(activity_cte.c.id)))
+            .where(Activity.id.in_(subtree))
             .values(is_deleted=True)
         )
         await self.db.execute(query_update)
         await self.db.commit()
+        self._on_write()
+
+    async def create_many(self, objs_in: list[dict]):
+        """Создание пачки деятельностей (родители — уже существующие) в одной транзакции"""
+        if not objs_in:
+            return []
+
+        for parent_id in {obj["parent_id"] for obj in objs_in if obj.get("parent_id")}:
+            if await self._get_depth(parent_id) >= MAX_DEPTH:
+                raise DepthLimitExceededError("Нельзя создать деятельность глубже 3 уровней")
+
+        activities = await self._insert_many(objs_in)
+        ids = [activity.id for activity in activities]
+
+        # Связи с предками родителей и связи с самими собой — по одному INSERT ... SELECT
+        ancestors = (
+            select(activity_closure.c.ancestor_id, Activity.id, activity_closure.c.depth + 1)
+            .join(Activity, Activity.parent_id == activity_closure.c.descendant_id)
+            .where(Activity.id == self._ids_param(ids))
+        )
+        await self.db.execute(
+            insert(activity_closure).from_select(["ancestor_id", "descendant_id", "depth"], ancestors)
+        )
+        itself = select(Activity.id, Activity.id, literal(0)).where(Activity.id == self._ids_param(ids))
+        await self.db.execute(
+            insert(activity_closure).from_select(["ancestor_id", "descendant_id", "depth"], itself)
+        )
+
+        await self.db.commit()
+        self._on_write()
+        return activities
+
+    async def update_many(self, objs_in: list[dict]):
+        """
+        Обновление пачки деятельностей по id в одной транзакции. Смена parent_id переносит
+        поддерево; глубина проверяется по таблице замыкания в сессии, поэтому учитывает
+        переносы предыдущих строк пачки. Возвращает (обновлённые id, не найденные id).
+        """
+        if not objs_in:
+            return [], []
+
+        result = await self.db.execute(
+            select(Activity.id, Activity.parent_id).where(
+                Activity.id == self._ids_param([obj["id"] for obj in objs_in]),
+                Activity.is_deleted == False,
+            )
+        )
+        parents = dict(result.all())
+        rows = [obj for obj in objs_in if obj["id"] in parents]
+        missing = [obj["id"] for obj in objs_in if obj["id"] not in parents]
+
+        for row in rows:
+            if "parent_id" in row and row["parent_id"] != parents[row["id"]]:
+                await self._move(row["id"], row["parent_id"])
+                parents[row["id"]] = row["parent_id"]
+
+        if rows:
+            await self._update_rows(rows)
+            await self.db.commit()
+            self._on_write()
+        return [obj["id"] for obj in rows], missing
+
+    async def soft_delete_many(self, ids: list[int]):
+        """Пометка удалёнными нескольких деятельностей вместе с их поддеревьями"""
+        subtree = select(activity_closure.c.descendant_id).where(
+            activity_closure.c.ancestor_id == self._ids_param(ids)
+        )
+        query = (
+            update(Activity)
+            .where(Activity.id.in_(subtree), Activity.is_deleted == False)
+            .values(is_deleted=True)
+            .returning(Activity.id)
+        )
+        deleted = set((await self.db.scalars(query)).all())
+        await self.db.commit()
+        self._on_write()
+        return [obj_id for obj_id in ids if obj_id in deleted], [obj_id for obj_id in ids if obj_id not in deleted]
@@ -1,15 +1,168 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
-from typing import Generic, TypeVar, Type
+from sqlalchemy import select, update, insert, any_, bindparam, case, func, literal, Integer, Select
+from sqlalchemy.sql import ColumnElement
+from typing import Generic, TypeVar, Type, Sequence, AsyncIterator
+
+from src.core import settings
+from src.core.cache import invalidate_caches
+from src.exceptions import InvalidCursorError
 
 ModelType = TypeVar("ModelType")
 
 
+@dataclass
+class Page(Generic[ModelType]):
+    """Страница результатов и курсор следующей страницы (None — страниц больше нет)."""
+    items: Sequence[ModelType]
+    next_cursor: str | None = None
+
+
+def encode_cursor(last_id: int, score: float | None = None) -> str:
+    """Курсор следующей страницы; score — ранг последней строки при сортировке (score DESC, id)."""
+    payload = {"id": last_id} if score is None else {"id": last_id, "score": score}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def _decode_payload(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        last_id = payload["id"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursorError("Некорректный курсор пагинации")
+
+    if not isinstance(last_id, int):
+        raise InvalidCursorError("Некорректный курсор пагинации")
+    return payload
+
+
+def decode_cursor(cursor: str) -> int:
+    return _decode_payload(cursor)["id"]
+
+
+def decode_ranked_cursor(cursor: str) -> tuple[float, int]:
+    """(score, id) последней строки для сортировки (score DESC, id)."""
+    payload = _decode_payload(cursor)
+    score = payload.get("score")
+    if isinstance(score, bool) or not isinstance(score, (int, float)):
+        raise InvalidCursorError("Некорректный курсор пагинации")
+    return float(score), payload["id"]
+
+
+def like_pattern(text: str) -> str:
+    """Шаблон LIKE "содержит подстроку"; спецсимволы экранируются обратным слэшем (escape Postgres по умолчанию)."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+# Символы, которые str.strip() считает пробельными (str.isspace)
+PY_WHITESPACE = (
+    "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680"
+    "\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a"
+    "\u2028\u2029\u202f\u205f\u3000"
+)
+
+
+def sql_strip(value: ColumnElement) -> ColumnElement:
+    """SQL-аналог str.strip(): btrim по тому же набору пробельных символов."""
+    return func.btrim(value, literal(PY_WHITESPACE))
+
+
+def sql_isoformat(value: ColumnElement) -> ColumnElement:
+    """
+    timestamp в текст так же, как его кодирует orjson: микросекунды всегда шестью
+    цифрами и опускаются целиком, если равны нулю (json Postgres обрезает нули в конце).
+    """
+    return case(
+        (func.date_trunc("second", value) == value, func.to_char(value, 'YYYY-MM-DD"T"HH24:MI:SS')),
+        else_=func.to_char(value, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+    )
+
+
 class BaseRepository(Generic[ModelType]):
     def __init__(self, model: Type[ModelType], session: AsyncSession):
         self.model = model
         self.db = session
 
+    @staticmethod
+    def _page_size(limit: int | None) -> int:
+        return min(limit or settings.default_page_size, settings.max_page_size)
+
+    def _keyset(self, query: Select, cursor: str | None, page_size: int) -> Select:
+        if cursor:
+            query = query.where(self.model.id > decode_cursor(cursor))
+        return query.order_by(self.model.id).limit(page_size + 1)
+
+    async def _paginate(self, query: Select, cursor: str | None, limit: int | None) -> Page[ModelType]:
+        """
+        Keyset-пагинация по id: WHERE id > :last_id ORDER BY id LIMIT n + 1.
+        Стоимость любой страницы одинакова — смещение не вычитывается.
+        """
+        page_size = self._page_size(limit)
+
+        result = await self.db.execute(self._keyset(query, cursor, page_size))
+        rows = result.scalars().all()
+
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        # Запрос может вернуть один объект несколько раз (join по коллекции)
+        items = list({row.id: row for row in rows}.values())
+
+        next_cursor = encode_cursor(rows[-1].id) if has_more else None
+        return Page(items=items, next_cursor=next_cursor)
+
+    async def _stream(self, query: Select) -> AsyncIterator[ModelType]:
+        """
+        Потоковое чтение через серверный курсор (AsyncSession.stream).
+        Объекты загружаются партиями по stream_batch_size, поэтому потребление
+        памяти не зависит от общего количества строк.
+        """
+        query = query.order_by(self.model.id).execution_options(yield_per=settings.stream_batch_size)
+        result = await self.db.stream(query)
+
+        last_id = None
+        async for partition in result.scalars().partitions():
+            for obj in partition:
+                # Строки упорядочены по id — дубликаты от join идут подряд
+                if obj.id == last_id:
+                    continue
+                last_id = obj.id
+                yield obj
+
+    async def _paginate_json(self, query: Select, cursor: str | None, limit: int | None) -> Page[str]:
+        """
+        Keyset-пагинация запроса, выбирающего (id, JSON-текст объекта).
+        Элементы страницы — готовые JSON-объекты, собранные в БД.
+        """
+        page_size = self._page_size(limit)
+
+        result = await self.db.execute(self._keyset(query, cursor, page_size))
+        rows = result.all()
+
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1][0]) if has_more else None
+        return Page(items=[row[1] for row in rows], next_cursor=next_cursor)
+
+    async def _stream_json(self, query: Select) -> AsyncIterator[str]:
+        """Потоковое чтение запроса (id, JSON-текст объекта) через серверный курсор."""
+        query = query.order_by(self.model.id).execution_options(yield_per=settings.stream_batch_size)
+        result = await self.db.stream(query)
+
+        async for partition in result.partitions():
+            for row in partition:
+                yield row[1]
+
+    def _on_write(self):
+        """Вызывается после каждой зафиксированной записи; наследники сбрасывают здесь свои кэши."""
+        invalidate_caches()
+
     async def get_all(self):
         result = await self.db.execute(select(self.model).where(self.model.is_deleted == False))
         return result.scalars().all()
@@ -24,6 +177,7 @@ class BaseRepository(Generic[ModelType]):
         obj = self.model(**obj_in)
         self.db.add(obj)
         await self.db.commit()
+        self._on_write()
         await self.db.refresh(obj)
         return obj
 
@@ -31,12 +185,14 @@ class BaseRepository(Generic[ModelType]):
         for key, value in obj_in.items():
             setattr(db_obj, key, value)
         await self.db.commit()
+        self._on_write()
         await self.db.refresh(db_obj)
         return db_obj
 
     async def delete(self, db_obj):
         await self.db.delete(db_obj)
         await self.db.commit()
+        self._on_write()
 
     async def soft_delete(self, db_obj: int):
         query = (
@@ -46,4 +202,67 @@ class BaseRepository(Generic[ModelType]):
         )
         await self.db.execute(query)
         await self.db.commit()
+        self._on_write()
+
+    def _ids_param(self, ids: Sequence[int]):
+        """Список id одним параметром-массивом: WHERE id = ANY(:ids)."""
+        return any_(bindparam("ids", list(ids), type_=ARRAY(Integer)))
+
+    async def _insert_many(self, objs_in: list[dict]) -> Sequence[ModelType]:
+        """Вставка пачки строк одним INSERT ... VALUES (...), (...) RETURNING (без commit)."""
+        # sort_by_parameter_order: объекты возвращаются в порядке входных строк
+        result = await self.db.scalars(
+            insert(self.model).returning(self.model, sort_by_parameter_order=True), objs_in
+        )
+        return result.all()
+
+    async def _update_rows(self, rows: list[dict]):
+        """UPDATE по первичному ключу для каждой строки пачки (без commit)."""
+        rows = [row for row in rows if len(row) > 1]
+        if rows:
+            await self.db.execute(update(self.model), rows)
+
+    async def _existing_ids(self, ids: Sequence[int]) -> set[int]:
+        result = await self.db.scalars(
+            select(self.model.id).where(self.model.id == self._ids_param(ids), self.model.is_deleted == False)
+        )
+        return set(result.all())
+
+    async def create_many(self, objs_in: list[dict]) -> Sequence[ModelType]:
+        """Создание пачки объектов в одной транзакции."""
+        if not objs_in:
+            return []
+        objs = await self._insert_many(objs_in)
+        await self.db.commit()
+        self._on_write()
+        return objs
 
+    async def update_many(self, objs_in: list[dict]) -> tuple[list[int], list[int]]:
+        """
+        Обновление пачки объектов по id (в каждом словаре есть ключ "id") в одной
+        транзакции: UPDATE выполняется через executemany. Отсутствующие и удалённые
+        объекты пропускаются. Возвращает (обновлённые id, не найденные id).
+        """
+        existing = await self._existing_ids([obj["id"] for obj in objs_in]) if objs_in else set()
+        rows = [obj for obj in objs_in if obj["id"] in existing]
+        missing = [obj["id"] for obj in objs_in if obj["id"] not in existing]
+        if rows:
+            await self._update_rows(rows)
+            await self.db.commit()
+            self._on_write()
+        return [obj["id"] for obj in rows], missing
+
+    async def soft_delete_many(self, ids: Sequence[int]) -> tuple[list[int], list[int]]:
+        """Пометка пачки объектов удалёнными одним UPDATE. Возвращает (удалённые id, не найденные id)."""
+        if not ids:
+            return [], []
+        query = (
+            update(self.model)
+            .where(self.model.id == self._ids_param(ids), self.model.is_deleted == False)
+            .values(is_deleted=True)
+            .returning(self.model.id)
+        )
+        deleted = set((await self.db.scalars(query)).all())
+        await self.db.commit()
+        self._on_write()
+        return [obj_id for obj_id in ids if obj_id in deleted], [obj_id for obj_id in ids if obj_id not in deleted]
@@ -1,56 +1,304 @@
-from geoalchemy2 import WKTElement
-from shapely.geometry import box
-from sqlalchemy import func, select
-from sqlalchemy.orm import contains_eager
+import numpy as np
+from sqlalchemy import and_, select, text, bindparam, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import selectinload, with_loader_criteria
 
+from src.core import settings
+from src.core.activity_tree import activity_tree
+from src.core.spatial_index import spatial_index
 from src.models import Building, Organization, Activity
-from src.repositories.base import BaseRepository
+from src.repositories.base import BaseRepository, Page, like_pattern, decode_cursor, encode_cursor
+from src.repositories.geo import (
+    within_radius, within_bbox, cells_in_bbox, cells_in_radius, building_ids_filter,
+    distance_to, grid_cell_size, grid_cells,
+)
 
+# Организация видна в здании, если она не удалена и у неё есть неудалённая деятельность
+ACTIVE_ORGANIZATION = and_(
+    Organization.is_deleted == False,
+    Organization.activities.any(Activity.is_deleted == False),
+)
 
-class BuildingRepository(BaseRepository[Building]):
+# Пакетная загрузка организаций зданий и их деятельностей (по запросу на уровень)
+ORGANIZATIONS_LOADER = (
+    selectinload(Building.organizations).selectinload(Organization.activities),
+    with_loader_criteria(Organization, ACTIVE_ORGANIZATION),
+    with_loader_criteria(Activity, Activity.is_deleted == False),
+)
+
+
+# Ширина мира в EPSG:3857 (метры)
+WEB_MERCATOR_WIDTH = 2 * 20037508.342789244
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+
+# Здания тайла с числом подходящих организаций. Отбор по geom идёт по GiST-индексу
+# idx_building_geom; :activity_ids = NULL — без фильтра по деятельности.
+TILE_BUILDINGS_CTE = """
+    WITH bounds AS (
+        SELECT ST_TileEnvelope(:z, :x, :y) AS geom_3857,
+               ST_Transform(ST_TileEnvelope(:z, :x, :y), 4326) AS geom_4326
+    ),
+    matched AS (
+        SELECT b.id, b.address, b.geom, count(*) AS organizations
+        FROM buildings AS b
+        JOIN bounds ON ST_Intersects(b.geom, bounds.geom_4326)
+        JOIN organizations AS o ON o.building_id = b.id AND NOT o.is_deleted
+        WHERE NOT b.is_deleted
+          AND EXISTS (
+              SELECT 1
+              FROM org_activity AS oa
+              JOIN activities AS a ON a.id = oa.activity_id
+              WHERE oa.organization_id = o.id
+                AND NOT a.is_deleted
+                AND (:activity_ids IS NULL OR a.id = ANY(:activity_ids))
+          )
+        GROUP BY b.id
+    )
+"""
+
+TILE_POINTS_SQL = text(TILE_BUILDINGS_CTE + """
+    SELECT ST_AsMVT(features, 'buildings', :extent, 'geom')
+    FROM (
+        SELECT id, address, organizations,
+               ST_AsMVTGeom(ST_Transform(geom, 3857), (SELECT geom_3857 FROM bounds), :extent, :buffer) AS geom
+        FROM matched
+    ) AS features
+""")
 
-    async def list_in_bbox(self, lat1: float, lon1: float, lat2: float, lon2: float):
-        shapely_box = box(lon1, lat1, lon2, lat2)
-        bbox_geom = WKTElement(shapely_box.wkt, srid=4326)
+# На мелких зумах здания объединяются по ячейкам сетки :cell_size (метры EPSG:3857)
+TILE_CLUSTERS_SQL = text(TILE_BUILDINGS_CTE + """
+    SELECT ST_AsMVT(features, 'buildings', :extent, 'geom')
+    FROM (
+        SELECT count(*) AS buildings,
+               sum(organizations) AS organizations,
+               ST_AsMVTGeom(
+                   ST_Centroid(ST_Collect(ST_Transform(geom, 3857))),
+                   (SELECT geom_3857 FROM bounds), :extent, :buffer
+               ) AS geom
+        FROM matched
+        GROUP BY ST_SnapToGrid(ST_Transform(geom, 3857), :cell_size)
+    ) AS features
+""")
+
+# Агрегация зданий с организациями по ячейкам сетки (см. BBOX_CLUSTERS_SQL организаций)
+BBOX_CLUSTERS_SQL = text("""
+    WITH points AS (
+        SELECT b.id, b.latitude, b.longitude, count(*) AS organizations,
+               least(floor((b.latitude - :lat1) / :cell_size)::int, :max_index) AS row,
+               least(floor((b.longitude - :lon1) / :cell_size)::int, :max_index) AS col
+        FROM buildings AS b
+        JOIN organizations AS o ON o.building_id = b.id AND NOT o.is_deleted
+        WHERE ST_Intersects(b.geom, ST_MakeEnvelope(:lon1, :lat1, :lon2, :lat2, 4326))
+          AND NOT b.is_deleted
+          AND EXISTS (
+              SELECT 1
+              FROM org_activity AS oa
+              JOIN activities AS a ON a.id = oa.activity_id
+              WHERE oa.organization_id = o.id AND NOT a.is_deleted
+          )
+        GROUP BY b.id
+    )
+    SELECT row, col, count(*) AS count, sum(organizations) AS organizations,
+           avg(latitude) AS latitude, avg(longitude) AS longitude
+    FROM points
+    GROUP BY row, col
+    ORDER BY row, col
+""")
+
+
+class BuildingRepository(BaseRepository[Building]):
 
+    async def _list_with_organizations(self, spatial_filter, cursor: str | None, limit: int | None) -> Page[Building]:
+        """
+        Страница зданий вместе с организациями и их деятельностями.
+        Сначала по пространственному условию выбирается страница зданий
+        (одна строка на здание), затем организации и деятельности догружаются
+        пакетно через selectinload — без размножения строк join-ом.
+        """
         query = (
             select(Building)
-            .join(Building.organizations)
-            .join(Organization.activities)
             .where(
-                func.ST_Intersects(Building.geom, bbox_geom),
+                spatial_filter,
                 Building.is_deleted == False,
-                Organization.is_deleted == False,
-                Activity.is_deleted == False,
-            )
-            .options(
-                contains_eager(Building.organizations)
-                .contains_eager(Organization.activities)
+                Building.organizations.any(ACTIVE_ORGANIZATION),
             )
+            .options(*ORGANIZATIONS_LOADER)
         )
+        return await self._paginate(query, cursor, limit)
 
-        result = await self.db.execute(query)
-        return result.unique().scalars().all()
+    async def _list_by_index_ids(self, ids: np.ndarray, cursor: str | None, limit: int | None) -> Page[Building]:
+        """
+        Страница зданий по отсортированным id из пространственного индекса в памяти.
+        Keyset по id выполняется над массивом, из БД читается только сама страница
+        по первичному ключу (с повторной проверкой удаления на случай устаревшего индекса).
+        """
+        page_size = self._page_size(limit)
+        if cursor:
+            ids = ids[np.searchsorted(ids, decode_cursor(cursor), side="right"):]
+
+        page_ids = ids[:page_size + 1].tolist()
+        has_more = len(page_ids) > page_size
+        page_ids = page_ids[:page_size]
+        if not page_ids:
+            return Page(items=[])
 
-    async def list_in_radius(self, latitude: float, longitude: float, radius_km: float):
         query = (
             select(Building)
-            .join(Building.organizations)
-            .join(Organization.activities)
             .where(
-                func.ST_DistanceSphere(
-                    Building.geom,
-                    func.ST_MakePoint(longitude, latitude)
-                ) <= radius_km * 1000,
+                building_ids_filter(page_ids),
                 Building.is_deleted == False,
-                Organization.is_deleted == False,
-                Activity.is_deleted == False,
+                Building.organizations.any(ACTIVE_ORGANIZATION),
+            )
+            .order_by(Building.id)
+            .options(*ORGANIZATIONS_LOADER)
+        )
+        items = (await self.db.scalars(query)).all()
+        return Page(items=items, next_cursor=encode_cursor(page_ids[-1]) if has_more else None)
+
+    async def list_in_bbox(
+            self,
+            lat1: float,
+            lon1: float,
+            lat2: float,
+            lon2: float,
+            cursor: str | None = None,
+            limit: int | None = None,
+    ):
+        if settings.spatial_backend == "memory":
+            ids = await spatial_index.ids_in_bbox(lat1, lon1, lat2, lon2)
+            return await self._list_by_index_ids(ids, cursor, limit)
+
+        spatial_filter = within_bbox(lat1, lon1, lat2, lon2)
+        if settings.geo_cell_prefilter:
+            spatial_filter = and_(cells_in_bbox(lat1, lon1, lat2, lon2), spatial_filter)
+        return await self._list_with_organizations(spatial_filter, cursor, limit)
+
+    async def list_bbox_clusters(self, lat1: float, lon1: float, lat2: float, lon2: float):
+        """
+        Здания прямоугольника, агрегированные по сетке: не больше cluster_grid_cells²
+        ячеек при любой плотности. Возвращает (размер ячейки в градусах, ячейки).
+        """
+        lat1, lat2 = sorted((lat1, lat2))
+        lon1, lon2 = sorted((lon1, lon2))
+        cell_size = grid_cell_size(lat1, lon1, lat2, lon2)
+        result = await self.db.execute(
+            BBOX_CLUSTERS_SQL,
+            {
+                "lat1": lat1, "lon1": lon1, "lat2": lat2, "lon2": lon2,
+                "cell_size": cell_size, "max_index": settings.cluster_grid_cells - 1,
+            },
+        )
+        return cell_size, grid_cells(result.mappings(), lat1, lon1, cell_size)
+
+    async def list_in_radius(
+            self,
+            latitude: float,
+            longitude: float,
+            radius_km: float,
+            cursor: str | None = None,
+            limit: int | None = None,
+    ):
+        if settings.spatial_backend == "memory":
+            ids = await spatial_index.ids_in_radius(latitude, longitude, radius_km)
+            return await self._list_by_index_ids(ids, cursor, limit)
+
+        spatial_filter = within_radius(latitude, longitude, radius_km)
+        if settings.geo_cell_prefilter:
+            spatial_filter = and_(cells_in_radius(latitude, longitude, radius_km), spatial_filter)
+        return await self._list_with_organizations(spatial_filter, cursor, limit)
+
+    async def list_nearest(
+            self,
+            latitude: float,
+            longitude: float,
+            limit: int,
+            activity_id: int | None = None,
+            name: str | None = None,
+    ):
+        """
+        K ближайших к точке зданий (KNN по GiST-индексу) вместе с расстоянием в метрах.
+        Фильтры по деятельности и названию применяются к организациям в здании.
+        Возвращает строки (Building, distance_m), отсортированные по удалённости.
+        """
+        if settings.spatial_backend == "memory" and activity_id is None and not name:
+            return await self._nearest_from_index(latitude, longitude, limit)
+
+        distance = distance_to(latitude, longitude).label("distance_m")
+
+        activity_filter = Activity.is_deleted == False
+        if activity_id is not None:
+            activity_filter = and_(activity_filter, Activity.id == activity_id)
+
+        organization_filter = and_(
+            Organization.is_deleted == False,
+            Organization.activities.any(activity_filter),
+        )
+        if name:
+            organization_filter = and_(
+                organization_filter, Organization.name.ilike(like_pattern(name))
             )
-            .options(
-                contains_eager(Building.organizations)
-                .contains_eager(Organization.activities)
+
+        query = (
+            select(Building, distance)
+            .where(
+                Building.organizations.any(organization_filter),
+                Building.is_deleted == False,
             )
+            .order_by(distance)
+            .limit(limit)
+            .options(*ORGANIZATIONS_LOADER)
         )
 
         result = await self.db.execute(query)
-        return result.unique().scalars().all()
+        return result.all()
+
+    async def _nearest_from_index(self, latitude: float, longitude: float, limit: int):
+        """
+        K ближайших по индексу в памяти: здания дочитываются по id, порядок и расстояния — из индекса.
+        Если индекс отстал и часть зданий уже не подходит, k удваивается, пока не наберётся limit.
+        """
+        k = limit
+        while True:
+            ids, distances = await spatial_index.nearest(latitude, longitude, k)
+            query = (
+                select(Building)
+                .where(
+                    building_ids_filter(ids.tolist()),
+                    Building.is_deleted == False,
+                    Building.organizations.any(ACTIVE_ORGANIZATION),
+                )
+                .options(*ORGANIZATIONS_LOADER)
+            )
+            buildings = {building.id: building for building in (await self.db.scalars(query)).all()}
+            if len(buildings) >= limit or len(ids) < k:
+                break
+            k *= 2
+        rows = [
+            (buildings[building_id], distance)
+            for building_id, distance in zip(ids.tolist(), distances.tolist())
+            if building_id in buildings
+        ]
+        return rows[:limit]
+
+    async def get_tile(self, z: int, x: int, y: int, activity_id: int | None = None) -> bytes:
+        """
+        Векторный тайл (MVT) слоя buildings. До tile_cluster_max_zoom включительно
+        здания объединяются в кластеры по сетке (атрибуты buildings, organizations),
+        на крупных зумах — отдельные здания (id, address, organizations).
+        activity_id ограничивает организации деятельностью и её поддеревом.
+        """
+        activity_ids = None
+        if activity_id is not None:
+            activity_ids = await activity_tree.descendant_ids(activity_id)
+
+        params = {"z": z, "x": x, "y": y, "extent": TILE_EXTENT, "buffer": TILE_BUFFER, "activity_ids": activity_ids}
+        if z <= settings.tile_cluster_max_zoom:
+            query = TILE_CLUSTERS_SQL
+            params["cell_size"] = WEB_MERCATOR_WIDTH / 2 ** z / settings.tile_cluster_cells
+        else:
+            query = TILE_POINTS_SQL
+
+        query = query.bindparams(bindparam("activity_ids", type_=ARRAY(Integer)))
+        tile = await self.db.scalar(query, params)
+        return bytes(tile or b"")
@@ -0,0 +1,114 @@
+from geoalchemy2 import WKTElement
+from shapely.geometry import box
+from sqlalchemy import Float, Integer, and_, any_, bindparam, func, or_
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql.elements import ColumnElement
+
+from src.core import settings
+from src.core.geo_arrays import radius_bboxes
+from src.core.geo_cells import cover_bbox
+from src.core.spatial_index import spatial_index
+from src.models import Building
+
+# Выражение должно совпадать с выражением индекса idx_building_geog,
+# иначе планировщик не сможет его использовать.
+building_geography = func.geography(Building.geom)
+
+
+def point_geography(latitude: float, longitude: float) -> ColumnElement:
+    """Точка (WGS 84) в виде geography."""
+    return func.geography(
+        func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326)
+    )
+
+
+def within_radius(latitude: float, longitude: float, radius_km: float) -> ColumnElement:
+    """
+    Условие "здание в радиусе от точки".
+
+    ST_DWithin по geography сначала отбирает кандидатов по GiST-индексу
+    (пересечение с расширенным envelope), затем проверяет точное расстояние.
+    use_spheroid=false — расчёт на сфере, как и у прежнего ST_DistanceSphere.
+    """
+    return func.ST_DWithin(
+        building_geography,
+        point_geography(latitude, longitude),
+        radius_km * 1000,
+        False,
+    )
+
+
+def within_bbox(lat1: float, lon1: float, lat2: float, lon2: float) -> ColumnElement:
+    """Условие "здание в прямоугольнике" (ST_Intersects по GiST-индексу idx_building_geom)."""
+    bbox_geom = WKTElement(box(lon1, lat1, lon2, lat2).wkt, srid=4326)
+    return func.ST_Intersects(Building.geom, bbox_geom)
+
+
+def cells_in_bbox(lat1: float, lon1: float, lat2: float, lon2: float) -> ColumnElement:
+    """
+    Грубый отбор по диапазонам buildings.geo_cell (btree-индекс idx_building_geo_cell):
+    не больше geo_cell_max_cells ячеек, покрывающих прямоугольник. Точное условие нужно отдельно.
+    """
+    ranges = cover_bbox(lat1, lon1, lat2, lon2, settings.geo_cell_max_cells)
+    return or_(*(and_(Building.geo_cell >= low, Building.geo_cell < high) for low, high in ranges))
+
+
+def cells_in_radius(latitude: float, longitude: float, radius_km: float) -> ColumnElement:
+    """
+    Грубый отбор по ячейкам прямоугольника, описанного вокруг круга. У линии перемены дат
+    прямоугольник режется на два, иначе здания по другую сторону выпали бы (ST_DWithin их находит).
+    """
+    return or_(*(cells_in_bbox(*box) for box in radius_bboxes(latitude, longitude, radius_km * 1000)))
+
+
+def building_ids_filter(building_ids) -> ColumnElement:
+    """Условие "здание из списка" одним параметром-массивом: buildings.id = ANY(:building_ids)."""
+    return Building.id == any_(bindparam("building_ids", list(building_ids), type_=ARRAY(Integer)))
+
+
+async def radius_filter(latitude: float, longitude: float, radius_km: float) -> ColumnElement:
+    """within_radius или, при spatial_backend=memory, список id из индекса в памяти."""
+    if settings.spatial_backend == "memory":
+        ids = await spatial_index.ids_in_radius(latitude, longitude, radius_km)
+        return building_ids_filter(ids.tolist())
+    return within_radius(latitude, longitude, radius_km)
+
+
+async def bbox_filter(lat1: float, lon1: float, lat2: float, lon2: float) -> ColumnElement:
+    """within_bbox или, при spatial_backend=memory, список id из индекса в памяти."""
+    if settings.spatial_backend == "memory":
+        ids = await spatial_index.ids_in_bbox(lat1, lon1, lat2, lon2)
+        return building_ids_filter(ids.tolist())
+    return within_bbox(lat1, lon1, lat2, lon2)
+
+
+def distance_to(latitude: float, longitude: float) -> ColumnElement:
+    """
+    Расстояние от здания до точки в метрах (на сфере).
+
+    Оператор <-> по geography поддерживается GiST-индексом, поэтому
+    ORDER BY по этому выражению + LIMIT выполняется как KNN-обход индекса.
+    """
+    return building_geography.op("<->", return_type=Float)(
+        point_geography(latitude, longitude)
+    )
+
+
+def grid_cell_size(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Сторона ячейки сетки агрегации (в градусах): длинная сторона прямоугольника
+    делится на cluster_grid_cells, поэтому ячеек в ответе не больше cluster_grid_cells².
+    """
+    extent = max(abs(lat2 - lat1), abs(lon2 - lon1))
+    return max(extent / settings.cluster_grid_cells, 1e-6)
+
+
+def grid_cells(rows, lat1: float, lon1: float, cell_size: float) -> list[dict]:
+    """Строки агрегата (row, col, ...) -> ячейки с границами bbox [lat1, lon1, lat2, lon2]."""
+    cells = []
+    for row in rows:
+        cell = dict(row)
+        cell_lat, cell_lon = lat1 + cell.pop("row") * cell_size, lon1 + cell.pop("col") * cell_size
+        cell["bbox"] = [cell_lat, cell_lon, cell_lat + cell_size, cell_lon + cell_size]
+        cells.append(cell)
+    return cells
@@ -0,0 +1,162 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import invalidate_caches
+
+STAGING_TABLE = "import_organizations"
+STAGING_COLUMNS = ("name", "phones", "activities", "address", "latitude", "longitude")
+
+CREATE_STAGING_SQL = text(f"""
+    CREATE TEMP TABLE {STAGING_TABLE} (
+        name text NOT NULL,
+        phones text[] NOT NULL,
+        activities text[] NOT NULL,
+        address text NOT NULL,
+        latitude double precision NOT NULL,
+        longitude double precision NOT NULL,
+        building_id integer,
+        organization_id integer,
+        line bigint GENERATED ALWAYS AS IDENTITY
+    ) ON COMMIT DROP
+""")
+
+# Повторы ключа (адрес, название + здание) в файле: действует последняя строка — line
+# нумерует строки в порядке COPY.
+# Здания сопоставляются по адресу; новые создаются с геометрией, построенной в БД
+MERGE_BUILDINGS_SQL = text(f"""
+    INSERT INTO buildings (address, latitude, longitude, geom, created_at, updated_at, is_deleted)
+    SELECT DISTINCT ON (s.address)
+           s.address, s.latitude, s.longitude,
+           ST_SetSRID(ST_MakePoint(s.longitude, s.latitude), 4326),
+           now(), now(), false
+    FROM {STAGING_TABLE} AS s
+    WHERE NOT EXISTS (
+        SELECT 1 FROM buildings AS b WHERE b.address = s.address AND NOT b.is_deleted
+    )
+    ORDER BY s.address, s.line DESC
+""")
+
+RESOLVE_BUILDINGS_SQL = text(f"""
+    UPDATE {STAGING_TABLE} AS s
+    SET building_id = b.id
+    FROM (
+        SELECT DISTINCT ON (address) id, address
+        FROM buildings
+        WHERE NOT is_deleted
+        ORDER BY address, id
+    ) AS b
+    WHERE b.address = s.address
+""")
+
+# Организация сопоставляется по (название, здание): существующим обновляются телефоны
+UPDATE_ORGANIZATIONS_SQL = text(f"""
+    UPDATE organizations AS o
+    SET phones = to_jsonb(s.phones), updated_at = now()
+    FROM (
+        SELECT DISTINCT ON (name, building_id) name, building_id, phones
+        FROM {STAGING_TABLE}
+        ORDER BY name, building_id, line DESC
+    ) AS s
+    WHERE o.name = s.name AND o.building_id = s.building_id AND NOT o.is_deleted
+""")
+
+INSERT_ORGANIZATIONS_SQL = text(f"""
+    INSERT INTO organizations (name, phones, building_id, created_at, updated_at, is_deleted)
+    SELECT DISTINCT ON (s.name, s.building_id)
+           s.name, to_jsonb(s.phones), s.building_id, now(), now(), false
+    FROM {STAGING_TABLE} AS s
+    WHERE NOT EXISTS (
+        SELECT 1 FROM organizations AS o
+        WHERE o.name = s.name AND o.building_id = s.building_id AND NOT o.is_deleted
+    )
+    ORDER BY s.name, s.building_id, s.line DESC
+""")
+
+RESOLVE_ORGANIZATIONS_SQL = text(f"""
+    UPDATE {STAGING_TABLE} AS s
+    SET organization_id = o.id
+    FROM (
+        SELECT DISTINCT ON (name, building_id) id, name, building_id
+        FROM organizations
+        WHERE NOT is_deleted
+        ORDER BY name, building_id, id
+    ) AS o
+    WHERE o.name = s.name AND o.building_id = s.building_id
+""")
+
+# Деятельности сопоставляются по уникальному названию; неизвестные пропускаются.
+# Связи только добавляются, поэтому у повторов организации в файле они объединяются.
+# Организациям с новыми связями сдвигается updated_at (по нему обновляется индекс зданий в памяти)
+MERGE_LINKS_SQL = text(f"""
+    WITH links AS (
+        INSERT INTO org_activity (organization_id, activity_id)
+        SELECT DISTINCT s.organization_id, a.id
+        FROM {STAGING_TABLE} AS s
+        CROSS JOIN LATERAL unnest(s.activities) AS activity_name
+        JOIN activities AS a ON a.name = activity_name AND NOT a.is_deleted
+        ON CONFLICT DO NOTHING
+        RETURNING organization_id
+    ),
+    touched AS (
+        UPDATE organizations SET updated_at = now()
+        WHERE id IN (SELECT organization_id FROM links)
+    )
+    SELECT count(*) FROM links
+""")
+
+UNKNOWN_ACTIVITIES_SQL = text(f"""
+    SELECT DISTINCT activity_name
+    FROM {STAGING_TABLE} AS s
+    CROSS JOIN LATERAL unnest(s.activities) AS activity_name
+    WHERE NOT EXISTS (
+        SELECT 1 FROM activities AS a WHERE a.name = activity_name AND NOT a.is_deleted
+    )
+    ORDER BY activity_name
+""")
+
+
+class ImportRepository:
+    """
+    Массовая загрузка организаций со зданиями и деятельностями.
+    Строки копируются через COPY во временную таблицу и сливаются
+    в buildings, organizations и org_activity несколькими SQL-запросами
+    в одной транзакции.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.db = session
+        self._copy_connection = None
+
+    async def create_staging(self):
+        await self.db.execute(CREATE_STAGING_SQL)
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+        self._copy_connection = raw_connection.driver_connection
+
+    async def copy(self, records: list[tuple]):
+        """COPY пачки строк (в порядке STAGING_COLUMNS) во временную таблицу."""
+        await self._copy_connection.copy_records_to_table(
+            STAGING_TABLE, records=records, columns=STAGING_COLUMNS
+        )
+
+    async def merge(self) -> dict:
+        """Слияние временной таблицы с основными; возвращает число затронутых строк."""
+        await self.db.execute(text(f"ANALYZE {STAGING_TABLE}"))
+
+        buildings = await self.db.execute(MERGE_BUILDINGS_SQL)
+        await self.db.execute(RESOLVE_BUILDINGS_SQL)
+        updated = await self.db.execute(UPDATE_ORGANIZATIONS_SQL)
+        created = await self.db.execute(INSERT_ORGANIZATIONS_SQL)
+        await self.db.execute(RESOLVE_ORGANIZATIONS_SQL)
+        links = await self.db.scalar(MERGE_LINKS_SQL)
+        unknown_activities = (await self.db.scalars(UNKNOWN_ACTIVITIES_SQL)).all()
+
+        await self.db.commit()
+        invalidate_caches()
+        return {
+            "buildings_created": buildings.rowcount,
+            "organizations_created": created.rowcount,
+            "organizations_updated": updated.rowcount,
+            "links_created": links,
+            "unknown_activities": list(unknown_activities),
+        }
@@ -1,16 +1,175 @@
-from geoalchemy2 import WKTElement
-from shapely.geometry import box
-from sqlalchemy import select, func
+from datetime import datetime
+
+from sqlalchemy import (
+    select, func, and_, or_, delete, insert, update, cast, literal_column, text, bindparam, Select, Text, JSON, Float,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
 from sqlalchemy.orm import selectinload, with_loader_criteria
 
+from src.core.activity_tree import activity_tree
+from src.core.spatial_index import spatial_index
 from src.models import Organization, org_activity, Building, Activity
-from src.repositories.base import BaseRepository
+from src.repositories.base import (
+    BaseRepository, Page, like_pattern, encode_cursor, decode_ranked_cursor, sql_strip, sql_isoformat,
+)
+from src.core import settings
+from src.repositories.geo import (
+    radius_filter, bbox_filter, building_ids_filter, distance_to, grid_cell_size, grid_cells,
+)
+
+# Есть хотя бы одна неудалённая деятельность (EXISTS вместо join — без размножения строк)
+HAS_ACTIVE_ACTIVITY = Organization.activities.any(Activity.is_deleted == False)
+
+# Минимальная длина запроса поиска по названию, из которой pg_trgm извлекает триграмму
+TRIGRAM_MIN_LENGTH = 3
+
+ACTIVITIES_LOADER = (
+    selectinload(Organization.activities),
+    with_loader_criteria(
+        Activity,
+        Activity.is_deleted == False
+    ),
+)
+
+# Объект ответа в форме OrganizationBase, собранный в БД (json_build_object сохраняет порядок ключей).
+# Строки и даты приводятся так же, как в src/api/serializers.py + orjson.
+ACTIVITY_JSON = func.json_build_object(
+    "id", Activity.id,
+    "name", sql_strip(Activity.name),
+    "parent_id", Activity.parent_id,
+    "created_at", sql_isoformat(Activity.created_at),
+    "updated_at", sql_isoformat(Activity.updated_at),
+)
+ACTIVITIES_JSON = (
+    select(func.coalesce(func.json_agg(aggregate_order_by(ACTIVITY_JSON, Activity.id)), literal_column("'[]'::json")))
+    .select_from(org_activity.join(Activity, Activity.id == org_activity.c.activity_id))
+    .where(org_activity.c.organization_id == Organization.id, Activity.is_deleted == False)
+    .scalar_subquery()
+)
+ORGANIZATION_JSON = cast(
+    func.json_build_object(
+        "id", Organization.id,
+        "name", Organization.name,
+        "phones", Organization.phones,
+        "building_id", Organization.building_id,
+        "activities", ACTIVITIES_JSON,
+        "created_at", sql_isoformat(Organization.created_at),
+        "updated_at", sql_isoformat(Organization.updated_at),
+    ),
+    Text,
+)
+
+# Агрегация организаций прямоугольника по ячейкам сетки :cell_size градусов
+# с началом в (:lat1, :lon1): число, центр масс и самые частые деятельности ячейки.
+# Точки на верхней и правой границе попадают в крайнюю ячейку (:max_index).
+BBOX_CLUSTERS_SQL = text("""
+    WITH points AS (
+        SELECT o.id, b.latitude, b.longitude,
+               least(floor((b.latitude - :lat1) / :cell_size)::int, :max_index) AS row,
+               least(floor((b.longitude - :lon1) / :cell_size)::int, :max_index) AS col
+        FROM organizations AS o
+        JOIN buildings AS b ON b.id = o.building_id
+        WHERE ST_Intersects(b.geom, ST_MakeEnvelope(:lon1, :lat1, :lon2, :lat2, 4326))
+          AND NOT o.is_deleted
+          AND NOT b.is_deleted
+          AND EXISTS (
+              SELECT 1
+              FROM org_activity AS oa
+              JOIN activities AS a ON a.id = oa.activity_id
+              WHERE oa.organization_id = o.id AND NOT a.is_deleted
+          )
+    ),
+    cells AS (
+        SELECT row, col, count(*) AS count, avg(latitude) AS latitude, avg(longitude) AS longitude
+        FROM points
+        GROUP BY row, col
+    ),
+    activity_counts AS (
+        SELECT p.row, p.col, a.id, a.name, count(*) AS count,
+               row_number() OVER (PARTITION BY p.row, p.col ORDER BY count(*) DESC, a.id) AS rank
+        FROM points AS p
+        JOIN org_activity AS oa ON oa.organization_id = p.id
+        JOIN activities AS a ON a.id = oa.activity_id AND NOT a.is_deleted
+        GROUP BY p.row, p.col, a.id, a.name
+    )
+    SELECT c.row, c.col, c.count, c.latitude, c.longitude,
+           coalesce(
+               (
+                   SELECT json_agg(json_build_object('id', ac.id, 'name', ac.name, 'count', ac.count) ORDER BY ac.rank)
+                   FROM activity_counts AS ac
+                   WHERE ac.row = c.row AND ac.col = c.col AND ac.rank <= :top
+               ),
+               '[]'::json
+           ) AS top_activities
+    FROM cells AS c
+    ORDER BY c.row, c.col
+""").columns(top_activities=JSON)
+
+# Организации в радиусе :radius_m от каждой точки одним запросом: unnest массивов координат
+# и LATERAL-подзапрос на точку (ST_DWithin по idx_building_geog), не больше :limit строк на точку,
+# ближайшие первыми. idx — номер точки во входном списке (с 1).
+NEARBY_POINTS_SQL = text("""
+    SELECT p.idx, n.organization_id, n.distance_m
+    FROM unnest(:latitudes, :longitudes) WITH ORDINALITY AS p(latitude, longitude, idx)
+    CROSS JOIN LATERAL (
+        SELECT geography(ST_SetSRID(ST_MakePoint(p.longitude, p.latitude), 4326)) AS geog
+    ) AS center
+    CROSS JOIN LATERAL (
+        SELECT o.id AS organization_id, geography(b.geom) <-> center.geog AS distance_m
+        FROM buildings AS b
+        JOIN organizations AS o ON o.building_id = b.id
+        WHERE ST_DWithin(geography(b.geom), center.geog, :radius_m, false)
+          AND NOT o.is_deleted
+          AND NOT b.is_deleted
+          AND EXISTS (
+              SELECT 1
+              FROM org_activity AS oa
+              JOIN activities AS a ON a.id = oa.activity_id
+              WHERE oa.organization_id = o.id AND NOT a.is_deleted
+          )
+        ORDER BY distance_m, o.id
+        LIMIT :limit
+    ) AS n
+    ORDER BY p.idx, n.distance_m, n.organization_id
+""").bindparams(
+    bindparam("latitudes", type_=ARRAY(Float)),
+    bindparam("longitudes", type_=ARRAY(Float)),
+)
+
+# То же для прямоугольников (углы уже упорядочены): не больше :limit организаций
+# на прямоугольник, по возрастанию id
+NEARBY_BOXES_SQL = text("""
+    SELECT q.idx, n.organization_id
+    FROM unnest(:lat1s, :lon1s, :lat2s, :lon2s) WITH ORDINALITY AS q(lat1, lon1, lat2, lon2, idx)
+    CROSS JOIN LATERAL (
+        SELECT o.id AS organization_id
+        FROM buildings AS b
+        JOIN organizations AS o ON o.building_id = b.id
+        WHERE ST_Intersects(b.geom, ST_MakeEnvelope(q.lon1, q.lat1, q.lon2, q.lat2, 4326))
+          AND NOT o.is_deleted
+          AND NOT b.is_deleted
+          AND EXISTS (
+              SELECT 1
+              FROM org_activity AS oa
+              JOIN activities AS a ON a.id = oa.activity_id
+              WHERE oa.organization_id = o.id AND NOT a.is_deleted
+          )
+        ORDER BY o.id
+        LIMIT :limit
+    ) AS n
+    ORDER BY q.idx, n.organization_id
+""").bindparams(
+    bindparam("lat1s", type_=ARRAY(Float)),
+    bindparam("lon1s", type_=ARRAY(Float)),
+    bindparam("lat2s", type_=ARRAY(Float)),
+    bindparam("lon2s", type_=ARRAY(Float)),
+)
 
 
 class OrganizationRepository(BaseRepository[Organization]):
     """Репозиторий для работы с организациями (Organization)"""
 
-    async def list_by_building(self, building_id: int):
+    async def list_by_building(self, building_id: int, cursor: str | None = None, limit: int | None = None):
         query = (
             select(Organization)
             .where(
@@ -25,8 +184,7 @@ class OrganizationRepository(BaseRepository[Organization]):
                 )
             )
         )
-        result = await self.db.execute(query)
-        return result.scalars().all()
+        return await self._paginate(query, cursor, limit)
 
     async def get_by_id(self, obj_id: int):
         query = (
@@ -46,16 +204,10 @@ class OrganizationRepository(BaseRepository[Organization]):
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
-    async def list_by_activity(self, activity_id: int):
-        query = (
+    def _by_ids_query(self, ids: list[int]) -> Select:
+        return (
             select(Organization)
-            .join(org_activity)
-            .join(Activity)
-            .where(
-                org_activity.c.activity_id == activity_id,
-                Organization.is_deleted == False,
-                Activity.is_deleted == False
-            )
+            .where(Organization.id == self._ids_param(ids))
             .options(
                 selectinload(Organization.activities),
                 with_loader_criteria(
@@ -64,21 +216,134 @@ class OrganizationRepository(BaseRepository[Organization]):
                 )
             )
         )
-        result = await self.db.execute(query)
-        return result.scalars().all()
 
-    async def list_in_radius(self, latitude: float, longitude: float, radius_km: float):
+    async def get_many(self, ids: list[int]):
+        """
+        Организации по списку id (два запроса: организации и их деятельности).
+        Возвращает (найденные организации в порядке ids, не найденные или удалённые id).
+        """
+        ids = list(dict.fromkeys(ids))
+        result = await self.db.execute(self._by_ids_query(ids).where(Organization.is_deleted == False))
+        by_id = {organization.id: organization for organization in result.scalars().all()}
+        return [by_id[org_id] for org_id in ids if org_id in by_id], [org_id for org_id in ids if org_id not in by_id]
+
+    async def list_nearby_batch(
+            self,
+            points: list[tuple[float, float]],
+            boxes: list[tuple[float, float, float, float]],
+            radius_km: float,
+            limit: int,
+    ):
+        """
+        Организации вокруг многих точек (в радиусе radius_km) и в многих прямоугольниках:
+        по одному запросу unnest + LATERAL на точки и на прямоугольники, затем один запрос
+        за самими организациями (общие для нескольких входов загружаются один раз).
+        Возвращает (группы точек, группы прямоугольников) в порядке входа; группа —
+        (строки, есть ли ещё). Строка точки — (Organization, distance_m), прямоугольника — Organization.
+        """
+        point_rows, box_rows = [], []
+        if points:
+            latitudes, longitudes = zip(*points)
+            result = await self.db.execute(
+                NEARBY_POINTS_SQL,
+                {
+                    "latitudes": list(latitudes), "longitudes": list(longitudes),
+                    "radius_m": radius_km * 1000, "limit": limit + 1,
+                },
+            )
+            point_rows = result.all()
+        if boxes:
+            lat1s, lon1s, lat2s, lon2s = zip(*(
+                (min(lat1, lat2), min(lon1, lon2), max(lat1, lat2), max(lon1, lon2))
+                for lat1, lon1, lat2, lon2 in boxes
+            ))
+            result = await self.db.execute(
+                NEARBY_BOXES_SQL,
+                {
+                    "lat1s": list(lat1s), "lon1s": list(lon1s), "lat2s": list(lat2s), "lon2s": list(lon2s),
+                    "limit": limit + 1,
+                },
+            )
+            box_rows = result.all()
+
+        ids = {row.organization_id for row in point_rows} | {row.organization_id for row in box_rows}
+        organizations = {}
+        if ids:
+            result = await self.db.execute(self._by_ids_query(list(ids)))
+            organizations = {organization.id: organization for organization in result.scalars().all()}
+
+        # Организация могла быть удалена между запросами — такие строки пропускаются
+        point_groups = [[] for _ in points]
+        for row in point_rows:
+            if row.organization_id in organizations:
+                point_groups[row.idx - 1].append((organizations[row.organization_id], row.distance_m))
+        box_groups = [[] for _ in boxes]
+        for row in box_rows:
+            if row.organization_id in organizations:
+                box_groups[row.idx - 1].append(organizations[row.organization_id])
+
+        return (
+            [(group[:limit], len(group) > limit) for group in point_groups],
+            [(group[:limit], len(group) > limit) for group in box_groups],
+        )
+
+    async def _replace_activities(self, links: dict[int, list[int]]):
+        """
+        Замена связей организаций с деятельностями (без commit). updated_at организаций
+        сдвигается: по нему инкрементально обновляется индекс зданий в памяти.
+        """
+        await self.db.execute(delete(org_activity).where(org_activity.c.organization_id == self._ids_param(list(links))))
+        await self.db.execute(
+            update(Organization)
+            .where(Organization.id == self._ids_param(list(links)))
+            .values(updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        rows = [
+            {"organization_id": org_id, "activity_id": activity_id}
+            for org_id, activity_ids in links.items()
+            for activity_id in dict.fromkeys(activity_ids)
+        ]
+        if rows:
+            await self.db.execute(insert(org_activity), rows)
+
+    async def create_many(self, objs_in: list[dict]):
+        """Создание пачки организаций вместе со связями с деятельностями (ключ "activity_ids")"""
+        if not objs_in:
+            return []
+        activity_ids = [obj.get("activity_ids", []) for obj in objs_in]
+        organizations = await self._insert_many(
+            [{key: value for key, value in obj.items() if key != "activity_ids"} for obj in objs_in]
+        )
+        ids = [organization.id for organization in organizations]
+        await self._replace_activities(dict(zip(ids, activity_ids)))
+        await self.db.commit()
+        self._on_write()
+
+        # Перечитываем созданные организации вместе с деятельностями
+        result = await self.db.execute(self._by_ids_query(ids).execution_options(populate_existing=True))
+        by_id = {organization.id: organization for organization in result.scalars().all()}
+        return [by_id[org_id] for org_id in ids]
+
+    async def _update_rows(self, rows: list[dict]):
+        """Обновление организаций; если передан "activity_ids", связи заменяются целиком"""
+        links = {row["id"]: row["activity_ids"] for row in rows if "activity_ids" in row}
+        columns = [{key: value for key, value in row.items() if key != "activity_ids"} for row in rows]
+        # Строки только с id (меняются лишь связи) в UPDATE не нужны
+        columns = [row for row in columns if len(row) > 1]
+        if columns:
+            await self.db.execute(update(Organization), columns)
+        if links:
+            await self._replace_activities(links)
+
+    async def list_by_activity(self, activity_id: int, cursor: str | None = None, limit: int | None = None):
         query = (
             select(Organization)
-            .join(Organization.building)
-            .join(Organization.activities)
+            .join(org_activity)
+            .join(Activity)
             .where(
-                func.ST_DistanceSphere(
-                    Building.geom,
-                    func.ST_MakePoint(longitude, latitude)
-                ) <= radius_km * 1000,
+                org_activity.c.activity_id == activity_id,
                 Organization.is_deleted == False,
-                Building.is_deleted == False,
                 Activity.is_deleted == False
             )
             .options(
@@ -89,41 +354,100 @@ class OrganizationRepository(BaseRepository[Organization]):
                 )
             )
         )
-        result = await self.db.execute(query)
-        return result.scalars().all()
-
-    async def list_in_bbox(self, lat1: float, lon1: float, lat2: float, lon2: float):
-        shapely_box = box(lon1, lat1, lon2, lat2)
-        bbox_geom = WKTElement(shapely_box.wkt, srid=4326)
+        return await self._paginate(query, cursor, limit)
 
-        query = (
+    @staticmethod
+    def _geo_query(spatial_filter) -> Select:
+        return (
             select(Organization)
             .join(Organization.building)
-            .join(Organization.activities)
             .where(
-                func.ST_Intersects(Building.geom, bbox_geom),
+                spatial_filter,
                 Organization.is_deleted == False,
                 Building.is_deleted == False,
-                Activity.is_deleted == False
-            )
-            .options(
-                selectinload(Organization.activities),
-                with_loader_criteria(
-                    Activity,
-                    Activity.is_deleted == False
-                )
+                HAS_ACTIVE_ACTIVITY
             )
         )
-        result = await self.db.execute(query)
-        return result.scalars().all()
 
-    async def search_by_name(self, query_text: str):
+    async def _radius_query(self, latitude: float, longitude: float, radius_km: float) -> Select:
+        return self._geo_query(await radius_filter(latitude, longitude, radius_km))
+
+    async def list_in_radius(
+            self,
+            latitude: float,
+            longitude: float,
+            radius_km: float,
+            cursor: str | None = None,
+            limit: int | None = None,
+    ):
+        query = (await self._radius_query(latitude, longitude, radius_km)).options(*ACTIVITIES_LOADER)
+        return await self._paginate(query, cursor, limit)
+
+    async def _bbox_query(self, lat1: float, lon1: float, lat2: float, lon2: float) -> Select:
+        return self._geo_query(await bbox_filter(lat1, lon1, lat2, lon2))
+
+    async def list_in_bbox(
+            self,
+            lat1: float,
+            lon1: float,
+            lat2: float,
+            lon2: float,
+            cursor: str | None = None,
+            limit: int | None = None,
+    ):
+        query = (await self._bbox_query(lat1, lon1, lat2, lon2)).options(*ACTIVITIES_LOADER)
+        return await self._paginate(query, cursor, limit)
+
+    async def stream_in_bbox(self, lat1: float, lon1: float, lat2: float, lon2: float):
+        query = (await self._bbox_query(lat1, lon1, lat2, lon2)).options(*ACTIVITIES_LOADER)
+        async for organization in self._stream(query):
+            yield organization
+
+    async def list_bbox_clusters(self, lat1: float, lon1: float, lat2: float, lon2: float):
+        """
+        Организации прямоугольника, агрегированные по сетке: не больше cluster_grid_cells²
+        ячеек при любой плотности. Возвращает (размер ячейки в градусах, ячейки).
+        """
+        lat1, lat2 = sorted((lat1, lat2))
+        lon1, lon2 = sorted((lon1, lon2))
+        cell_size = grid_cell_size(lat1, lon1, lat2, lon2)
+        result = await self.db.execute(
+            BBOX_CLUSTERS_SQL,
+            {
+                "lat1": lat1, "lon1": lon1, "lat2": lat2, "lon2": lon2,
+                "cell_size": cell_size, "max_index": settings.cluster_grid_cells - 1,
+                "top": settings.cluster_top_activities,
+            },
+        )
+        return cell_size, grid_cells(result.mappings(), lat1, lon1, cell_size)
+
+    async def search_by_name(self, query_text: str, cursor: str | None = None, limit: int | None = None):
+        """
+        Поиск по вхождению подстроки в название, отсортированный по похожести.
+        ILIKE '%q%' обслуживается триграммным GIN-индексом idx_organization_name_trgm,
+        ранжирование — word_similarity из pg_trgm.
+        Keyset-пагинация по (похожесть DESC, id): курсор хранит оба значения.
+        Запрос короче TRIGRAM_MIN_LENGTH не даёт триграмм: индекс и ранжирование ему
+        бесполезны, поэтому он читается по первичному ключу до набора страницы (курсор — id).
+        """
+        if len(query_text) < TRIGRAM_MIN_LENGTH:
+            query = (
+                select(Organization)
+                .where(Organization.name.ilike(like_pattern(query_text)), Organization.is_deleted == False)
+                .options(*ACTIVITIES_LOADER)
+            )
+            return await self._paginate(query, cursor, limit)
+
+        score = func.word_similarity(query_text, Organization.name, type_=Float).label("score")
+        page_size = self._page_size(limit)
         query = (
-            select(Organization)
+            select(Organization, score)
             .where(
-                func.lower(Organization.name).like(f"%{query_text.lower()}%"),
+                Organization.name.ilike(like_pattern(query_text)),
                 Organization.is_deleted == False
             )
+            .order_by(score.desc(), Organization.id)
+            .limit(page_size + 1)
             .options(
                 selectinload(Organization.activities),
                 with_loader_criteria(
@@ -132,39 +456,129 @@ class OrganizationRepository(BaseRepository[Organization]):
                 )
             )
         )
-        result = await self.db.execute(query)
-        return result.scalars().all()
+        if cursor:
+            last_score, last_id = decode_ranked_cursor(cursor)
+            query = query.where(
+                or_(score < last_score, and_(score == last_score, Organization.id > last_id))
+            )
 
-    async def list_by_activity_tree(self, parent_activity_id: int):
+        rows = (await self.db.execute(query)).all()
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1][0].id, rows[-1][1]) if has_more else None
+        return Page(items=[row[0] for row in rows], next_cursor=next_cursor)
+
+    async def _activity_tree_query(self, parent_activity_id: int) -> Select:
         """
-        Возвращает все организации, связанные с активностями в дереве (включая потомков).
+        Все организации, связанные с активностями в дереве (включая потомков).
+        Поддерево берётся из дерева деятельностей в памяти процесса.
         """
-        activity_cte = (
-            select(Activity.id, Activity.parent_id)
-            .where(
-                Activity.id == parent_activity_id,
-                Activity.is_deleted == False
-            )
-            .cte(name="activity_tree", recursive=True)
-        )
+        activity_ids = await activity_tree.descendant_ids(parent_activity_id)
 
-        activity_cte = activity_cte.union_all(
-            select(Activity.id, Activity.parent_id)
+        return (
+            select(Organization)
             .where(
-                Activity.parent_id == activity_cte.c.id,
-                Activity.is_deleted == False
+                Organization.activities.any(
+                    and_(Activity.id.in_(activity_ids), Activity.is_deleted == False)
+                ),
+                Organization.is_deleted == False
             )
         )
 
+    async def list_by_activity_tree(
+            self,
+            parent_activity_id: int,
+            cursor: str | None = None,
+            limit: int | None = None,
+    ):
+        query = (await self._activity_tree_query(parent_activity_id)).options(*ACTIVITIES_LOADER)
+        return await self._paginate(query, cursor, limit)
+
+    async def stream_by_activity_tree(self, parent_activity_id: int):
+        query = (await self._activity_tree_query(parent_activity_id)).options(*ACTIVITIES_LOADER)
+        async for organization in self._stream(query):
+            yield organization
+
+    # Режим SQL JSON: ответ целиком собирается в Postgres, ORM-объекты не создаются
+
+    @staticmethod
+    def _as_json(query: Select) -> Select:
+        """Тот же запрос, но выбирающий (id, JSON-текст организации)."""
+        return query.with_only_columns(Organization.id, ORGANIZATION_JSON, maintain_column_froms=True)
+
+    async def list_in_radius_json(
+            self,
+            latitude: float,
+            longitude: float,
+            radius_km: float,
+            cursor: str | None = None,
+            limit: int | None = None,
+    ):
+        query = self._as_json(await self._radius_query(latitude, longitude, radius_km))
+        return await self._paginate_json(query, cursor, limit)
+
+    async def list_in_bbox_json(
+            self,
+            lat1: float,
+            lon1: float,
+            lat2: float,
+            lon2: float,
+            cursor: str | None = None,
+            limit: int | None = None,
+    ):
+        query = self._as_json(await self._bbox_query(lat1, lon1, lat2, lon2))
+        return await self._paginate_json(query, cursor, limit)
+
+    async def stream_in_bbox_json(self, lat1: float, lon1: float, lat2: float, lon2: float):
+        query = self._as_json(await self._bbox_query(lat1, lon1, lat2, lon2))
+        async for organization in self._stream_json(query):
+            yield organization
+
+    async def list_by_activity_tree_json(
+            self,
+            parent_activity_id: int,
+            cursor: str | None = None,
+            limit: int | None = None,
+    ):
+        query = self._as_json(await self._activity_tree_query(parent_activity_id))
+        return await self._paginate_json(query, cursor, limit)
+
+    async def stream_by_activity_tree_json(self, parent_activity_id: int):
+        query = self._as_json(await self._activity_tree_query(parent_activity_id))
+        async for organization in self._stream_json(query):
+            yield organization
+
+    async def list_nearest(
+            self,
+            latitude: float,
+            longitude: float,
+            limit: int,
+            activity_id: int | None = None,
+            name: str | None = None,
+    ):
+        """
+        K ближайших к точке организаций (KNN по GiST-индексу) вместе с расстоянием в метрах.
+        Возвращает строки (Organization, distance_m), отсортированные по удалённости.
+        """
+        if settings.spatial_backend == "memory" and activity_id is None and not name:
+            return await self._nearest_from_index(latitude, longitude, limit)
+
+        distance = distance_to(latitude, longitude).label("distance_m")
+
+        activity_filter = Activity.is_deleted == False
+        if activity_id is not None:
+            activity_filter = and_(activity_filter, Activity.id == activity_id)
+
         query = (
-            select(Organization)
-            .join(org_activity)
-            .join(Activity)
+            select(Organization, distance)
+            .join(Organization.building)
             .where(
-                org_activity.c.activity_id.in_(select(activity_cte.c.id)),
+                Organization.activities.any(activity_filter),
                 Organization.is_deleted == False,
-                Activity.is_deleted == False
+                Building.is_deleted == False
             )
+            .order_by(distance)
+            .limit(limit)
             .options(
                 selectinload(Organization.activities),
                 with_loader_criteria(
@@ -173,5 +587,30 @@ class OrganizationRepository(BaseRepository[Organization]):
                 )
             )
         )
+        if name:
+            query = query.where(Organization.name.ilike(like_pattern(name)))
+
         result = await self.db.execute(query)
-        return result.scalars().all()
+        return result.all()
+
+    async def _nearest_from_index(self, latitude: float, longitude: float, limit: int):
+        """
+        K ближайших по индексу зданий в памяти. В каждом видимом здании есть хотя бы одна
+        подходящая организация, поэтому k ближайших организаций лежат в k ближайших зданиях.
+        Если индекс отстал и часть зданий уже пуста, число зданий удваивается, пока
+        не наберётся limit организаций или здания не кончатся.
+        """
+        k = limit
+        while True:
+            ids, distances = await spatial_index.nearest(latitude, longitude, k)
+            building_distances = dict(zip(ids.tolist(), distances.tolist()))
+            query = self._geo_query(building_ids_filter(building_distances)).options(*ACTIVITIES_LOADER)
+            rows = [
+                (organization, building_distances[organization.building_id])
+                for organization in (await self.db.scalars(query)).all()
+            ]
+            if len(rows) >= limit or len(ids) < k:
+                break
+            k *= 2
+        rows.sort(key=lambda row: (row[1], row[0].id))
+        return rows[:limit]
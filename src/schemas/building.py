@@ -33,4 +33,22 @@ class BuildingBase(BaseModel):
                 "created_at": "2025-10-23T07:59:55.467718",
                 "updated_at": "2025-10-23T07:59:55.467718"
             }
-        }
\ No newline at end of file
+        }
+
+
+class BuildingDistance(BaseModel):
+    distance_m: float = Field(..., description="Расстояние до точки в метрах")
+    building: BuildingBase
+
+
+class BuildingCluster(BaseModel):
+    latitude: float = Field(..., description="Широта центра масс зданий ячейки")
+    longitude: float = Field(..., description="Долгота центра масс зданий ячейки")
+    count: int = Field(..., description="Число зданий в ячейке")
+    organizations: int = Field(..., description="Число организаций в зданиях ячейки")
+    bbox: list[float] = Field(..., description="Границы ячейки [lat1, lon1, lat2, lon2]")
+
+
+class BuildingClusters(BaseModel):
+    cell_size_deg: float = Field(..., description="Сторона ячейки сетки в градусах")
+    clusters: list[BuildingCluster]
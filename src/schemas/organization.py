@@ -1,8 +1,9 @@
 from datetime import datetime
 from typing import List
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
+from src.core import settings
 from src.schemas.activity import ActivityBase
 
 
@@ -27,4 +28,102 @@ class OrganizationBase(BaseModel):
                 "created_at": "2025-10-23T07:59:55.467718",
                 "updated_at": "2025-10-23T07:59:55.467718"
             }
-        }
\ No newline at end of file
+        }
+
+
+class OrganizationDistance(BaseModel):
+    distance_m: float = Field(..., description="Расстояние до точки в метрах")
+    organization: OrganizationBase
+
+
+class ActivityCount(BaseModel):
+    id: int
+    name: str
+    count: int = Field(..., description="Число организаций ячейки с этой деятельностью")
+
+
+class OrganizationCluster(BaseModel):
+    latitude: float = Field(..., description="Широта центра масс организаций ячейки")
+    longitude: float = Field(..., description="Долгота центра масс организаций ячейки")
+    count: int = Field(..., description="Число организаций в ячейке")
+    bbox: list[float] = Field(..., description="Границы ячейки [lat1, lon1, lat2, lon2]")
+    top_activities: list[ActivityCount] = Field(..., description="Самые частые деятельности ячейки")
+
+
+class OrganizationClusters(BaseModel):
+    cell_size_deg: float = Field(..., description="Сторона ячейки сетки в градусах")
+    clusters: list[OrganizationCluster]
+
+
+class OrganizationCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=300, description="Название организации")
+    phones: list[str] = Field(default_factory=list, description="Список телефонов")
+    building_id: int = Field(..., description="ID здания")
+    activity_ids: list[int] = Field(default_factory=list, description="ID видов деятельности")
+
+
+class OrganizationUpdate(BaseModel):
+    id: int = Field(..., description="ID организации")
+    name: str | None = Field(None, min_length=1, max_length=300, description="Название организации")
+    phones: list[str] | None = Field(None, description="Список телефонов")
+    building_id: int | None = Field(None, description="ID здания")
+    activity_ids: list[int] | None = Field(None, description="ID видов деятельности (заменяют текущие)")
+
+
+class OrganizationBatch(BaseModel):
+    items: list[OrganizationBase] = Field(..., description="Найденные организации в порядке запроса")
+    missing: list[int] = Field(..., description="ID, которые не найдены или удалены")
+
+
+class BulkIds(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=settings.bulk_max_items, description="ID организаций")
+
+
+class BulkResult(BaseModel):
+    ids: list[int] = Field(..., description="ID обработанных организаций")
+    missing: list[int] = Field(..., description="ID, которые не найдены или уже удалены")
+
+
+class NearbyPoint(BaseModel):
+    latitude: float = Field(..., ge=-90, le=90, description="Широта точки")
+    longitude: float = Field(..., ge=-180, le=180, description="Долгота точки")
+
+
+class NearbyBox(BaseModel):
+    lat1: float = Field(..., ge=-90, le=90, description="Минимальная широта (юго-запад)")
+    lon1: float = Field(..., ge=-180, le=180, description="Минимальная долгота (юго-запад)")
+    lat2: float = Field(..., ge=-90, le=90, description="Максимальная широта (северо-восток)")
+    lon2: float = Field(..., ge=-180, le=180, description="Максимальная долгота (северо-восток)")
+
+
+class NearbyBatchRequest(BaseModel):
+    points: list[NearbyPoint] = Field(default_factory=list, description="Точки поиска в радиусе")
+    boxes: list[NearbyBox] = Field(default_factory=list, description="Прямоугольники поиска")
+    radius_km: float = Field(1.0, gt=0, description="Радиус поиска вокруг точек в километрах")
+    limit: int = Field(
+        20, ge=1, le=settings.max_page_size, description="Не больше организаций на одну точку или прямоугольник"
+    )
+
+    @model_validator(mode="after")
+    def validate_size(self):
+        total = len(self.points) + len(self.boxes)
+        if not total:
+            raise ValueError("Нужна хотя бы одна точка или прямоугольник")
+        if total > settings.bulk_max_items:
+            raise ValueError(f"Не больше {settings.bulk_max_items} точек и прямоугольников за запрос")
+        return self
+
+
+class NearbyPointResult(BaseModel):
+    items: list[OrganizationDistance] = Field(..., description="Организации в радиусе, ближайшие первыми")
+    truncated: bool = Field(..., description="Есть организации сверх limit")
+
+
+class NearbyBoxResult(BaseModel):
+    items: list[OrganizationBase] = Field(..., description="Организации в прямоугольнике по возрастанию id")
+    truncated: bool = Field(..., description="Есть организации сверх limit")
+
+
+class NearbyBatchResult(BaseModel):
+    points: list[NearbyPointResult] = Field(..., description="Результаты в порядке points")
+    boxes: list[NearbyBoxResult] = Field(..., description="Результаты в порядке boxes")
@@ -1,3 +1,4 @@
+from src.core.cache import tile_cache
 from src.repositories.building_repo import BuildingRepository
 
 
@@ -5,9 +6,47 @@ class BuildingService:
     def __init__(self, repo: BuildingRepository):
         self.repo = repo
 
-    async def list_in_bbox(self, lat1: float, lon1: float, lat2: float, lon2: float):
-        return await self.repo.list_in_bbox(lat1, lon1, lat2, lon2)
+    async def list_in_bbox(
+            self,
+            lat1: float,
+            lon1: float,
+            lat2: float,
+            lon2: float,
+            cursor: str | None = None,
+            limit: int | None = None,
+    ):
+        return await self.repo.list_in_bbox(lat1, lon1, lat2, lon2, cursor, limit)
 
-    async def list_in_radius(self, latitude: float, longitude: float, radius_km: float):
-        return await self.repo.list_in_radius(latitude, longitude, radius_km)
+    async def list_bbox_clusters(self, lat1: float, lon1: float, lat2: float, lon2: float):
+        cell_size, clusters = await self.repo.list_bbox_clusters(lat1, lon1, lat2, lon2)
+        return {"cell_size_deg": cell_size, "clusters": clusters}
 
+    async def list_in_radius(
+            self,
+            latitude: float,
+            longitude: float,
+            radius_km: float,
+            cursor: str | None = None,
+            limit: int | None = None,
+    ):
+        return await self.repo.list_in_radius(latitude, longitude, radius_km, cursor, limit)
+
+    async def list_nearest(
+            self,
+            latitude: float,
+            longitude: float,
+            limit: int,
+            activity_id: int | None = None,
+            name: str | None = None,
+    ):
+        rows = await self.repo.list_nearest(latitude, longitude, limit, activity_id, name)
+        return [{"building": building, "distance_m": distance} for building, distance in rows]
+
+    async def get_tile(self, z: int, x: int, y: int, activity_id: int | None = None) -> bytes:
+        """Тайл MVT из кэша процесса; кэш сбрасывается при изменении данных."""
+        key = f"{z}/{x}/{y}:{activity_id}"
+        tile = tile_cache.get(key)
+        if tile is None:
+            tile = await self.repo.get_tile(z, x, y, activity_id)
+            tile_cache.set(key, tile)
+        return tile
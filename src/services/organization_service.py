@@ -8,20 +8,130 @@ class OrganizationService:
     async def get_by_id(self, org_id: int):
         return await self.repo.get_by_id(org_id)
 
-    async def list_by_building(self, building_id: int):
-        return await self.repo.list_by_building(building_id)
+    async def get_many(self, ids: list[int]):
+        organizations, missing = await self.repo.get_many(ids)
+        return {"items": organizations, "missing": missing}
 
-    async def list_by_activity(self, activity_id: int):
-        return await self.repo.list_by_activity(activity_id)
+    async def create_many(self, organizations: list[dict]):
+        return await self.repo.create_many(organizations)
 
-    async def list_in_radius(self, latitude: float, longitude: float, radius_km: float):
-        return await self.repo.list_in_radius(latitude, longitude, radius_km)
+    async def update_many(self, organizations: list[dict]):
+        updated, missing = await self.repo.update_many(organizations)
+        return {"ids": updated, "missing": missing}
 
-    async def list_in_bbox(self, lat1: float, lon1: float, lat2: float, lon2: float):
-        return await self.repo.list_in_bbox(lat1, lon1, lat2, lon2)
+    async def soft_delete_many(self, ids: list[int]):
+        deleted, missing = await self.repo.soft_delete_many(ids)
+        return {"ids": deleted, "missing": missing}
 
-    async def search_by_name(self, query_text: str):
-        return await self.repo.search_by_name(query_text)
+    async def list_by_building(self, building_id: int, cursor: str | None = None, limit: int | None = None):
+        return await self.repo.list_by_building(building_id, cursor, limit)
 
-    async def list_by_activity_tree(self, parent_activity_id: int):
-        return await self.repo.list_by_activity_tree(parent_activity_id)
+    async def list_by_activity(self, activity_id: int, cursor: str | None = None, limit: int | None = None):
+        return await self.repo.list_by_activity(activity_id, cursor, limit)
+
+    async def list_in_radius(
+            self,
+            latitude: float,
+            longitude: float,
+            radius_km: float,
+            cursor: str | None = None,
+            limit: int | None = None,
+    ):
+        return await self.repo.list_in_radius(latitude, longitude, radius_km, cursor, limit)
+
+    async def list_in_bbox(
+            self,
+            lat1: float,
+            lon1: float,
+            lat2: float,
+            lon2: float,
+            cursor: str | None = None,
+            limit: int | None = None,
+    ):
+        return await self.repo.list_in_bbox(lat1, lon1, lat2, lon2, cursor, limit)
+
+    async def list_bbox_clusters(self, lat1: float, lon1: float, lat2: float, lon2: float):
+        cell_size, clusters = await self.repo.list_bbox_clusters(lat1, lon1, lat2, lon2)
+        return {"cell_size_deg": cell_size, "clusters": clusters}
+
+    async def list_nearby_batch(
+            self,
+            points: list[tuple[float, float]],
+            boxes: list[tuple[float, float, float, float]],
+            radius_km: float,
+            limit: int,
+    ):
+        point_groups, box_groups = await self.repo.list_nearby_batch(points, boxes, radius_km, limit)
+        return {
+            "points": [
+                {
+                    "items": [{"organization": org, "distance_m": distance} for org, distance in rows],
+                    "truncated": truncated,
+                }
+                for rows, truncated in point_groups
+            ],
+            "boxes": [{"items": rows, "truncated": truncated} for rows, truncated in box_groups],
+        }
+
+    def stream_in_bbox(self, lat1: float, lon1: float, lat2: float, lon2: float):
+        return self.repo.stream_in_bbox(lat1, lon1, lat2, lon2)
+
+    async def search_by_name(self, query_text: str, cursor: str | None = None, limit: int | None = None):
+        return await self.repo.search_by_name(query_text, cursor, limit)
+
+    async def list_by_activity_tree(
+            self,
+            parent_activity_id: int,
+            cursor: str | None = None,
+            limit: int | None = None,
+    ):
+        return await self.repo.list_by_activity_tree(parent_activity_id, cursor, limit)
+
+    def stream_by_activity_tree(self, parent_activity_id: int):
+        return self.repo.stream_by_activity_tree(parent_activity_id)
+
+    async def list_in_radius_json(
+            self,
+            latitude: float,
+            longitude: float,
+            radius_km: float,
+            cursor: str | None = None,
+            limit: int | None = None,
+    ):
+        return await self.repo.list_in_radius_json(latitude, longitude, radius_km, cursor, limit)
+
+    async def list_in_bbox_json(
+            self,
+            lat1: float,
+            lon1: float,
+            lat2: float,
+            lon2: float,
+            cursor: str | None = None,
+            limit: int | None = None,
+    ):
+        return await self.repo.list_in_bbox_json(lat1, lon1, lat2, lon2, cursor, limit)
+
+    def stream_in_bbox_json(self, lat1: float, lon1: float, lat2: float, lon2: float):
+        return self.repo.stream_in_bbox_json(lat1, lon1, lat2, lon2)
+
+    async def list_by_activity_tree_json(
+            self,
+            parent_activity_id: int,
+            cursor: str | None = None,
+            limit: int | None = None,
+    ):
+        return await self.repo.list_by_activity_tree_json(parent_activity_id, cursor, limit)
+
+    def stream_by_activity_tree_json(self, parent_activity_id: int):
+        return self.repo.stream_by_activity_tree_json(parent_activity_id)
+
+    async def list_nearest(
+            self,
+            latitude: float,
+            longitude: float,
+            limit: int,
+            activity_id: int | None = None,
+            name: str | None = None,
+    ):
+        rows = await self.repo.list_nearest(latitude, longitude, limit, activity_id, name)
+        return [{"organization": org, "distance_m": distance} for org, distance in rows]
@@ -0,0 +1,43 @@
+"""
+Общие фикстуры тестов.
+
+Тесты с фикстурой db_session работают с настоящим Postgres + PostGIS со схемой
+после `alembic upgrade head` (TEST_DATABASE_URL или ASYNC_DATABASE_URL из настроек)
+и пропускаются, если БД недоступна. Каждый тест идёт во внешней транзакции,
+которая откатывается: commit в репозиториях фиксирует только точку сохранения.
+"""
+import os
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.core import settings
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", settings.async_database_url)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db_session():
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    try:
+        connection = await engine.connect()
+    except (OSError, exc.DBAPIError) as e:
+        await engine.dispose()
+        pytest.skip(f"БД недоступна: {e}")
+
+    transaction = await connection.begin()
+    session = AsyncSession(bind=connection, expire_on_commit=False, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        await session.close()
+        await transaction.rollback()
+        await connection.close()
+        await engine.dispose()
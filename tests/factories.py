@@ -0,0 +1,36 @@
+"""Создание тестовых данных в сессии теста (flush без commit)."""
+import uuid
+
+from geoalchemy2 import WKTElement
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import Activity, Building, Organization
+
+
+def unique_name(prefix: str) -> str:
+    return f"{prefix} {uuid.uuid4().hex[:12]}"
+
+
+async def create_organization(
+        session: AsyncSession,
+        latitude: float,
+        longitude: float,
+        activities: int = 1,
+        name: str | None = None,
+) -> Organization:
+    """Организация в новом здании с activities новыми неудалёнными деятельностями (flush без commit)."""
+    building = Building(
+        address=unique_name("Тестовый адрес"),
+        latitude=latitude,
+        longitude=longitude,
+        geom=WKTElement(f"POINT({longitude} {latitude})", srid=4326),
+    )
+    organization = Organization(
+        name=name or unique_name("Тестовая организация"),
+        phones=[],
+        building=building,
+        activities=[Activity(name=unique_name("Тестовая деятельность")) for _ in range(activities)],
+    )
+    session.add(organization)
+    await session.flush()
+    return organization
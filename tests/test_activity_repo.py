@@ -0,0 +1,76 @@
+"""Пакетные создание и обновление деятельностей поддерживают таблицу замыкания."""
+import pytest
+from sqlalchemy import select
+
+from src.exceptions import DepthLimitExceededError
+from src.models import Activity, activity_closure
+from src.repositories.activity_repo import ActivityRepository
+from tests.factories import unique_name
+
+pytestmark = pytest.mark.anyio
+
+
+async def closure(session, ids: list[int]) -> set[tuple[int, int, int]]:
+    result = await session.execute(
+        select(activity_closure.c.ancestor_id, activity_closure.c.descendant_id, activity_closure.c.depth)
+        .where(activity_closure.c.descendant_id.in_(ids))
+    )
+    return set(result.all())
+
+
+async def test_create_many_links_ancestors(db_session):
+    repository = ActivityRepository(Activity, db_session)
+    [root] = await repository.create_many([{"name": unique_name("Корень")}])
+    [child] = await repository.create_many([{"name": unique_name("Ветка"), "parent_id": root.id}])
+
+    leaves = await repository.create_many([
+        {"name": unique_name("Лист"), "parent_id": child.id},
+        {"name": unique_name("Лист"), "parent_id": root.id},
+    ])
+
+    assert await closure(db_session, [leaf.id for leaf in leaves]) == {
+        (leaves[0].id, leaves[0].id, 0), (child.id, leaves[0].id, 1), (root.id, leaves[0].id, 2),
+        (leaves[1].id, leaves[1].id, 0), (root.id, leaves[1].id, 1),
+    }
+
+
+async def test_update_many_moves_subtrees(db_session):
+    repository = ActivityRepository(Activity, db_session)
+    first, second, third = await repository.create_many([{"name": unique_name("Корень")} for _ in range(3)])
+
+    updated, missing = await repository.update_many([
+        {"id": second.id, "parent_id": first.id},
+        {"id": third.id, "parent_id": second.id},
+        {"id": -1, "parent_id": first.id},
+    ])
+
+    assert (updated, missing) == ([second.id, third.id], [-1])
+    assert await closure(db_session, [third.id]) == {
+        (third.id, third.id, 0), (second.id, third.id, 1), (first.id, third.id, 2),
+    }
+
+
+async def test_update_many_checks_depth_after_previous_moves(db_session):
+    repository = ActivityRepository(Activity, db_session)
+    activities = await repository.create_many([{"name": unique_name("Корень")} for _ in range(4)])
+
+    # Последний перенос делает цепочку глубиной 4, хотя по исходному дереву глубина 2
+    with pytest.raises(DepthLimitExceededError):
+        await repository.update_many([
+            {"id": activities[1].id, "parent_id": activities[0].id},
+            {"id": activities[2].id, "parent_id": activities[1].id},
+            {"id": activities[3].id, "parent_id": activities[2].id},
+        ])
+
+
+async def test_create_checks_depth_of_parent_unknown_to_tree(db_session):
+    # Дерево в памяти процесса читает основную БД и не видит незафиксированной цепочки теста
+    repository = ActivityRepository(Activity, db_session)
+    root = await repository.create({"name": unique_name("Корень")})
+    child = await repository.create({"name": unique_name("Ветка"), "parent_id": root.id})
+    leaf = await repository.create({"name": unique_name("Лист"), "parent_id": child.id})
+
+    with pytest.raises(DepthLimitExceededError):
+        await repository.create({"name": unique_name("Четвёртый уровень"), "parent_id": leaf.id})
+    with pytest.raises(DepthLimitExceededError):
+        await repository.create_many([{"name": unique_name("Четвёртый уровень"), "parent_id": leaf.id}])
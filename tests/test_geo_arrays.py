@@ -0,0 +1,124 @@
+"""Векторные гео-вычисления совпадают с поэлементным расчётом на той же сфере."""
+import math
+import random
+
+import numpy as np
+import pytest
+
+from src.core.geo_arrays import (
+    EARTH_RADIUS_M, GeoPoints, bbox_mask, haversine_m, radius_bbox, radius_bboxes, radius_mask,
+    split_antimeridian, top_k_nearest,
+)
+
+CENTER_LAT, CENTER_LON = 55.75, 37.62
+
+
+def python_haversine_m(latitude: float, longitude: float, lat: float, lon: float) -> float:
+    lat1, lat2 = math.radians(latitude), math.radians(lat)
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(math.radians(lon - longitude) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def destination(latitude: float, longitude: float, distance_m: float, bearing: float) -> tuple[float, float]:
+    """Точка на расстоянии distance_m по азимуту bearing (градусы) — по большому кругу."""
+    angle = distance_m / EARTH_RADIUS_M
+    lat1, lon1, theta = math.radians(latitude), math.radians(longitude), math.radians(bearing)
+    lat2 = math.asin(math.sin(lat1) * math.cos(angle) + math.cos(lat1) * math.sin(angle) * math.cos(theta))
+    lon2 = lon1 + math.atan2(
+        math.sin(theta) * math.sin(angle) * math.cos(lat1), math.cos(angle) - math.sin(lat1) * math.sin(lat2)
+    )
+    return math.degrees(lat2), math.degrees(lon2)
+
+
+@pytest.fixture
+def points() -> GeoPoints:
+    rng = random.Random(42)
+    return GeoPoints.from_mapping({
+        point_id: (CENTER_LAT + rng.uniform(-0.2, 0.2), CENTER_LON + rng.uniform(-0.2, 0.2))
+        for point_id in rng.sample(range(1, 100_000), 2000)
+    })
+
+
+def test_from_mapping_orders_by_id():
+    points = GeoPoints.from_mapping({3: (1.0, 2.0), 1: (3.0, 4.0)})
+
+    assert points.ids.tolist() == [1, 3]
+    assert points.lat.tolist() == [3.0, 1.0]
+    assert points.lon.tolist() == [4.0, 2.0]
+    assert len(GeoPoints.from_mapping({})) == 0
+
+
+def test_haversine_matches_python(points):
+    expected = [python_haversine_m(CENTER_LAT, CENTER_LON, lat, lon) for lat, lon in zip(points.lat, points.lon)]
+
+    assert haversine_m(CENTER_LAT, CENTER_LON, points.lat, points.lon) == pytest.approx(expected, rel=1e-12)
+
+
+def test_haversine_degree_of_latitude():
+    distance = haversine_m(0.0, 0.0, np.array([1.0]), np.array([0.0]))[0]
+
+    assert distance == pytest.approx(EARTH_RADIUS_M * math.pi / 180)
+
+
+@pytest.mark.parametrize("radius_m", [0.0, 250.0, 1000.0, 15_000.0])
+def test_radius_mask_matches_python(points, radius_m):
+    expected = [
+        python_haversine_m(CENTER_LAT, CENTER_LON, lat, lon) <= radius_m for lat, lon in zip(points.lat, points.lon)
+    ]
+
+    assert radius_mask(points.lat, points.lon, CENTER_LAT, CENTER_LON, radius_m).tolist() == expected
+
+
+def test_bbox_mask_inclusive_and_unordered():
+    lat, lon = np.array([1.0, 2.0, 3.0]), np.array([10.0, 20.0, 30.0])
+
+    assert bbox_mask(lat, lon, 2.0, 20.0, 3.0, 30.0).tolist() == [False, True, True]
+    assert bbox_mask(lat, lon, 3.0, 30.0, 2.0, 20.0).tolist() == [False, True, True]
+
+
+@pytest.mark.parametrize("latitude", [0.0, CENTER_LAT, -70.0, 88.0])
+@pytest.mark.parametrize("radius_m", [100.0, 5000.0, 200_000.0])
+def test_radius_bbox_contains_circle(latitude, radius_m):
+    lat1, lon1, lat2, lon2 = radius_bbox(latitude, CENTER_LON, radius_m)
+
+    for bearing in np.linspace(0.0, 360.0, 721):
+        lat, lon = destination(latitude, CENTER_LON, radius_m, bearing)
+        assert lat1 <= lat <= lat2
+        assert lon1 <= lon <= lon2
+
+
+@pytest.mark.parametrize("latitude", [89.5, 90.0, -89.5])
+def test_radius_bbox_around_pole_covers_all_longitudes(latitude):
+    lat1, lon1, lat2, lon2 = radius_bbox(latitude, CENTER_LON, 100_000.0)
+
+    assert (lon1, lon2) == (-180.0, 180.0)
+    assert -90.0 <= lat1 < lat2 <= 90.0
+
+
+def test_split_antimeridian():
+    assert split_antimeridian(1.0, 10.0, 2.0, 20.0) == [(1.0, 10.0, 2.0, 20.0)]
+    assert split_antimeridian(1.0, 179.0, 2.0, 181.0) == [(1.0, 179.0, 2.0, 180.0), (1.0, -180.0, 2.0, -179.0)]
+    assert split_antimeridian(1.0, -181.0, 2.0, -179.0) == [(1.0, 179.0, 2.0, 180.0), (1.0, -180.0, 2.0, -179.0)]
+    assert split_antimeridian(1.0, -200.0, 2.0, 200.0) == [(1.0, -180.0, 2.0, 180.0)]
+
+
+@pytest.mark.parametrize("longitude", [179.99, -179.99, 180.0, -180.0])
+def test_radius_bboxes_contain_circle_across_antimeridian(longitude):
+    boxes = radius_bboxes(-16.5, longitude, 5000.0)
+
+    for bearing in np.linspace(0.0, 360.0, 721):
+        lat, lon = destination(-16.5, longitude, 5000.0, bearing)
+        lon = (lon + 180.0) % 360.0 - 180.0
+        assert any(lat1 <= lat <= lat2 and lon1 <= lon <= lon2 for lat1, lon1, lat2, lon2 in boxes)
+    assert all(-180.0 <= lon1 <= lon2 <= 180.0 for _, lon1, _, lon2 in boxes)
+
+
+@pytest.mark.parametrize("k", [1, 10, 2000, 5000])
+def test_top_k_nearest_matches_sort(points, k):
+    distances = haversine_m(CENTER_LAT, CENTER_LON, points.lat, points.lon)
+
+    positions, top = top_k_nearest(CENTER_LAT, CENTER_LON, points.lat, points.lon, k)
+
+    expected = np.argsort(distances, kind="stable")[:k]
+    assert positions.tolist() == expected.tolist()
+    assert top.tolist() == distances[expected].tolist()
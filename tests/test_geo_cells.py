@@ -0,0 +1,30 @@
+"""Границы ячеек согласованы с номерами ячеек; покрытие круга не теряет ячеек за ±180°."""
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.core.geo_cells import cell_bounds, cell_id
+from src.repositories.geo import cells_in_radius
+
+
+@pytest.mark.parametrize("level", [1, 8, 16, 24])
+@pytest.mark.parametrize("point", [(55.751234, 37.612345), (-33.87, -151.21), (0.0, 0.0), (-90.0, -180.0)])
+def test_cell_bounds_contain_point_and_match_cell(level, point):
+    latitude, longitude = point
+
+    lat1, lon1, lat2, lon2 = cell_bounds(latitude, longitude, level)
+
+    assert lat1 <= latitude < lat2 and lon1 <= longitude < lon2
+    assert cell_id(lat1, lon1, level) == cell_id(latitude, longitude, level)
+
+
+def test_cell_bounds_of_upper_edge_are_last_cell():
+    assert cell_bounds(90.0, 180.0, 1) == (0.0, 0.0, 90.0, 180.0)
+
+
+def test_cells_in_radius_cover_both_sides_of_antimeridian():
+    params = list(cells_in_radius(-16.5, 179.9999, 1.0).compile(dialect=postgresql.dialect()).params.values())
+    ranges = list(zip(params[::2], params[1::2]))
+
+    for longitude in (179.9999, -179.9999):
+        cell = cell_id(-16.5, longitude)
+        assert any(low <= cell < high for low, high in ranges)
@@ -0,0 +1,51 @@
+"""Массовый импорт: повторы ключа в файле разрешаются в пользу последней строки."""
+import pytest
+from sqlalchemy import select, text
+
+from src.models import Building, Organization
+from src.repositories.import_repo import STAGING_TABLE, ImportRepository
+from src.services.import_service import ImportService
+from tests.factories import unique_name
+
+pytestmark = pytest.mark.anyio
+
+
+def record(name: str, address: str, latitude: float, phones: list[str]) -> tuple:
+    return name, phones, [], address, latitude, 166.67
+
+
+async def test_duplicate_keys_take_last_row(db_session):
+    service = ImportService(ImportRepository(db_session))
+    name, address = unique_name("Организация"), unique_name("Адрес")
+
+    stats = await service.import_records([
+        record(name, address, -77.85, ["1"]),
+        record(name, address, -77.86, ["2"]),
+        record(name, address, -77.87, ["3"]),
+    ], batch_size=2)
+
+    building = await db_session.scalar(select(Building).where(Building.address == address))
+    organization = await db_session.scalar(select(Organization).where(Organization.name == name))
+    assert (stats.buildings_created, stats.organizations_created) == (1, 1)
+    assert building.latitude == -77.87
+    assert organization.phones == ["3"]
+
+
+async def test_duplicate_keys_update_existing_with_last_row(db_session):
+    service = ImportService(ImportRepository(db_session))
+    name, address = unique_name("Организация"), unique_name("Адрес")
+    await service.import_records([record(name, address, -77.85, ["1"])])
+    # В тесте commit фиксирует лишь точку сохранения, и временная таблица (ON COMMIT DROP) остаётся
+    await db_session.execute(text(f"DROP TABLE {STAGING_TABLE}"))
+
+    stats = await service.import_records([
+        record(name, address, -77.85, ["3"]),
+        record(name, address, -77.85, ["2"]),
+        record(name, address, -77.85, ["4"]),
+    ])
+
+    organization = await db_session.scalar(
+        select(Organization).where(Organization.name == name).execution_options(populate_existing=True)
+    )
+    assert stats.organizations_updated == 1
+    assert organization.phones == ["4"]
@@ -0,0 +1,77 @@
+"""
+Горячие запросы читают частичные индексы (WHERE NOT is_deleted).
+Последовательное сканирование отключается, чтобы проверка не зависела от объёма данных.
+"""
+import pytest
+from sqlalchemy import func, select, text
+
+from src.models import Activity, Building, Organization, org_activity
+from src.repositories.geo import cells_in_bbox, distance_to, within_radius
+
+pytestmark = pytest.mark.anyio
+
+LAT, LON = 55.75, 37.62
+ENVELOPE = func.ST_MakeEnvelope(LON - 0.01, LAT - 0.01, LON + 0.01, LAT + 0.01, 4326)
+
+CASES = [
+    pytest.param(
+        "idx_building_geog",
+        select(Building.id).where(within_radius(LAT, LON, 1.0), Building.is_deleted == False),
+        id="здания в радиусе",
+    ),
+    pytest.param(
+        "idx_building_geom",
+        select(Building.id).where(func.ST_Intersects(Building.geom, ENVELOPE), Building.is_deleted == False),
+        id="здания в прямоугольнике",
+    ),
+    pytest.param(
+        "idx_building_geog",
+        select(Building.id).where(Building.is_deleted == False).order_by(distance_to(LAT, LON)).limit(20),
+        id="ближайшие здания",
+    ),
+    pytest.param(
+        "idx_building_geo_cell",
+        select(Building.id).where(
+            cells_in_bbox(LAT - 0.01, LON - 0.01, LAT + 0.01, LON + 0.01), Building.is_deleted == False
+        ),
+        id="здания по ячейкам geo_cell",
+    ),
+    pytest.param(
+        "idx_organization_building_id",
+        select(Organization.id).where(Organization.building_id == 1, Organization.is_deleted == False),
+        id="организации здания",
+    ),
+    pytest.param(
+        "idx_organization_name_trgm",
+        select(Organization.id).where(Organization.name.ilike("%Торг%"), Organization.is_deleted == False),
+        id="поиск по названию",
+    ),
+    pytest.param(
+        "idx_org_activity_activity_id",
+        select(org_activity.c.organization_id).where(org_activity.c.activity_id == 1),
+        id="организации по деятельности",
+    ),
+    pytest.param(
+        "idx_activity_parent_id",
+        select(Activity.id).where(Activity.parent_id == 1, Activity.is_deleted == False),
+        id="дочерние деятельности",
+    ),
+]
+
+
+def used_indexes(plan: dict) -> set[str]:
+    """Имена индексов, по которым читает план (включая вложенные узлы)."""
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        names |= used_indexes(child)
+    return names
+
+
+@pytest.mark.parametrize("index, query", CASES)
+async def test_query_uses_partial_index(db_session, index, query):
+    compiled = query.compile(dialect=db_session.bind.dialect, compile_kwargs={"literal_binds": True})
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+
+    plan = (await db_session.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))).scalar_one()[0]
+
+    assert index in used_indexes(plan["Plan"])
@@ -0,0 +1,63 @@
+"""Гео-выборки организаций: каждая организация в ответе ровно один раз."""
+import pytest
+
+from src.models import Organization
+from src.repositories.organization_repo import OrganizationRepository
+from tests.factories import create_organization
+
+pytestmark = pytest.mark.anyio
+
+# Точка вдали от реальных и сгенерированных данных
+LATITUDE, LONGITUDE = -77.85, 166.67
+DELTA = 0.001
+
+
+@pytest.fixture
+async def organization(db_session):
+    # Несколько активных деятельностей: join по org_activity размножил бы строку организации
+    return await create_organization(db_session, LATITUDE, LONGITUDE, activities=3)
+
+
+async def test_list_in_radius_returns_organization_once(db_session, organization):
+    repository = OrganizationRepository(Organization, db_session)
+
+    page = await repository.list_in_radius(LATITUDE, LONGITUDE, 0.05, limit=1)
+
+    assert [org.id for org in page.items] == [organization.id]
+    assert page.next_cursor is None
+
+
+async def test_list_in_bbox_returns_organization_once(db_session, organization):
+    repository = OrganizationRepository(Organization, db_session)
+
+    page = await repository.list_in_bbox(
+        LATITUDE - DELTA, LONGITUDE - DELTA, LATITUDE + DELTA, LONGITUDE + DELTA, limit=1
+    )
+
+    assert [org.id for org in page.items] == [organization.id]
+    assert page.next_cursor is None
+
+
+async def test_stream_in_bbox_returns_organization_once(db_session, organization):
+    repository = OrganizationRepository(Organization, db_session)
+
+    streamed = [
+        org.id
+        async for org in repository.stream_in_bbox(
+            LATITUDE - DELTA, LONGITUDE - DELTA, LATITUDE + DELTA, LONGITUDE + DELTA
+        )
+    ]
+
+    assert streamed == [organization.id]
+
+
+async def test_list_in_bbox_counts_each_organization_once_per_page(db_session, organization):
+    second = await create_organization(db_session, LATITUDE, LONGITUDE + DELTA / 2, activities=2)
+    repository = OrganizationRepository(Organization, db_session)
+    bbox = (LATITUDE - DELTA, LONGITUDE - DELTA, LATITUDE + DELTA, LONGITUDE + DELTA)
+
+    first_page = await repository.list_in_bbox(*bbox, limit=1)
+    second_page = await repository.list_in_bbox(*bbox, cursor=first_page.next_cursor, limit=1)
+
+    assert [org.id for org in first_page.items + second_page.items] == sorted([organization.id, second.id])
+    assert second_page.next_cursor is None
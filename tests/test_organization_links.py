@@ -0,0 +1,35 @@
+"""Смена связей с деятельностями сдвигает updated_at организации (по нему обновляется индекс зданий)."""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from src.models import Activity, Organization
+from src.repositories.organization_repo import OrganizationRepository
+from tests.factories import create_organization, unique_name
+
+pytestmark = pytest.mark.anyio
+
+STALE = datetime(2000, 1, 1)
+
+
+def test_orm_link_change_touches_organization():
+    organization = Organization(name=unique_name("Организация"), updated_at=STALE)
+
+    organization.activities.append(Activity(name=unique_name("Деятельность")))
+
+    assert organization.updated_at > STALE
+
+
+async def test_update_many_with_only_links_touches_organization(db_session):
+    organization = await create_organization(db_session, -77.85, 166.67)
+    activity = Activity(name=unique_name("Деятельность"))
+    db_session.add(activity)
+    organization.updated_at = STALE
+    await db_session.flush()
+    repository = OrganizationRepository(Organization, db_session)
+
+    await repository.update_many([{"id": organization.id, "activity_ids": [activity.id]}])
+
+    updated_at = await db_session.scalar(select(Organization.updated_at).where(Organization.id == organization.id))
+    assert updated_at > STALE
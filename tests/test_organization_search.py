@@ -0,0 +1,58 @@
+"""Поиск по названию: короткие запросы (без триграмм) тоже обслуживаются."""
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from src.core import settings
+from src.core.deps import get_organization_service
+from src.models import Organization
+from src.repositories.base import Page
+from src.repositories.organization_repo import OrganizationRepository
+from tests.factories import create_organization, unique_name
+
+
+class FakeSearchService:
+    def __init__(self):
+        self.queries = []
+
+    async def search_by_name(self, query_text, cursor=None, limit=None):
+        self.queries.append(query_text)
+        return Page(items=[])
+
+
+@pytest.mark.parametrize("query", ["Р", "Ро", "Рог"])
+def test_search_endpoint_accepts_short_queries(query):
+    service = FakeSearchService()
+    app.dependency_overrides[get_organization_service] = lambda: service
+    try:
+        response = TestClient(app).get(
+            "/api/v1/organizations/search", params={"query": query}, headers={"X-API-Key": settings.api_key}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert service.queries == [query]
+
+
+@pytest.mark.anyio
+async def test_short_query_returns_substring_matches_by_id(db_session):
+    await create_organization(db_session, -77.85, 166.67, name=unique_name("Ёжик"))
+    repository = OrganizationRepository(Organization, db_session)
+
+    page = await repository.search_by_name("ёж", limit=20)
+
+    assert page.items
+    assert all("ёж" in org.name.lower() for org in page.items)
+    assert [org.id for org in page.items] == sorted(org.id for org in page.items)
+
+
+@pytest.mark.anyio
+async def test_long_query_finds_organization(db_session):
+    name = unique_name("Ёжик")
+    organization = await create_organization(db_session, -77.85, 166.67, name=name)
+    repository = OrganizationRepository(Organization, db_session)
+
+    page = await repository.search_by_name(name, limit=20)
+
+    assert organization.id in [org.id for org in page.items]
@@ -0,0 +1,62 @@
+"""Нормализация запроса для кэша ответов: прямоугольник только расширяется, центры не двигаются."""
+from urllib.parse import parse_qsl, urlencode
+
+import pytest
+from starlette.requests import Request
+
+from src.core import settings
+from src.core.middleware import normalize_query
+
+
+def normalized(**params) -> dict[str, str]:
+    request = Request({"type": "http", "query_string": urlencode(params).encode(), "headers": []})
+    return dict(parse_qsl(normalize_query(request)))
+
+
+@pytest.fixture(params=[("grid", 0.01), ("cells", 16)], ids=["grid", "cells"])
+def snapping(request, monkeypatch):
+    mode, value = request.param
+    monkeypatch.setattr(settings, "response_cache_grid_deg", value if mode == "grid" else 0)
+    monkeypatch.setattr(settings, "response_cache_cell_level", value if mode == "cells" else 0)
+
+
+@pytest.mark.parametrize("bbox", [
+    (55.751234, 37.612345, 55.758765, 37.629876),
+    (55.758765, 37.629876, 55.751234, 37.612345),
+    (-33.8712, -151.2101, -33.8701, -151.2049),
+    (55.75, 37.62, 55.76, 37.63),
+])
+def test_bbox_expands_outward(snapping, bbox):
+    lat1, lon1, lat2, lon2 = bbox
+
+    params = normalized(lat1=lat1, lon1=lon1, lat2=lat2, lon2=lon2, limit=10)
+
+    assert float(params["lat1"]) <= min(lat1, lat2) and float(params["lat2"]) >= max(lat1, lat2)
+    assert float(params["lon1"]) <= min(lon1, lon2) and float(params["lon2"]) >= max(lon1, lon2)
+    assert params["limit"] == "10"
+
+
+def test_nearby_bboxes_share_key(snapping):
+    first = normalized(lat1=55.7512, lon1=37.6123, lat2=55.7587, lon2=37.6298)
+    second = normalized(lat1=55.7514, lon1=37.6125, lat2=55.7585, lon2=37.6296)
+
+    assert first == second
+
+
+def test_radius_centre_is_not_moved(snapping):
+    params = normalized(latitude=55.751234, longitude=37.612345, radius_km=1)
+
+    assert params == {"latitude": "55.751234", "longitude": "37.612345", "radius_km": "1"}
+
+
+def test_incomplete_bbox_is_left_as_is(snapping):
+    assert normalized(lat1=55.7512, lon1=37.6123, lat2="abc") == {"lat1": "55.7512", "lon1": "37.6123", "lat2": "abc"}
+
+
+def test_without_snapping_only_sorts(monkeypatch):
+    monkeypatch.setattr(settings, "response_cache_grid_deg", 0)
+    monkeypatch.setattr(settings, "response_cache_cell_level", 0)
+
+    request = Request({"type": "http", "query_string": b"lon1=2.5&lat1=1.25", "headers": []})
+
+    assert normalize_query(request) == "lat1=1.25&lon1=2.5"
@@ -0,0 +1,136 @@
+"""Индекс зданий в памяти отвечает так же, как полный перебор на той же сфере."""
+import math
+import random
+import time
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from src.core.spatial_index import SpatialIndex
+from tests.test_geo_arrays import CENTER_LAT, CENTER_LON, python_haversine_m
+
+pytestmark = pytest.mark.anyio
+
+
+def loaded_index(visible: dict[int, tuple[float, float]]) -> SpatialIndex:
+    """Индекс с заданными зданиями, который не обращается к БД."""
+    index = SpatialIndex(refresh_seconds=math.inf, overlap_seconds=0, full_reload_seconds=math.inf)
+    index._visible = dict(visible)
+    index._rebuild()
+    index._loaded_at = index._refreshed_at = time.monotonic()
+    return index
+
+
+@pytest.fixture
+def buildings() -> dict[int, tuple[float, float]]:
+    rng = random.Random(7)
+    return {
+        building_id: (CENTER_LAT + rng.uniform(-0.1, 0.1), CENTER_LON + rng.uniform(-0.1, 0.1))
+        for building_id in rng.sample(range(1, 100_000), 3000)
+    }
+
+
+@pytest.fixture
+def queries() -> list[tuple[float, float]]:
+    rng = random.Random(11)
+    return [(CENTER_LAT + rng.uniform(-0.1, 0.1), CENTER_LON + rng.uniform(-0.1, 0.1)) for _ in range(20)]
+
+
+async def test_ids_in_bbox_matches_brute_force(buildings, queries):
+    index = loaded_index(buildings)
+
+    for lat, lon in queries:
+        lat1, lon1, lat2, lon2 = lat - 0.01, lon - 0.02, lat + 0.01, lon + 0.02
+        expected = sorted(
+            building_id for building_id, (b_lat, b_lon) in buildings.items()
+            if lat1 <= b_lat <= lat2 and lon1 <= b_lon <= lon2
+        )
+        assert (await index.ids_in_bbox(lat1, lon1, lat2, lon2)).tolist() == expected
+
+
+async def test_ids_in_bbox_includes_boundary():
+    index = loaded_index({1: (10.0, 20.0), 2: (10.5, 20.5), 3: (11.0, 21.0), 4: (11.5, 21.5)})
+
+    assert (await index.ids_in_bbox(10.0, 20.0, 11.0, 21.0)).tolist() == [1, 2, 3]
+
+
+@pytest.mark.parametrize("radius_km", [0.3, 1.0, 5.0])
+async def test_ids_in_radius_matches_brute_force(buildings, queries, radius_km):
+    index = loaded_index(buildings)
+
+    for lat, lon in queries:
+        expected = sorted(
+            building_id for building_id, (b_lat, b_lon) in buildings.items()
+            if python_haversine_m(lat, lon, b_lat, b_lon) <= radius_km * 1000
+        )
+        assert (await index.ids_in_radius(lat, lon, radius_km)).tolist() == expected
+
+
+@pytest.mark.parametrize("k", [1, 20, 3000, 5000])
+async def test_nearest_matches_brute_force(buildings, queries, k):
+    index = loaded_index(buildings)
+
+    for lat, lon in queries:
+        distances = {
+            building_id: python_haversine_m(lat, lon, b_lat, b_lon) for building_id, (b_lat, b_lon) in buildings.items()
+        }
+        expected = sorted(distances, key=lambda building_id: (distances[building_id], building_id))[:k]
+
+        ids, found = await index.nearest(lat, lon, k)
+
+        assert sorted(ids.tolist()) == sorted(expected)
+        assert found.tolist() == pytest.approx([distances[building_id] for building_id in expected], rel=1e-9)
+        assert np.all(np.diff(found) >= 0)
+
+
+@pytest.mark.parametrize("longitude", [179.999, -179.999])
+async def test_radius_and_nearest_across_antimeridian(longitude):
+    buildings = {1: (-16.5, 179.998), 2: (-16.5, -179.998), 3: (-16.5, 170.0)}
+    index = loaded_index(buildings)
+
+    ids = await index.ids_in_radius(-16.5, longitude, 1.0)
+    nearest, _ = await index.nearest(-16.5, longitude, 2)
+
+    assert ids.tolist() == [1, 2]
+    assert sorted(nearest.tolist()) == [1, 2]
+
+
+async def test_empty_index():
+    index = loaded_index({})
+
+    assert (await index.ids_in_bbox(-90, -180, 90, 180)).tolist() == []
+    assert (await index.ids_in_radius(CENTER_LAT, CENTER_LON, 10)).tolist() == []
+    ids, distances = await index.nearest(CENTER_LAT, CENTER_LON, 5)
+    assert ids.tolist() == [] and distances.tolist() == []
+
+
+async def test_refresh_applies_changes_since_watermark():
+    index = SpatialIndex(refresh_seconds=math.inf, overlap_seconds=1, full_reload_seconds=math.inf)
+    activities_watermark = datetime(2026, 1, 1)
+    state = {
+        "watermark": datetime(2026, 1, 1, 12),
+        "rows": [(1, 10.0, 20.0, True), (2, 10.1, 20.1, True), (3, 10.2, 20.2, False)],
+        "since": [],
+    }
+
+    async def watermarks(session):
+        return state["watermark"], activities_watermark
+
+    async def read(session, since):
+        state["since"].append(since)
+        return state["rows"]
+
+    index._watermarks, index._read = watermarks, read
+    await index.load(session=None)
+    assert (await index.ids_in_bbox(0, 0, 90, 90)).tolist() == [1, 2]
+
+    # Здание 1 переехало, 2 скрыто, 3 стало видимым
+    state["watermark"] = datetime(2026, 1, 1, 13)
+    state["rows"] = [(1, 50.0, 60.0, True), (2, 10.1, 20.1, False), (3, 10.2, 20.2, True)]
+    await index.refresh(session=None)
+
+    assert state["since"] == [None, datetime(2026, 1, 1, 11, 59, 59)]
+    assert (await index.ids_in_bbox(0, 0, 15, 25)).tolist() == [3]
+    assert (await index.ids_in_radius(50.0, 60.0, 0.1)).tolist() == [1]
+    assert (index.full_loads, index.refreshes) == (1, 1)
@@ -0,0 +1,67 @@
+"""Индекс зданий в памяти перечитывает здание, из которого ушла последняя организация."""
+import math
+
+import pytest
+from sqlalchemy import delete
+
+from src.core.spatial_index import SpatialIndex
+from src.models import Organization
+from src.repositories import organization_repo
+from src.repositories.organization_repo import OrganizationRepository
+from tests.factories import create_organization
+
+pytestmark = pytest.mark.anyio
+
+LATITUDE, LONGITUDE = -77.85, 166.67
+DELTA = 0.01
+
+
+async def loaded_index(session) -> SpatialIndex:
+    # Большое перекрытие: часы приложения и БД могут расходиться
+    index = SpatialIndex(refresh_seconds=math.inf, overlap_seconds=3600, full_reload_seconds=math.inf)
+    await index.load(session)
+    return index
+
+
+async def ids_near(index: SpatialIndex) -> list[int]:
+    ids = await index.ids_in_bbox(LATITUDE - DELTA, LONGITUDE - DELTA, LATITUDE + DELTA, LONGITUDE + DELTA)
+    return ids.tolist()
+
+
+async def test_refresh_drops_building_after_organization_moves(db_session):
+    organization = await create_organization(db_session, LATITUDE, LONGITUDE)
+    old_building_id = organization.building_id
+    other = await create_organization(db_session, LATITUDE + 1, LONGITUDE + 1)
+    index = await loaded_index(db_session)
+    assert old_building_id in await ids_near(index)
+
+    organization.building_id = other.building_id
+    await db_session.flush()
+    await index.refresh(db_session)
+
+    assert old_building_id not in await ids_near(index)
+
+
+async def test_refresh_drops_building_after_organization_is_deleted(db_session):
+    organization = await create_organization(db_session, LATITUDE, LONGITUDE)
+    index = await loaded_index(db_session)
+
+    await db_session.execute(delete(Organization).where(Organization.id == organization.id))
+    await index.refresh(db_session)
+
+    assert organization.building_id not in await ids_near(index)
+
+
+async def test_nearest_from_stale_index_skips_empty_buildings(db_session, monkeypatch):
+    organization = await create_organization(db_session, LATITUDE, LONGITUDE + 0.001)
+    moved = await create_organization(db_session, LATITUDE, LONGITUDE)
+    index = await loaded_index(db_session)
+    # Индекс не обновлялся и считает ближайшим здание, из которого организация уже ушла
+    moved.building_id = organization.building_id
+    await db_session.flush()
+    monkeypatch.setattr(organization_repo, "spatial_index", index)
+    repository = OrganizationRepository(Organization, db_session)
+
+    rows = await repository._nearest_from_index(LATITUDE, LONGITUDE, 1)
+
+    assert [row[0].id for row in rows] == [min(organization.id, moved.id)]
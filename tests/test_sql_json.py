@@ -0,0 +1,69 @@
+"""Режим SQL JSON отдаёт те же объекты, что ORM-путь с serializers + orjson."""
+from datetime import datetime
+
+import orjson
+import pytest
+
+from src.api.serializers import serialize_organization
+from src.models import Organization
+from src.repositories.base import PY_WHITESPACE
+from src.repositories.organization_repo import OrganizationRepository
+from tests.factories import create_organization, unique_name
+
+pytestmark = pytest.mark.anyio
+
+LATITUDE, LONGITUDE = -77.85, 166.67
+DELTA = 0.001
+
+
+@pytest.fixture
+async def organization(db_session):
+    organization = await create_organization(db_session, LATITUDE, LONGITUDE, activities=2)
+    first, second = organization.activities
+    # Пробельные символы Unicode по краям, которые снимает str.strip()
+    first.name = f"{PY_WHITESPACE}{unique_name('Деятельность')}\u3000"
+    # Без микросекунд и с нулями в конце дробной части
+    first.created_at = datetime(2025, 10, 23, 7, 59, 55)
+    first.updated_at = datetime(2025, 10, 23, 7, 59, 55, 120000)
+    second.created_at = datetime(2025, 10, 23, 7, 59, 55, 467718)
+    organization.created_at = datetime(2025, 10, 23, 7, 59, 55, 100)
+    organization.updated_at = datetime(2025, 10, 23, 8, 0)
+    await db_session.flush()
+    db_session.expunge_all()
+    return organization
+
+
+def orm_body(page) -> list[dict]:
+    organizations = orjson.loads(orjson.dumps([serialize_organization(obj) for obj in page.items]))
+    for organization in organizations:
+        organization["activities"].sort(key=lambda activity: activity["id"])
+    return organizations
+
+
+def json_body(page) -> list[dict]:
+    return orjson.loads("[" + ",".join(page.items) + "]")
+
+
+async def test_radius_json_matches_orm(db_session, organization):
+    repository = OrganizationRepository(Organization, db_session)
+
+    orm_page = await repository.list_in_radius(LATITUDE, LONGITUDE, 0.05)
+    json_page = await repository.list_in_radius_json(LATITUDE, LONGITUDE, 0.05)
+
+    assert json_body(json_page) == orm_body(orm_page)
+    assert [org["id"] for org in json_body(json_page)] == [organization.id]
+
+
+async def test_bbox_json_matches_orm(db_session, organization):
+    repository = OrganizationRepository(Organization, db_session)
+    bbox = (LATITUDE - DELTA, LONGITUDE - DELTA, LATITUDE + DELTA, LONGITUDE + DELTA)
+
+    orm_page = await repository.list_in_bbox(*bbox)
+    json_page = await repository.list_in_bbox_json(*bbox)
+
+    assert json_body(json_page) == orm_body(orm_page)
+    assert [org["id"] for org in json_body(json_page)] == [organization.id]
+
+
+def test_py_whitespace_is_str_strip_set():
+    assert set(PY_WHITESPACE) == {chr(code) for code in range(0x110000) if chr(code).isspace()}